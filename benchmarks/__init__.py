@@ -0,0 +1 @@
+"""Synthetic datasets and timing runs for the dashboard pipeline."""
@@ -0,0 +1,202 @@
+"""Check that the dashboard's fast paths still agree with the plain computations.
+
+Several results are answered from precomputed structures instead of the
+pandas expression they replaced. Each check below rebuilds the result the
+slow way on a synthetic dataset and compares:
+
+    cube        RollupCube windows against ``groupby().agg(AGG_DICT)``
+    index       DiscoMonthIndex selections against a boolean filter
+    format      ``format_numbers`` against ``format_number``, value by value
+    hierarchy   level loss/collection percentages against their summed parts
+    history     a history merged by ``append_files`` against a cold reload
+    duckdb      the SQL backend against the cube, index and ``period_pivot``
+                (skipped when DuckDB is not installed)
+
+Exits non-zero when any check fails.
+
+    python -m benchmarks.parity
+    python -m benchmarks.parity --names 1000 --months 36
+"""
+
+import argparse
+import sys
+import tempfile
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.run import encode
+from benchmarks.synthetic import generate
+from comparison import comparison_periods, period_pivot
+from formatting import format_number, format_numbers
+from frame_index import DiscoMonthIndex
+from hierarchy import level_frame
+from history import HistoryStore, append_files, load_history
+from ingest import DatasetCache, prepare
+from rollup import RollupCube
+from schema import AGG_DICT, LEVEL_RATIOS, NAME_COLUMN, PERIOD_COLUMN
+import sql_backend
+
+RTOL = 1e-9  # Prefix sums reorder additions, so totals differ in the last bits
+
+
+def windows(df):
+    """Month windows worth checking: everything, the last year, one month, an inner span"""
+    periods = np.unique(df[PERIOD_COLUMN]).tolist()
+    return [
+        (periods[0], periods[-1]),
+        (periods[max(len(periods) - 12, 0)], periods[-1]),
+        (periods[-1], periods[-1]),
+        (periods[len(periods) // 4], periods[len(periods) * 3 // 4]),
+    ]
+
+
+def dense(df):
+    return df.assign(**{col: df[col].sparse.to_dense() for col in df.columns
+                        if isinstance(df[col].dtype, pd.SparseDtype)})
+
+
+def groupby_window(df, discos, start, end):
+    """The roll-up the cube replaced, on the numeric ``AGG_DICT`` columns"""
+    rows = dense(df)[df[PERIOD_COLUMN].between(start, end) & df[NAME_COLUMN].isin(discos)]
+    agg = {col: how for col, how in AGG_DICT.items()
+           if col in rows.columns and pd.api.types.is_numeric_dtype(rows[col])}
+    # In float64, as the cube accumulates; float32 means would differ in the 7th digit
+    rows = rows.astype({col: "float64" for col in agg})
+    return rows.groupby(NAME_COLUMN, observed=True).agg(agg)
+
+
+def assert_close(actual, expected, label):
+    actual = actual.astype("float64")
+    expected = expected.astype("float64")
+    assert list(actual.index) == list(expected.index), f"{label}: rows differ"
+    assert list(actual.columns) == list(expected.columns), f"{label}: columns differ"
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=RTOL, equal_nan=True,
+                               err_msg=label)
+
+
+def check_cube(df, index, cube):
+    discos = list(index.discos)
+    for subset in (discos, discos[::3]):
+        for start, end in windows(df):
+            expected = groupby_window(df, subset, start, end)
+            actual = cube.window(subset, start, end).set_index(NAME_COLUMN)
+            actual.index = actual.index.astype(str)
+            expected.index = expected.index.astype(str)
+            assert_close(actual[expected.columns], expected, f"cube {start}-{end}")
+
+
+def check_index(df, index):
+    discos = list(index.discos)
+    for subset in (discos, discos[1::2]):
+        for start, end in windows(df):
+            expected = df[df[PERIOD_COLUMN].between(start, end) & df[NAME_COLUMN].isin(subset)]
+            actual = index.select(df, subset, start, end)
+            pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+def check_format(seed):
+    rng = np.random.default_rng(seed)
+    edges = np.array([0, 0.4, 0.5, 999.4, 999.5, 999.9, 1_000, 999_949, 999_950, 1e6,
+                      999_949_999, 999_950_000, 1e9, 1.5e12, np.nan])
+    values = np.concatenate([edges, -edges, rng.choice([-1, 1], 2000) * 10 ** rng.uniform(-2, 12, 2000)])
+    for sign in (False, True):
+        expected = [format_number(v, include_sign=sign) for v in values]
+        actual = format_numbers(values, include_sign=sign)
+        mismatched = [(v, a, e) for v, a, e in zip(values, actual, expected) if a != e]
+        assert not mismatched, f"format_numbers(include_sign={sign}) differs: {mismatched[:5]}"
+
+
+def check_hierarchy(df):
+    if "DISCO_NAME" not in df.columns:
+        return
+    level = level_frame(df, "DISCO_NAME").set_index([NAME_COLUMN, PERIOD_COLUMN])
+    sums = dense(df).groupby(["DISCO_NAME", PERIOD_COLUMN], observed=True).sum(numeric_only=True)
+    sums.index = sums.index.set_levels(sums.index.levels[0].astype(str), level=0)
+    for col, (numerator, denominator) in LEVEL_RATIOS.items():
+        expected = (100 * sums[numerator] / sums[denominator]).rename(col)
+        actual = level[col].reindex(expected.index)
+        # Stored as float32 after prep
+        np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-6, err_msg=col)
+
+
+def check_history(raw):
+    months = np.sort(raw["BILLING_MONTH"].unique())
+    split = months[len(months) // 2]
+    with tempfile.TemporaryDirectory() as root:
+        store = HistoryStore(root)
+        cache = DatasetCache(1 << 34)
+        append_files(store, [encode(raw[raw["BILLING_MONTH"] < split], "csv")], cache)
+        load_history(store, cache)
+        append_files(store, [encode(raw[raw["BILLING_MONTH"] >= split], "csv")], cache)
+        merged = cache.get(store.version())
+        assert merged is not None, "append did not merge into the cached history"
+        _, cold = load_history(HistoryStore(root), DatasetCache(1 << 34))
+        pd.testing.assert_frame_equal(merged, cold)
+
+
+def check_duckdb(df, index, cube):
+    if not sql_backend.available():
+        return "skipped"
+    with tempfile.TemporaryDirectory() as directory:
+        path = sql_backend.write_parquet(df, sql_backend.parquet_path(directory, "parity"))
+        backend = sql_backend.DuckDBBackend(path)
+        discos = list(index.discos)
+        for subset in (discos, discos[::3]):
+            for start, end in windows(df):
+                expected = cube.window(subset, start, end).set_index(NAME_COLUMN)
+                actual = backend.window(subset, start, end).set_index(NAME_COLUMN)
+                assert_close(actual[expected.columns], expected, f"duckdb window {start}-{end}")
+                expected = dense(index.select(df, subset, start, end)).reset_index(drop=True)
+                actual = backend.select(subset, start, end)[expected.columns]
+                assert_close(actual.select_dtypes("number"), expected.select_dtypes("number"),
+                             f"duckdb select {start}-{end}")
+        periods = [p for _, p in comparison_periods(np.unique(df[PERIOD_COLUMN]).tolist())]
+        for column in ("MON_PERC_LOSS_TD", "MON_UNITS_BILLED"):
+            assert_close(backend.pivot(discos, periods, column),
+                         period_pivot(df, index, discos, periods, column), f"duckdb pivot {column}")
+
+
+def run(names, months, seed):
+    """``{check: None | "skipped" | traceback}`` for every check"""
+    raw = generate(names, months, seed=seed)
+    df = prepare(raw.copy())
+    index = DiscoMonthIndex(df)
+    cube = RollupCube(df, index)
+    checks = {
+        "cube": lambda: check_cube(df, index, cube),
+        "index": lambda: check_index(df, index),
+        "format": lambda: check_format(seed),
+        "hierarchy": lambda: check_hierarchy(df),
+        "history": lambda: check_history(raw),
+        "duckdb": lambda: check_duckdb(df, index, cube),
+    }
+    results = {}
+    for name, check in checks.items():
+        try:
+            results[name] = check()
+        except Exception:
+            results[name] = traceback.format_exc()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=200, help="DISCOs/subdivisions (hierarchy above 10)")
+    parser.add_argument("--months", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = run(args.names, args.months, args.seed)
+    for name, outcome in results.items():
+        status = "ok" if outcome is None else outcome if outcome == "skipped" else "FAILED"
+        print(f"{name:<12}{status}")
+        if status == "FAILED":
+            print(outcome)
+    if any(outcome not in (None, "skipped") for outcome in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Time the dashboard pipeline on a synthetic dataset and compare runs.
+
+Each stage calls the same functions the dashboard does, without Streamlit:
+
+    ingest:<fmt>  parse the uploaded bytes (csv, xlsx, parquet, feather);
+                  xlsx is timed once per installed Excel engine
+    prep          dates, periods, compact dtypes, sort
+    index         DISCO/month index and rollup cube (once per dataset)
+    hierarchy     DISCO/circle/division roll-ups (once per dataset)
+    filter        "Last 12 Months" window and a single month for all DISCOs
+    aggregate     tab 1: roll-up over the full range, KPI cards, summary
+    comparison    tab 3: three-period pivot and change table
+    figures       every chart builder on its usual input
+
+Results are written as JSON under ``benchmarks/results/`` with ``--save``;
+``--baseline`` prints each stage's median against an earlier run.
+
+    python -m benchmarks.run --scale medium --save before
+    python -m benchmarks.run --scale medium --baseline before
+"""
+
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate
+from charts import (
+    create_comparison_bar_chart,
+    create_compliance_pie,
+    create_energy_pie,
+    create_metric_ranking_chart,
+    create_normalized_metrics_chart,
+    create_performance_matrix,
+    create_time_series_subplots,
+    create_trend_chart,
+)
+from comparison import change_table, comparison_periods, period_pivot
+from frame_index import DiscoMonthIndex
+from hierarchy import Hierarchy
+from ingest import CALAMINE_AVAILABLE, EXCEL_ENGINES, prepare, read_frame, read_workbook
+from kpis import analysis_frame, executive_summary, headline_kpis, metric_ranking
+from periods import period_label, period_range
+from rollup import RollupCube
+
+RESULTS_DIR = Path(__file__).parent / "results"
+SCALES = {
+    "small": (10, 12),
+    "medium": (100, 60),
+    "large": (1_000, 120),
+    "xlarge": (10_000, 120),
+}
+SLOWER_THRESHOLD = 1.10  # Ratios above this are flagged against the baseline
+
+
+def encode(df, fmt):
+    """``(file name, bytes)`` of ``df`` as an upload in the given format"""
+    buffer = io.BytesIO()
+    if fmt == "csv":
+        df.to_csv(buffer, index=False)
+    elif fmt == "xlsx":
+        df.to_excel(buffer, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(buffer, index=False)
+    elif fmt == "feather":
+        df.to_feather(buffer)
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return f"synthetic.{fmt}", buffer.getvalue()
+
+
+def measure(fn, repeat, setup=None):
+    """Wall-clock seconds of ``fn(setup())`` over ``repeat`` runs"""
+    times = []
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times), "runs": repeat}
+
+
+def build_figures(df, index, cube, months, discos):
+    """Build every dashboard chart once"""
+    start, end = months[0], months[-1]
+    analysis = analysis_frame(df, index, cube, discos, start, end)
+    create_energy_pie(analysis)
+    create_compliance_pie(analysis)
+    create_performance_matrix(analysis)
+    ranked, _ = metric_ranking(analysis, "MON_PERC_LOSS_TD", ascending=True)
+    create_metric_ranking_chart(ranked, "T&D Loss % (MON)", "MON_PERC_LOSS_TD")
+
+    comparison = comparison_periods(months)
+    pivot = period_pivot(df, index, discos, [p for _, p in comparison], "MONTHLY_ENERGY")
+    create_comparison_bar_chart(pivot.rename(columns=period_label), "Monthly Energy", "Monthly Energy")
+
+    series = index.select(df, [discos[0]], start, end)
+    create_trend_chart(series, discos[0], "All Available Months Performance Trend")
+    create_time_series_subplots(series, discos[0])
+    create_normalized_metrics_chart(series, discos[0])
+
+
+def run(names, months, formats, repeat, seed=0):
+    """Stage timings for one synthetic dataset, as a JSON-ready dict"""
+    raw = generate(names, months, seed=seed)
+    stages = {}
+
+    for fmt in formats:
+        name, data = encode(raw, fmt)
+        if fmt != "xlsx":
+            stages[f"ingest:{fmt}"] = measure(lambda: read_frame(name, data), repeat)
+            continue
+        for engine in EXCEL_ENGINES:
+            if engine == "calamine" and not CALAMINE_AVAILABLE:
+                continue
+            stages[f"ingest:xlsx/{engine}"] = measure(
+                lambda: read_workbook(io.BytesIO(data), engines=(engine,)), repeat)
+
+    parsed = read_frame(*encode(raw, "csv"))
+    stages["prep"] = measure(prepare, repeat, setup=parsed.copy)
+    df = prepare(parsed.copy())
+
+    stages["index"] = measure(lambda: RollupCube(df, DiscoMonthIndex(df)), repeat)
+    stages["hierarchy"] = measure(lambda: Hierarchy(df), repeat)
+    index = DiscoMonthIndex(df)
+    cube = RollupCube(df, index)
+    periods = np.sort(df["PERIOD"].unique()).tolist()
+    discos = index.discos
+
+    window = period_range(periods, "Last 12 Months")
+    stages["filter"] = measure(lambda: (index.select(df, discos, *window),
+                                        index.select(df, discos, periods[-1], periods[-1])), repeat)
+
+    def aggregate():
+        analysis = analysis_frame(df, index, cube, discos, periods[0], periods[-1])
+        headline_kpis(analysis)
+        executive_summary(analysis)
+    stages["aggregate"] = measure(aggregate, repeat)
+
+    def comparison():
+        chosen = comparison_periods(periods)
+        pivot = period_pivot(df, index, discos, [p for _, p in chosen], "MON_PERC_LOSS_TD")
+        change_table(pivot, chosen)
+    stages["comparison"] = measure(comparison, repeat)
+
+    stages["figures"] = measure(lambda: build_figures(df, index, cube, periods, discos), repeat)
+
+    return {"meta": environment(names, months, len(raw)), "stages": stages}
+
+
+def environment(names, months, rows):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=Path(__file__).parent).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "names": names,
+        "months": months,
+        "rows": rows,
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def report(result, baseline=None):
+    """Print stage medians, with the ratio to ``baseline`` when given"""
+    meta = result["meta"]
+    print(f"{meta['names']:,} names x {meta['months']} months = {meta['rows']:,} rows "
+          f"(commit {meta['commit']}, pandas {meta['pandas']})")
+    header = f"{'stage':<32}{'median ms':>12}{'min ms':>12}"
+    if baseline:
+        header += f"{'baseline ms':>14}{'ratio':>8}"
+    print(header)
+    for stage, timing in result["stages"].items():
+        line = f"{stage:<32}{timing['median'] * 1e3:>12.2f}{timing['min'] * 1e3:>12.2f}"
+        previous = baseline["stages"].get(stage) if baseline else None
+        if previous:
+            ratio = timing["median"] / previous["median"]
+            flag = "  slower" if ratio > SLOWER_THRESHOLD else ""
+            line += f"{previous['median'] * 1e3:>14.2f}{ratio:>8.2f}{flag}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="small",
+                        help="preset size: " + ", ".join(f"{k}={n}x{m}" for k, (n, m) in SCALES.items()))
+    parser.add_argument("--names", type=int, help="override the number of DISCOs/subdivisions")
+    parser.add_argument("--months", type=int, help="override the months of history")
+    parser.add_argument("--formats", default="csv,parquet",
+                        help="comma-separated upload formats to time (csv,xlsx,parquet,feather)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="NAME", help="store results as results/NAME.json")
+    parser.add_argument("--baseline", metavar="NAME", help="compare against results/NAME.json")
+    args = parser.parse_args(argv)
+
+    names, months = SCALES[args.scale]
+    names = args.names or names
+    months = args.months or months
+    baseline = None
+    if args.baseline:
+        baseline = json.loads((RESULTS_DIR / f"{args.baseline}.json").read_text())
+
+    result = run(names, months, args.formats.split(","), args.repeat, seed=args.seed)
+    report(result, baseline)
+
+    if args.save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{args.save}.json"
+        path.write_text(json.dumps(result, indent=2))
+        print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Time the dashboard's cold start and its fixed per-rerun overhead.
+
+Each stage runs in a fresh interpreter, so module imports are paid every
+time, as they are when a Streamlit server starts:
+
+    import:streamlit   Streamlit alone, the floor for any page
+    import:page        what the empty upload page imports
+    import:dashboard   every module the dashboard uses once data is loaded
+    script:first-run   first run of iram.py with nothing uploaded
+    script:rerun       later runs of the same page (median over a session)
+
+The script stages go through ``streamlit.testing``, whose own bookkeeping
+is included, so compare them against an earlier run rather than reading
+them as absolute page times. ``--save``/``--baseline`` work as in
+``benchmarks.run``.
+
+    python -m benchmarks.startup --save before
+    python -m benchmarks.startup --baseline before
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.run import RESULTS_DIR, SLOWER_THRESHOLD, environment
+
+ROOT = Path(__file__).parent.parent
+
+IMPORTS = {
+    "import:streamlit": ["streamlit"],
+    "import:page": ["streamlit", "file_types", "theme"],
+    "import:dashboard": ["streamlit", "file_types", "theme", "ingest", "history", "sql_backend",
+                         "hierarchy", "frame_index", "rollup", "figure_cache", "comparison",
+                         "precompute", "kpis", "charts"],
+}
+
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+{imports}
+print(time.perf_counter() - start)
+"""
+
+PAGE_SCRIPT = """
+import time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({script!r}, default_timeout=120)
+times = []
+for _ in range({reruns} + 1):
+    start = time.perf_counter()
+    app.run()
+    times.append(time.perf_counter() - start)
+    assert not app.exception, app.exception
+print(*times)
+"""
+
+
+def run_python(code):
+    """Seconds printed by ``code`` run in a fresh interpreter from the repository root"""
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                         text=True, check=True).stdout
+    return [float(value) for value in out.split()]
+
+
+def summarize(times):
+    return {"min": min(times), "median": statistics.median(times), "runs": len(times)}
+
+
+def run(repeat, reruns):
+    stages = {}
+    for stage, modules in IMPORTS.items():
+        code = IMPORT_SCRIPT.format(imports="\n".join(f"import {name}" for name in modules))
+        stages[stage] = summarize([run_python(code)[0] for _ in range(repeat)])
+
+    first, rerun = [], []
+    for _ in range(repeat):
+        times = run_python(PAGE_SCRIPT.format(script=str(ROOT / "iram.py"), reruns=reruns))
+        first.append(times[0])
+        rerun.append(statistics.median(times[1:]))
+    stages["script:first-run"] = summarize(first)
+    stages["script:rerun"] = summarize(rerun)
+    return {"meta": environment(0, 0, 0), "stages": stages}
+
+
+def report(result, baseline=None):
+    """Print stage medians, with the ratio to ``baseline`` when given"""
+    meta = result["meta"]
+    print(f"Cold start (commit {meta['commit']}, python {meta['python']})")
+    header = f"{'stage':<24}{'median ms':>12}{'min ms':>12}"
+    if baseline:
+        header += f"{'baseline ms':>14}{'ratio':>8}"
+    print(header)
+    for stage, timing in result["stages"].items():
+        line = f"{stage:<24}{timing['median'] * 1e3:>12.2f}{timing['min'] * 1e3:>12.2f}"
+        previous = baseline["stages"].get(stage) if baseline else None
+        if previous:
+            ratio = timing["median"] / previous["median"]
+            flag = "  slower" if ratio > SLOWER_THRESHOLD else ""
+            line += f"{previous['median'] * 1e3:>14.2f}{ratio:>8.2f}{flag}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per stage")
+    parser.add_argument("--reruns", type=int, default=20, help="reruns per page session")
+    parser.add_argument("--save", metavar="NAME", help="store results as results/NAME.json")
+    parser.add_argument("--baseline", metavar="NAME", help="compare against results/NAME.json")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        baseline = json.loads((RESULTS_DIR / f"{args.baseline}.json").read_text())
+
+    result = run(args.repeat, args.reruns)
+    report(result, baseline)
+
+    if args.save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{args.save}.json"
+        path.write_text(json.dumps(result, indent=2))
+        print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
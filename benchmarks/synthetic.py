@@ -0,0 +1,163 @@
+"""Synthetic DISCO performance datasets at configurable scale.
+
+Produces every column the dashboard reads, with the relationships the real
+monthly reports have: units lost are received minus billed, progressive
+(PRO_*) columns are fiscal-year-to-date totals starting in July, AT&C loss
+combines T&D loss with collection, energy is seasonal, and net metering is
+zero until a subdivision adopts it. Rows come month-major, as in the
+uploaded reports.
+
+    python -m benchmarks.synthetic --names 1000 --months 120 --out data.csv
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from schema import AGG_DICT, DATE_COLUMN, NAME_COLUMN
+
+DISCOS = ["LESCO", "MEPCO", "FESCO", "IESCO", "GEPCO",
+          "PESCO", "HESCO", "SEPCO", "QESCO", "TESCO"]
+FISCAL_YEAR_START = 7  # July
+SUBDIVISIONS_PER_DIVISION = 5
+DIVISIONS_PER_CIRCLE = 4
+
+
+def subdivision_names(n):
+    """DISCO names for up to ten rows, "<DISCO>-SD00001"-style names beyond"""
+    if n <= len(DISCOS):
+        return DISCOS[:n]
+    return [f"{DISCOS[i % len(DISCOS)]}-SD{i // len(DISCOS) + 1:05d}" for i in range(n)]
+
+
+def hierarchy_names(n):
+    """DISCO, circle and division of each of ``n`` "<DISCO>-SD00001"-style subdivisions"""
+    i = np.arange(n)
+    disco = np.array(DISCOS, dtype=object)[i % len(DISCOS)]
+    division = i // len(DISCOS) // SUBDIVISIONS_PER_DIVISION + 1
+    circle = (division - 1) // DIVISIONS_PER_CIRCLE + 1
+    return {
+        "DISCO_NAME": disco,
+        "CIRCLE_NAME": np.array([f"{d}-C{c:02d}" for d, c in zip(disco, circle)], dtype=object),
+        "DIV_NAME": np.array([f"{d}-D{v:03d}" for d, v in zip(disco, division)], dtype=object),
+    }
+
+
+def _fiscal_to_date(values, months):
+    """Running totals along axis 1 that restart every July"""
+    totals = np.concatenate([np.zeros((values.shape[0], 1)), np.cumsum(values, axis=1)], axis=1)
+    fiscal_year = months.year + (months.month >= FISCAL_YEAR_START)
+    first = pd.Series(np.arange(len(months))).groupby(np.asarray(fiscal_year)).transform("min").to_numpy()
+    return totals[:, 1:] - totals[:, first]
+
+
+def generate(names=10, months=12, end="2025-06", seed=0):
+    """DataFrame of ``names`` x ``months`` rows ending at month ``end``.
+
+    Beyond ten names the rows are subdivisions and also carry their DISCO,
+    circle and division.
+    """
+    rng = np.random.default_rng(seed)
+    periods = pd.date_range(end=pd.Timestamp(end), periods=months, freq="MS")
+    shape = (names, months)
+
+    # Per-subdivision character: size, typical loss and collection
+    size = rng.lognormal(mean=17.0, sigma=1.0, size=(names, 1))
+    base_loss = np.clip(rng.normal(8.0, 4.0, size=(names, 1)), 1.0, 35.0)
+    base_coll = np.clip(rng.normal(88.0, 8.0, size=(names, 1)), 40.0, 100.0)
+    growth = (1 + rng.normal(0.04, 0.02, size=(names, 1))) ** (np.arange(months) / 12)
+
+    # Summer peak in July, winter trough in January
+    season = 1 + 0.3 * np.cos(2 * np.pi * (periods.month.to_numpy() - 7) / 12)
+    received = size * growth * season * rng.normal(1.0, 0.05, size=shape)
+    loss = np.clip(base_loss + rng.normal(0, 1.0, size=shape) + 2 * (season - 1), 0.5, 40.0)
+    lost = received * loss / 100
+    billed = received - lost
+    coll = np.clip(base_coll + rng.normal(0, 4.0, size=shape), 20.0, 110.0)
+    assessment = billed * rng.normal(32.0, 3.0, size=(names, 1))
+    payment = assessment * coll / 100
+
+    # Net metering switches on at a random month per subdivision (never for some)
+    adoption = rng.integers(0, months * 2, size=(names, 1))
+    active = np.arange(months) >= adoption
+    net_met = np.where(active, received * rng.uniform(0.001, 0.02, size=(names, 1))
+                       * (1 + np.maximum(np.arange(months) - adoption, 0) / 12), 0.0)
+    wheeled = np.where(rng.random((names, 1)) < 0.05, received * 0.01, 0.0) * (rng.random(shape) < 0.5)
+
+    pro_received = _fiscal_to_date(received, periods)
+    pro_lost = _fiscal_to_date(lost, periods)
+    pro_billed = _fiscal_to_date(billed, periods)
+    pro_assessment = _fiscal_to_date(assessment, periods)
+    pro_payment = _fiscal_to_date(payment, periods)
+    pro_loss = pro_lost / pro_received * 100
+    pro_coll = pro_payment / pro_assessment * 100
+
+    columns = {
+        "MONTHLY_ENERGY": received / 1e6,
+        "CUMULATIVE_ENERGY": np.cumsum(received, axis=1) / 1e6,
+        "MON_UNITS_BILLED": billed,
+        "PRO_UNITS_BILLED": pro_billed,
+        "MON_UNITS_RECVD": received,
+        "PRO_UNITS_RECVD": pro_received,
+        "MON_UNITS_LOST": lost,
+        "PRO_UNITS_LOST": pro_lost,
+        "MON_ATC_LOSS": 100 - (100 - loss) * coll / 100,
+        "PRO_ATC_LOSS": 100 - (100 - pro_loss) * pro_coll / 100,
+        "MON_PERC_LOSS_TD": loss,
+        "PRO_PERC_LOSS_TD": pro_loss,
+        "MON_UNITS_NET_MET": net_met,
+        "PRO_UNITS_NET_MET": _fiscal_to_date(net_met, periods),
+        "MON_WHEELED_UNITS": wheeled,
+        "PRO_WHEELED_UNITS": _fiscal_to_date(wheeled, periods),
+        "ASSMNT_MON": assessment,
+        "ASSMNT_PRO": pro_assessment,
+        "PAY_TOT_MON": payment,
+        "PAY_TOT_PRO": pro_payment,
+        "COLL_PERC": coll,
+        "ACTIVE_CONS": np.rint(size / 2_000 * growth).astype("int64"),
+    }
+    assert set(columns) == set(AGG_DICT)
+
+    # Month-major row order, as in the monthly reports
+    frame = {DATE_COLUMN: np.repeat(periods.to_numpy(), names)}
+    if names > len(DISCOS):
+        frame.update({col: np.tile(values, months) for col, values in hierarchy_names(names).items()})
+    frame[NAME_COLUMN] = np.tile(np.array(subdivision_names(names), dtype=object), months)
+    frame.update({col: values.T.reshape(-1) for col, values in columns.items()})
+    return pd.DataFrame(frame)
+
+
+def write_dataset(df, path):
+    """Write ``df`` as CSV, Excel, Parquet or Feather depending on the suffix"""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        df.to_csv(path, index=False)
+    elif suffix == ".xlsx":
+        df.to_excel(path, index=False)
+    elif suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    elif suffix in (".feather", ".arrow"):
+        df.to_feather(path)
+    else:
+        raise ValueError(f"Unsupported dataset format: {suffix}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=10, help="DISCOs/subdivisions (default 10)")
+    parser.add_argument("--months", type=int, default=12, help="months of history (default 12)")
+    parser.add_argument("--end", default="2025-06", help="last billing month, YYYY-MM")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="output .csv/.xlsx/.parquet/.feather")
+    args = parser.parse_args(argv)
+
+    df = generate(args.names, args.months, end=args.end, seed=args.seed)
+    write_dataset(df, args.out)
+    print(f"Wrote {len(df):,} rows ({args.names} x {args.months}) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
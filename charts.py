@@ -0,0 +1,586 @@
+"""Plotly figure builders for the dashboard sections.
+
+Each builder turns a result frame (from ``kpis``, ``comparison`` or a DISCO's
+rows) into a figure and touches nothing else, so the charts can be built and
+timed without a Streamlit server. Returned figures may be shared through the
+figure cache and must not be mutated afterwards.
+"""
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+from downsample import downsampled, scatter_class, series_x
+from formatting import NUMBER_TEMPLATE, PERCENT_TEMPLATE, format_numbers
+from kpis import NEPRA_LOSS_LIMIT, compliance_status
+from theme import COLORS
+
+
+def create_comparison_bar_chart(pivot, title, y_title, is_percentage=False):
+    """Create grouped bar chart for a (DISCO x period) comparison pivot"""
+    fig = go.Figure()
+    
+    for period in pivot.columns:
+        period_data = pivot[period].dropna()
+        if period_data.empty:
+            continue
+        
+        x_values = period_data.index
+        y_values = period_data.to_numpy()
+        
+        fig.add_trace(go.Bar(
+            name=period,
+            x=x_values,
+            y=y_values,
+            text=None if is_percentage else format_numbers(y_values),
+            texttemplate=PERCENT_TEMPLATE if is_percentage else None,
+            textposition='auto',
+            textfont=dict(size=11)
+        ))
+    
+    fig.update_layout(
+        title=dict(
+            text=title,
+            font=dict(size=16, color=COLORS["dark"])
+        ),
+        barmode='group',
+        xaxis_title="DISCO",
+        yaxis_title=y_title,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=12)
+        ),
+        height=500,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color=COLORS["dark"], size=12),
+        margin=dict(t=60, b=100, l=60, r=30),
+        xaxis_tickangle=-45
+    )
+    
+    return fig
+
+
+def create_trend_chart(data, disco_name, title):
+    """Create trend chart for multiple metrics"""
+    fig = go.Figure()
+    
+    x_values = series_x(data)
+    
+    # Add T&D Loss trend
+    _, loss_x, loss_y = downsampled(x_values, data["MON_PERC_LOSS_TD"])
+    fig.add_trace(scatter_class(len(loss_y))(
+        x=loss_x,
+        y=loss_y,
+        mode='lines+markers',
+        name='T&D Loss %',
+        line=dict(color=COLORS["danger"], width=3),
+        marker=dict(size=8),
+        yaxis='y'
+    ))
+    
+    # Add Collection % trend
+    _, coll_x, coll_y = downsampled(x_values, data["COLL_PERC"])
+    fig.add_trace(scatter_class(len(coll_y))(
+        x=coll_x,
+        y=coll_y,
+        mode='lines+markers',
+        name='Collection %',
+        line=dict(color=COLORS["success"], width=3),
+        marker=dict(size=8),
+        yaxis='y2'
+    ))
+    
+    fig.update_layout(
+        title=dict(
+            text=f"{disco_name} - {title}",
+            font=dict(size=16, color=COLORS["dark"])
+        ),
+        xaxis_title="Month",
+        yaxis=dict(
+            title="T&D Loss %",
+            titlefont=dict(color=COLORS["danger"]),
+            tickfont=dict(color=COLORS["danger"])
+        ),
+        yaxis2=dict(
+            title="Collection %",
+            titlefont=dict(color=COLORS["success"]),
+            tickfont=dict(color=COLORS["success"]),
+            anchor="x",
+            overlaying="y",
+            side="right"
+        ),
+        height=450,
+        hovermode='x unified',
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color=COLORS["dark"], size=12),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5
+        ),
+        margin=dict(t=60, b=60, l=60, r=60)
+    )
+    
+    return fig
+
+
+def create_energy_pie(analysis_df):
+    """Energy share per DISCO as a donut chart"""
+    energy_by_disco = analysis_df.groupby("SDIV_NAME", observed=True)["MONTHLY_ENERGY"].sum().reset_index()
+    fig = px.pie(
+        energy_by_disco,
+        values="MONTHLY_ENERGY",
+        names="SDIV_NAME",
+        title="Energy Distribution by DISCO",
+        hole=0.4,
+        color_discrete_sequence=[COLORS["primary"], COLORS["secondary"], COLORS["info"], 
+                               COLORS["success"], COLORS["warning"], COLORS["danger"]]
+    )
+    fig.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        hovertemplate="<b>%{label}</b><br>Energy: %{value:,.0f} MKWh<br>Share: %{percent}<extra></extra>"
+    )
+    fig.update_layout(height=400)
+    
+    return fig
+
+
+def create_compliance_pie(analysis_df):
+    """Compliant vs non-compliant DISCO counts against NEPRA_LOSS_LIMIT"""
+    status = compliance_status(analysis_df)
+    status_counts = status.value_counts()
+    
+    fig = go.Figure(data=[go.Pie(
+        labels=status_counts.index,
+        values=status_counts.values,
+        hole=0.4,
+        marker=dict(colors=[COLORS["success"], COLORS["danger"]]),
+        textinfo='label+percent',
+        textposition='inside',
+        hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{percent}<extra></extra>"
+    )])
+    
+    compliant_count = int((status == "Compliant").sum())
+    total_count = len(status)
+    
+    fig.update_layout(
+        title="NEPRA Compliance Status",
+        annotations=[dict(
+            text=f'{compliant_count}/{total_count}<br>DISCOs',
+            x=0.5, y=0.5, font_size=14, showarrow=False
+        )],
+        height=400
+    )
+    
+    return fig
+
+
+def create_performance_matrix(analysis_df):
+    """Loss vs collection scatter sized by energy, with target quadrants"""
+    fig = px.scatter(
+        analysis_df,
+        x="MON_PERC_LOSS_TD",
+        y="COLL_PERC",
+        size="MONTHLY_ENERGY",
+        color="SDIV_NAME",
+        hover_name="SDIV_NAME",
+        hover_data={
+            "MON_PERC_LOSS_TD": ":.1f",
+            "PRO_PERC_LOSS_TD": ":.1f",
+            "COLL_PERC": ":.1f",
+            "MON_UNITS_NET_MET": ":,.0f",
+            "MONTHLY_ENERGY": ":,.0f",
+            "SDIV_NAME": False
+        },
+        labels={
+            "MON_PERC_LOSS_TD": "T&D Loss % (MON)",
+            "COLL_PERC": "Collection %",
+            "MONTHLY_ENERGY": "Monthly Energy (Size)",
+            "SDIV_NAME": "DISCO"
+        },
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    
+    # Add performance quadrants
+    fig.add_hline(y=90, line_dash="dash", line_color=COLORS["success"], 
+                 annotation_text="Target: 90%", annotation_position="top right")
+    fig.add_vline(x=NEPRA_LOSS_LIMIT, line_dash="dash", line_color=COLORS["danger"],
+                 annotation_text=f"NEPRA Limit: {NEPRA_LOSS_LIMIT}%", 
+                 annotation_position="top left")
+    
+    fig.update_layout(
+        height=500,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color=COLORS["dark"], size=12),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    
+    return fig
+
+
+def create_metric_ranking_chart(chart_df, metric_name, metric_col):
+    """Bar chart of one metric across DISCOs, with the NEPRA limit for loss metrics"""
+    fig = go.Figure()
+    
+    # Add bars
+    fig.add_trace(go.Bar(
+        x=chart_df["SDIV_NAME"],
+        y=chart_df[metric_col],
+        marker_color=COLORS["primary"],
+        texttemplate=(NUMBER_TEMPLATE if metric_col in ["MONTHLY_ENERGY", "MON_UNITS_BILLED", 
+                                                      "MON_UNITS_NET_MET", "ACTIVE_CONS", 
+                                                      "ASSMNT_PRO", "PAY_TOT_PRO"]
+                      else PERCENT_TEMPLATE),
+        textposition='outside',
+        hovertemplate="<b>%{x}</b><br>" +
+                     f"{metric_name}: " +
+                     ("%{y:,.0f}" if metric_col in ["MONTHLY_ENERGY", "MON_UNITS_BILLED", 
+                                                  "MON_UNITS_NET_MET", "ACTIVE_CONS",
+                                                  "ASSMNT_PRO", "PAY_TOT_PRO"]
+                     else "%{y:.1f}%") +
+                     "<extra></extra>"
+    ))
+    
+    # Add threshold line for loss metrics
+    if "Loss" in metric_name:
+        fig.add_hline(
+            y=NEPRA_LOSS_LIMIT,
+            line_dash="dash",
+            line_color=COLORS["danger"],
+            annotation_text=f"NEPRA Limit: {NEPRA_LOSS_LIMIT}%",
+            annotation_position="top right"
+        )
+    
+    fig.update_layout(
+        height=400,
+        xaxis_title="DISCO",
+        yaxis_title=metric_name,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color=COLORS["dark"], size=12),
+        margin=dict(t=50, b=100, l=60, r=30),
+        xaxis_tickangle=-45
+    )
+    
+    return fig
+
+
+def create_time_series_subplots(time_series_data, disco_name):
+    """Three stacked panels: loss & collection, units billed, net metering"""
+    # Only the Deep Insights section draws subplots; keep them off other reruns
+    from plotly.subplots import make_subplots
+
+    x_values = series_x(time_series_data)
+    
+    # Create subplot figure with 3 subplots for better visualization
+    fig = make_subplots(
+        rows=3, cols=1,
+        subplot_titles=[
+            f"{disco_name} - Loss & Collection Trends", 
+            "Units Billed Trend",
+            "Net Metering Trend"
+        ],
+        vertical_spacing=0.15,
+        row_heights=[0.4, 0.3, 0.3]
+    )
+    
+    # Subplot 1: T&D Loss and Collection %
+    # Add T&D Loss trend
+    _, loss_x, loss_y = downsampled(x_values, time_series_data["MON_PERC_LOSS_TD"])
+    fig.add_trace(
+        scatter_class(len(loss_y))(
+            x=loss_x,
+            y=loss_y,
+            mode='lines+markers',
+            name='T&D Loss %',
+            line=dict(color=COLORS["danger"], width=3),
+            marker=dict(size=8),
+            hovertemplate="<b>T&D Loss</b><br>Month: %{x}<br>Value: %{y:.1f}%<extra></extra>"
+        ),
+        row=1, col=1
+    )
+    
+    # Add Collection % trend
+    _, coll_x, coll_y = downsampled(x_values, time_series_data["COLL_PERC"])
+    fig.add_trace(
+        scatter_class(len(coll_y))(
+            x=coll_x,
+            y=coll_y,
+            mode='lines+markers',
+            name='Collection %',
+            line=dict(color=COLORS["success"], width=3),
+            marker=dict(size=8),
+            hovertemplate="<b>Collection %</b><br>Month: %{x}<br>Value: %{y:.1f}%<extra></extra>",
+            yaxis="y2"
+        ),
+        row=1, col=1
+    )
+    
+    # Add NEPRA limit line for T&D Loss
+    fig.add_hline(
+        y=NEPRA_LOSS_LIMIT,
+        line_dash="dash",
+        line_color=COLORS["danger"],
+        annotation_text=f"NEPRA Limit: {NEPRA_LOSS_LIMIT}%",
+        annotation_position="top right",
+        row=1, col=1
+    )
+    
+    # Add 90% target line for Collection
+    fig.add_hline(
+        y=90,
+        line_dash="dash",
+        line_color=COLORS["success"],
+        annotation_text="Target: 90%",
+        annotation_position="bottom right",
+        row=1, col=1
+    )
+    
+    # Subplot 2: Units Billed Trend
+    if "MON_UNITS_BILLED" in time_series_data.columns:
+        # Check if units billed data exists and is not all zeros/NaN
+        if time_series_data["MON_UNITS_BILLED"].notna().any() and time_series_data["MON_UNITS_BILLED"].sum() > 0:
+            # Find appropriate scaling factor
+            max_units = time_series_data["MON_UNITS_BILLED"].max()
+            if max_units >= 1_000_000:
+                scale_factor = 1_000_000
+                scale_label = "M Units"
+            elif max_units >= 1_000:
+                scale_factor = 1_000
+                scale_label = "K Units"
+            else:
+                scale_factor = 1
+                scale_label = "Units"
+            
+            _, units_x, units_y = downsampled(x_values, time_series_data["MON_UNITS_BILLED"] / scale_factor)
+            fig.add_trace(
+                go.Bar(
+                    x=units_x,
+                    y=units_y,
+                    name=f'Units Billed ({scale_label})',
+                    marker_color=COLORS["primary"],
+                    hovertemplate="<b>Units Billed</b><br>Month: %{x}<br>Value: %{y:,.0f} " + scale_label + "<extra></extra>"
+                ),
+                row=2, col=1
+            )
+    
+    # Subplot 3: Net Metering Trend
+    if "MON_UNITS_NET_MET" in time_series_data.columns:
+        # Check if net metering data exists and is not all zeros/NaN
+        if time_series_data["MON_UNITS_NET_MET"].notna().any() and time_series_data["MON_UNITS_NET_MET"].sum() > 0:
+            # Find appropriate scaling factor
+            max_net_meter = time_series_data["MON_UNITS_NET_MET"].max()
+            if max_net_meter >= 1_000_000:
+                scale_factor_nm = 1_000_000
+                scale_label_nm = "M Units"
+            elif max_net_meter >= 1_000:
+                scale_factor_nm = 1_000
+                scale_label_nm = "K Units"
+            else:
+                scale_factor_nm = 1
+                scale_label_nm = "Units"
+            
+            _, nm_x, nm_y = downsampled(x_values, time_series_data["MON_UNITS_NET_MET"] / scale_factor_nm)
+            fig.add_trace(
+                go.Bar(
+                    x=nm_x,
+                    y=nm_y,
+                    name=f'Net Metering ({scale_label_nm})',
+                    marker_color=COLORS["info"],
+                    hovertemplate="<b>Net Metering</b><br>Month: %{x}<br>Value: %{y:,.0f} " + scale_label_nm + "<extra></extra>"
+                ),
+                row=3, col=1
+            )
+    
+    # Update layout
+    fig.update_layout(
+        height=900,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color=COLORS["dark"], size=12),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5
+        ),
+        margin=dict(t=80, b=50, l=60, r=30),
+        showlegend=True
+    )
+    
+    # Update axes for subplot 1 (dual y-axes)
+    fig.update_yaxes(
+        title_text="T&D Loss %",
+        titlefont=dict(color=COLORS["danger"]),
+        tickfont=dict(color=COLORS["danger"]),
+        row=1, col=1
+    )
+    
+    # Add secondary y-axis for Collection %
+    fig.update_layout(
+        yaxis2=dict(
+            title="Collection %",
+            titlefont=dict(color=COLORS["success"]),
+            tickfont=dict(color=COLORS["success"]),
+            anchor="x",
+            overlaying="y",
+            side="right"
+        )
+    )
+    
+    # Update axes for subplot 2 (Units Billed)
+    if "MON_UNITS_BILLED" in time_series_data.columns and time_series_data["MON_UNITS_BILLED"].notna().any():
+        max_units = time_series_data["MON_UNITS_BILLED"].max()
+        if max_units >= 1_000_000:
+            yaxis_title = "Million Units"
+        elif max_units >= 1_000:
+            yaxis_title = "Thousand Units"
+        else:
+            yaxis_title = "Units"
+        
+        fig.update_yaxes(
+            title_text=yaxis_title,
+            row=2, col=1
+        )
+    
+    # Update axes for subplot 3 (Net Metering)
+    if "MON_UNITS_NET_MET" in time_series_data.columns and time_series_data["MON_UNITS_NET_MET"].notna().any():
+        max_net_meter = time_series_data["MON_UNITS_NET_MET"].max()
+        if max_net_meter >= 1_000_000:
+            yaxis_title_nm = "Million Units"
+        elif max_net_meter >= 1_000:
+            yaxis_title_nm = "Thousand Units"
+        else:
+            yaxis_title_nm = "Units"
+        
+        fig.update_yaxes(
+            title_text=yaxis_title_nm,
+            row=3, col=1
+        )
+    
+    # Update x-axes for all subplots
+    fig.update_xaxes(title_text="Month", row=3, col=1)
+    
+    return fig
+
+
+def create_normalized_metrics_chart(time_series_data, disco_name):
+    """Percentages and max-normalized unit series on one dual-axis chart"""
+    x_values = series_x(time_series_data)
+    
+    # Create a multi-line chart for all key metrics
+    fig = go.Figure()
+    
+    # Add T&D Loss (scaled for visibility)
+    _, loss_x, loss_y = downsampled(x_values, time_series_data["MON_PERC_LOSS_TD"])
+    fig.add_trace(scatter_class(len(loss_y))(
+        x=loss_x,
+        y=loss_y,
+        mode='lines+markers',
+        name='T&D Loss %',
+        line=dict(color=COLORS["danger"], width=3),
+        marker=dict(size=8),
+        yaxis='y1'
+    ))
+    
+    # Add Collection %
+    _, coll_x, coll_y = downsampled(x_values, time_series_data["COLL_PERC"])
+    fig.add_trace(scatter_class(len(coll_y))(
+        x=coll_x,
+        y=coll_y,
+        mode='lines+markers',
+        name='Collection %',
+        line=dict(color=COLORS["success"], width=3),
+        marker=dict(size=8),
+        yaxis='y1'
+    ))
+    
+    # Add Units Billed (scaled appropriately)
+    if "MON_UNITS_BILLED" in time_series_data.columns:
+        # Normalize units billed for better visualization
+        if time_series_data["MON_UNITS_BILLED"].max() > 0:
+            units_billed_norm = (time_series_data["MON_UNITS_BILLED"] / time_series_data["MON_UNITS_BILLED"].max()) * 100
+            kept, units_x, units_y = downsampled(x_values, units_billed_norm)
+            fig.add_trace(scatter_class(len(units_y))(
+                x=units_x,
+                y=units_y,
+                mode='lines+markers',
+                name='Units Billed (Normalized %)',
+                line=dict(color=COLORS["primary"], width=2, dash='dot'),
+                marker=dict(size=6),
+                yaxis='y2',
+                customdata=time_series_data["MON_UNITS_BILLED"].to_numpy(dtype="float64", na_value=np.nan)[kept],
+                hovertemplate="<b>Units Billed (Normalized)</b><br>Month: %{x}<br>Value: %{y:.1f}%<br>Actual: " + 
+                             "%{customdata:,.0f}<extra></extra>"
+            ))
+    
+    # Add Net Metering (scaled appropriately)
+    if "MON_UNITS_NET_MET" in time_series_data.columns:
+        # Normalize net metering for better visualization
+        if time_series_data["MON_UNITS_NET_MET"].max() > 0:
+            net_meter_norm = (time_series_data["MON_UNITS_NET_MET"] / time_series_data["MON_UNITS_NET_MET"].max()) * 100
+            kept, nm_x, nm_y = downsampled(x_values, net_meter_norm)
+            fig.add_trace(scatter_class(len(nm_y))(
+                x=nm_x,
+                y=nm_y,
+                mode='lines+markers',
+                name='Net Metering (Normalized %)',
+                line=dict(color=COLORS["info"], width=2, dash='dot'),
+                marker=dict(size=6),
+                yaxis='y2',
+                customdata=time_series_data["MON_UNITS_NET_MET"].to_numpy(dtype="float64", na_value=np.nan)[kept],
+                hovertemplate="<b>Net Metering (Normalized)</b><br>Month: %{x}<br>Value: %{y:.1f}%<br>Actual: " + 
+                             "%{customdata:,.0f}<extra></extra>"
+            ))
+    
+    # Update layout for dual y-axes
+    fig.update_layout(
+        title=f"{disco_name} - All Metrics (Normalized View)",
+        height=500,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color=COLORS["dark"], size=12),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5
+        ),
+        margin=dict(t=80, b=80, l=60, r=60),
+        xaxis=dict(title="Month"),
+        yaxis=dict(
+            title="Percentage (%)",
+            titlefont=dict(color=COLORS["dark"]),
+            tickfont=dict(color=COLORS["dark"])
+        ),
+        yaxis2=dict(
+            title="Normalized Value (%)",
+            titlefont=dict(color=COLORS["primary"]),
+            tickfont=dict(color=COLORS["primary"]),
+            anchor="x",
+            overlaying="y",
+            side="right"
+        ),
+        hovermode='x unified'
+    )
+    
+    return fig
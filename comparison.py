@@ -0,0 +1,88 @@
+"""Period comparison as one (DISCO x month) pivot per metric.
+
+Instead of masking the frame once per comparison month and walking the
+DISCOs in Python, the rows of every requested month are gathered through
+the DISCO/month index in one go and scattered into a dense 2-D array.
+Changes between periods are then plain column arithmetic, and any number
+of comparison periods costs the same single gather.
+"""
+
+import numpy as np
+import pandas as pd
+
+from periods import period_label
+from schema import NAME_COLUMN, PERIOD_COLUMN
+
+
+def comparison_periods(months):
+    """``[(role, period), ...]`` for the latest month, the one before and a year ago.
+
+    ``months`` are the dataset's periods in ascending order. When the month
+    twelve periods back is missing, the third most recent month stands in
+    for it. Returns None with fewer than three months.
+    """
+    if len(months) < 3:
+        return None
+    latest_first = months[::-1]
+    current, previous = latest_first[0], latest_first[1]
+    year_ago = current - 12 if current - 12 in months else latest_first[2]
+    return [("Current", current), ("Prev", previous), ("Year Ago", year_ago)]
+
+
+def period_pivot(df, index, discos, periods, column):
+    """Values of ``column`` with one row per DISCO and one column per period.
+
+    Rows follow ``discos`` and columns follow ``periods``; a DISCO with no
+    row in a month gets NaN there. A (DISCO, month) pair is expected to occur
+    at most once in the dataset.
+    """
+    values = np.full((len(discos), len(periods)), np.nan)
+    if not len(discos) or not len(periods):
+        return pd.DataFrame(values, index=pd.Index(discos, name=NAME_COLUMN), columns=list(periods))
+
+    positions = np.concatenate([index.month_rows(period, discos) for period in periods])
+    rows = df.iloc[positions]
+
+    # Map category codes and period ordinals to pivot cells without a Python loop
+    row_of_code = np.full(len(index.discos), -1, dtype=np.intp)
+    codes = index.codes(discos)
+    row_of_code[codes[codes >= 0]] = np.flatnonzero(codes >= 0)
+    period_order = np.argsort(periods)
+    sorted_periods = np.asarray(periods)[period_order]
+    r = row_of_code[rows[NAME_COLUMN].cat.codes.to_numpy()]
+    c = period_order[np.searchsorted(sorted_periods, rows[PERIOD_COLUMN].to_numpy())]
+    values[r, c] = rows[column].to_numpy(dtype="float64", na_value=np.nan)
+
+    return pd.DataFrame(values, index=pd.Index(discos, name=NAME_COLUMN), columns=list(periods))
+
+
+def period_changes(pivot, reference):
+    """Difference between the ``reference`` column and every other column.
+
+    Returns a frame with the same index and one column per non-reference
+    period, holding ``pivot[reference] - pivot[period]`` (NaN if either side
+    is missing).
+    """
+    others = [col for col in pivot.columns if col != reference]
+    return pivot[others].rsub(pivot[reference], axis=0)
+
+
+def change_table(pivot, comparison):
+    """Per-DISCO values for each comparison period and their change from the first.
+
+    ``pivot`` is a ``period_pivot`` over the periods of ``comparison``
+    (as returned by ``comparison_periods``). Value columns are named by
+    month label, change columns "Δ vs <role>"; DISCOs with no value in any
+    period are dropped.
+    """
+    reference = comparison[0][1]
+    changes = period_changes(pivot, reference)
+    columns = {period_label(reference): pivot[reference]}
+    for role, period in comparison[1:]:
+        columns[period_label(period)] = pivot[period]
+        columns[f"Δ vs {role}"] = changes[period]
+    value_labels = [period_label(period) for _, period in comparison]
+    return (pd.DataFrame(columns)
+            .dropna(how="all", subset=value_labels)
+            .rename_axis("DISCO")
+            .reset_index())
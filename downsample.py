@@ -0,0 +1,74 @@
+"""Bounded-size rendering for long time series.
+
+Monthly data gives a few dozen points per DISCO, but weekly or daily feeder
+readings give thousands, and every point is shipped to the browser and
+drawn as an SVG node. Series longer than ``MAX_POINTS`` are reduced on the
+server with Largest-Triangle-Three-Buckets, which keeps the peaks and dips
+a line chart is read for, and anything still above ``WEBGL_MIN_POINTS`` is
+drawn with ``Scattergl`` instead of ``Scatter``.
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+
+from periods import period_labels
+
+MAX_POINTS = 2000  # Roughly one point per horizontal pixel of a wide chart
+WEBGL_MIN_POINTS = 1000
+
+
+def lttb_indices(y, n_out, x=None):
+    """Row positions kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept; in between, each bucket keeps
+    the point forming the largest triangle with the previously kept point
+    and the average of the next bucket. ``x`` defaults to evenly spaced
+    positions. NaN values are never preferred over real ones.
+    """
+    y = np.asarray(y, dtype="float64")
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype="float64") if x is None else np.asarray(x, dtype="float64")
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    kept = np.empty(n_out, dtype=np.intp)
+    kept[0], kept[-1] = 0, n - 1
+    anchor = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        following = slice(edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else slice(n - 1, n)
+        next_y = y[following]
+        next_y = next_y[~np.isnan(next_y)]
+        avg_x = x[following].mean()
+        avg_y = next_y.mean() if len(next_y) else y[anchor]
+
+        area = np.abs((x[anchor] - avg_x) * (y[lo:hi] - y[anchor])
+                      - (x[anchor] - x[lo:hi]) * (avg_y - y[anchor]))
+        anchor = lo + int(np.argmax(np.where(np.isnan(area), -1.0, area)))
+        kept[i + 1] = anchor
+    return kept
+
+
+def series_x(data):
+    """X values for a DISCO's series: month labels, or timestamps when sub-monthly.
+
+    Month labels make a categorical axis, which only works with one row per
+    month and when every trace keeps the same points. Longer or sub-monthly
+    series are plotted on the BILLING_MONTH time axis instead.
+    """
+    if len(data) <= MAX_POINTS and data["PERIOD"].is_unique:
+        return period_labels(data["PERIOD"])
+    return data["BILLING_MONTH"].to_numpy()
+
+
+def downsampled(x, values, max_points=MAX_POINTS):
+    """``(positions, x, y)`` of a series reduced to at most ``max_points`` points"""
+    y = np.asarray(values, dtype="float64")
+    positions = lttb_indices(y, max_points)
+    return positions, np.asarray(x)[positions], y[positions]
+
+
+def scatter_class(n_points):
+    """``go.Scattergl`` for long series, ``go.Scatter`` otherwise"""
+    return go.Scattergl if n_points >= WEBGL_MIN_POINTS else go.Scatter
@@ -0,0 +1,106 @@
+"""Process-wide memo of built Plotly figures.
+
+Building a figure (trace validation, ``make_subplots`` layout, per-point
+labels) is a large share of a rerun, yet most reruns redraw charts whose
+inputs did not change. Figures are cached under a key made of the dataset
+content hash, a chart id and the chart's parameters, so an unchanged chart
+is taken from the cache instead of being rebuilt.
+
+Cached figures are shared between sessions and must not be mutated by
+callers; ``st.plotly_chart`` only reads them.
+
+A subdivision-level scatter carries one trace per name, so a single chart
+can hold several MB where a pie holds a few KB. The cache is therefore
+bounded by the estimated size of its figures as well as by their count.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Property objects Plotly keeps per trace on top of the trace's own data;
+# 1-1.5 KB measured with tracemalloc on the performance matrix, rounded up
+TRACE_OVERHEAD_BYTES = 4 * 1024
+
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return sys.getsizeof(value) + sum(_nbytes(item) for item in value.flat)
+        return sys.getsizeof(value) + value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_nbytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def figure_nbytes(fig):
+    """Estimated memory held by a figure: its property tree plus a per-trace overhead"""
+    spec = fig.to_plotly_json()
+    return _nbytes(spec) + TRACE_OVERHEAD_BYTES * len(spec.get("data", ()))
+
+
+class FigureCache:
+    """LRU of Plotly figures bounded by entry count and estimated bytes, with hit/miss counters.
+
+    A figure larger than ``max_bytes`` on its own is returned but not kept.
+    """
+
+    def __init__(self, max_entries, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        """Return the figure cached under ``key``, calling ``build()`` on a miss.
+
+        ``key`` must be hashable; lists of DISCOs should be passed as tuples.
+        The build runs outside the lock, so two sessions missing on the same
+        key at once may both build it; the first result stored wins.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        fig = build()
+        nbytes = figure_nbytes(fig) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return fig
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key][0]
+            self._entries[key] = (fig, nbytes)
+            self.nbytes += nbytes
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and self.nbytes > self.max_bytes):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+        return fig
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,19 @@
+"""Upload file types the dashboard accepts, and what can be read of them cheaply.
+
+Kept apart from ``ingest`` so the upload form can be drawn, and a
+workbook's sheets listed, before pandas and the Excel and Arrow readers are
+imported. Only the standard library is used here.
+"""
+
+import zipfile
+from xml.etree import ElementTree
+
+SNAPSHOT_EXTENSIONS = ("feather", "arrow", "parquet")
+UPLOAD_TYPES = ("xlsx", "csv", *SNAPSHOT_EXTENSIONS)
+
+
+def workbook_sheets(buffer):
+    """Sheet names of an xlsx workbook in tab order, read from its workbook part only"""
+    with zipfile.ZipFile(buffer) as archive:
+        root = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    return [element.get("name") for element in root.iter() if element.tag.rpartition("}")[2] == "sheet"]
@@ -0,0 +1,75 @@
+"""Number formatting for KPI cards, chart labels and hover text.
+
+``format_number`` formats a single value for a card or metric. Chart labels
+go through the array versions, which pick the K/M/B scale for every value
+at once with NumPy instead of calling a Python function per bar. Where a
+chart can format on the client, the ``*_TEMPLATE`` strings hand the work
+to Plotly's ``texttemplate``/``hovertemplate`` and no labels are built on
+the server at all.
+"""
+
+import numpy as np
+import pandas as pd
+
+# d3-format templates for Plotly to apply in the browser
+NUMBER_TEMPLATE = "%{y:,.0f}"
+PERCENT_TEMPLATE = "%{y:.1f}%"
+
+_SCALES = np.array([1_000_000_000, 1_000_000, 1_000])
+_SUFFIXES = np.array(["B", "M", "K"])
+
+
+def format_number(num, include_sign=False):
+    """Format numbers for executive display"""
+    if pd.isna(num):
+        return "N/A"
+
+    num_abs = abs(num)
+    if num_abs >= 1_000_000_000:
+        formatted = f"{num/1_000_000_000:.1f}B"
+    elif num_abs >= 1_000_000:
+        formatted = f"{num/1_000_000:.1f}M"
+    elif num_abs >= 1_000:
+        formatted = f"{num/1_000:.1f}K"
+    else:
+        formatted = f"{num:,.0f}"
+
+    if include_sign and num != 0:
+        sign = "+" if num > 0 else ""
+        return f"{sign}{formatted}"
+    return formatted
+
+
+def format_numbers(values, include_sign=False):
+    """Vectorized ``format_number`` over an array, returning an array of str"""
+    values = np.asarray(values, dtype="float64")
+    if values.size == 0:
+        return values.astype(object)
+    magnitude = np.abs(values)
+    scaled = magnitude[..., None] >= _SCALES
+    has_scale = scaled.any(axis=-1)
+    # First matching threshold wins, mirroring the if/elif chain above
+    scale_idx = np.argmax(scaled, axis=-1)
+    divisor = np.where(has_scale, _SCALES[scale_idx], 1)
+    suffix = np.where(has_scale, _SUFFIXES[scale_idx], "")
+
+    # Below 1,000 the only value that needs a thousands separator is one
+    # that rounds up to exactly 1,000; everything else matches ",.0f"
+    unscaled = np.char.replace(np.char.mod("%.0f", values), "1000", "1,000")
+    text = np.where(
+        has_scale,
+        np.char.mod("%.1f", values / divisor),
+        unscaled,
+    ).astype(object) + suffix
+    if include_sign:
+        text = np.where(values > 0, "+" + text, text)
+    return np.where(np.isnan(values), "N/A", text)
+
+
+def format_percents(values, decimals=1):
+    """Vectorized ``f"{v:.1f}%"`` over an array, with "N/A" for missing values"""
+    values = np.asarray(values, dtype="float64")
+    if values.size == 0:
+        return values.astype(object)
+    text = np.char.mod(f"%.{decimals}f%%", values).astype(object)
+    return np.where(np.isnan(values), "N/A", text)
@@ -0,0 +1,77 @@
+"""Row-offset index over a dataset sorted by (SDIV_NAME, PERIOD).
+
+Ingestion leaves the prepped frame sorted DISCO-major, so every DISCO owns
+one contiguous block of rows with its months in ascending order. Selecting
+"one DISCO over a window" is then a binary search inside that block, and
+"several DISCOs over a window" is a handful of such slices stitched into a
+single ``iloc`` gather, instead of a boolean mask over the whole frame.
+
+A second, month-major permutation answers "all DISCOs in one month" the
+same way without re-sorting the frame.
+"""
+
+import numpy as np
+
+from schema import NAME_COLUMN, PERIOD_COLUMN
+
+
+class DiscoMonthIndex:
+    """Offsets into a frame sorted by categorical SDIV_NAME, then PERIOD.
+
+    Built once per dataset; holds only integer arrays, never a copy of the
+    frame. Lookups return positional row arrays for ``df.iloc``.
+    """
+
+    def __init__(self, df):
+        names = df[NAME_COLUMN]
+        self.discos = list(names.cat.categories)
+        self._position = {disco: i for i, disco in enumerate(self.discos)}
+        self._codes = names.cat.codes.to_numpy()
+        self._periods = df[PERIOD_COLUMN].to_numpy()
+
+        # Missing names sort last (code -1), so they never fall inside a block
+        counts = np.bincount(self._codes[self._codes >= 0], minlength=len(self.discos))
+        self._bounds = np.concatenate(([0], np.cumsum(counts)))
+
+        self._by_period = np.lexsort((self._codes, self._periods))
+        self._period_sorted = self._periods[self._by_period]
+
+    def __len__(self):
+        return len(self._periods)
+
+    def codes(self, discos):
+        """Category codes of ``discos`` (-1 for names not in the dataset)"""
+        return np.array([self._position.get(d, -1) for d in discos], dtype=np.intp)
+
+    def disco_slice(self, disco, start, end):
+        """Contiguous row slice for one DISCO between two periods (inclusive)"""
+        i = self._position.get(disco)
+        if i is None:
+            return slice(0, 0)
+        lo, hi = self._bounds[i], self._bounds[i + 1]
+        block = self._periods[lo:hi]
+        return slice(lo + np.searchsorted(block, start, side="left"),
+                     lo + np.searchsorted(block, end, side="right"))
+
+    def rows(self, discos, start, end):
+        """Row positions for the given DISCOs between two periods, DISCO-major"""
+        slices = [self.disco_slice(disco, start, end) for disco in discos]
+        if not slices:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate([np.arange(s.start, s.stop) for s in slices])
+
+    def month_rows(self, period, discos=None):
+        """Row positions of every (or the given) DISCO in a single month"""
+        lo = np.searchsorted(self._period_sorted, period, side="left")
+        hi = np.searchsorted(self._period_sorted, period, side="right")
+        positions = self._by_period[lo:hi]
+        if discos is not None:
+            wanted = [self._position[d] for d in discos if d in self._position]
+            positions = positions[np.isin(self._codes[positions], wanted)]
+        return positions
+
+    def select(self, df, discos, start, end):
+        """Rows of ``df`` for ``discos`` between two periods, ordered by DISCO then month"""
+        if start == end:
+            return df.iloc[self.month_rows(start, discos)]
+        return df.iloc[self.rows(discos, start, end)]
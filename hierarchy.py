@@ -0,0 +1,131 @@
+"""Organisational hierarchy above SDIV_NAME, with one pre-aggregated frame per level.
+
+Exports that carry the ``HIERARCHY_COLUMNS`` (DISCO, circle, division) are
+viewed top-down: the dashboard opens on one row per DISCO and drills into
+circles, divisions and finally subdivisions. Each level above the
+subdivisions is rolled up once per dataset into a monthly frame shaped like
+the prepped dataset, with the level's names in SDIV_NAME. The index, cube
+and chart code therefore runs on any level unchanged and never regroups
+subdivision rows. Exports without these columns have a single level and
+look exactly as before.
+
+Names are assumed unique within a level, as SDIV_NAME already is.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ingest import prepare
+from schema import (
+    DATE_COLUMN,
+    HIERARCHY_COLUMNS,
+    LEVEL_AGG,
+    LEVEL_ATC,
+    LEVEL_RATIOS,
+    NAME_COLUMN,
+    PERIOD_COLUMN,
+)
+
+LEVEL_LABELS = {
+    "DISCO_NAME": "DISCO",
+    "CIRCLE_NAME": "Circle",
+    "DIV_NAME": "Division",
+    NAME_COLUMN: "Subdivision",
+}
+
+
+class Hierarchy:
+    """Levels present in a prepped frame, outermost first, ending at SDIV_NAME.
+
+    Level ``i`` is ``columns[i]``. ``frame(i)`` is that level's monthly
+    roll-up (the dataset itself for the last level) and ``children(i,
+    parent)`` the names at level ``i`` under a name at level ``i - 1``. A
+    name's parent is the one on its latest row, so a subdivision moved
+    between divisions is listed under its current division. Subdivisions
+    missing a parent name are left out of the drill-down.
+    """
+
+    def __init__(self, df):
+        self.columns = [col for col in HIERARCHY_COLUMNS if col in df.columns] + [NAME_COLUMN]
+        self._frames = {len(self.columns) - 1: df}
+        self._children = {}
+
+        # Latest row per leaf, carrying every level's name for it
+        latest = df.drop_duplicates(NAME_COLUMN, keep="last")[self.columns].dropna()
+        for level, col in enumerate(self.columns):
+            names = latest[col].astype(str)
+            if level == 0:
+                self._children[(0, None)] = sorted(names.unique())
+                continue
+            parents = latest[self.columns[level - 1]].astype(str)
+            for parent, group in names.groupby(parents.to_numpy(), sort=False):
+                self._children[(level, parent)] = sorted(group.unique())
+
+        for level, col in enumerate(self.columns[:-1]):
+            self._frames[level] = level_frame(df, col)
+
+    @property
+    def depth(self):
+        return len(self.columns)
+
+    def label(self, level):
+        # Flat exports list DISCOs under SDIV_NAME, as the dashboard always named them
+        if self.depth == 1:
+            return "DISCO"
+        col = self.columns[level]
+        return LEVEL_LABELS.get(col, col)
+
+    def frame(self, level):
+        return self._frames[level]
+
+    def children(self, level, parent=None):
+        """Names at ``level`` under ``parent`` (a name at ``level - 1``), sorted"""
+        return self._children.get((level, None if level == 0 else parent), [])
+
+    def valid_path(self, path):
+        """Longest prefix of ``path`` (names from the top level down) that exists"""
+        valid = []
+        for level, name in enumerate(path[:self.depth - 1]):
+            if name not in self.children(level, valid[-1] if valid else None):
+                break
+            valid.append(name)
+        return valid
+
+
+def level_frame(df, column):
+    """Monthly roll-up of the subdivision rows to ``column``, shaped like the dataset.
+
+    Units and energy are summed across the level's subdivisions (including
+    the PRO_*/cumulative columns, which are totals per subdivision), per
+    ``LEVEL_AGG``. Loss and collection percentages are recomputed from the
+    summed units and amounts (``LEVEL_RATIOS``, ``LEVEL_ATC``) when the
+    export has them and averaged otherwise. The result goes through DATA
+    PREP so it has the same derived columns, dtypes and row order.
+    """
+    agg = {col: how for col, how in LEVEL_AGG.items()
+           if col in df.columns and pd.api.types.is_numeric_dtype(df[col])}
+    values = df[[column, PERIOD_COLUMN, *agg]]
+    sparse = {col: values[col].sparse.to_dense() for col in agg
+              if isinstance(values[col].dtype, pd.SparseDtype)}
+    grouped = (values.assign(**sparse)
+               .groupby([column, PERIOD_COLUMN], observed=True, sort=False)
+               .agg(agg)
+               .reset_index())
+    for col, parts in LEVEL_RATIOS.items():
+        if col in agg and all(part in agg for part in parts):
+            grouped[col] = 100 * _ratio(grouped, *parts)
+    for col, (loss, collection) in LEVEL_ATC.items():
+        if col in agg and all(part in agg for part in (*loss, *collection)):
+            grouped[col] = 100 - 100 * (1 - _ratio(grouped, *loss)) * _ratio(grouped, *collection)
+    periods = grouped[PERIOD_COLUMN]
+    grouped[DATE_COLUMN] = pd.to_datetime(
+        pd.DataFrame({"year": periods // 12, "month": periods % 12 + 1, "day": 1}))
+    grouped = grouped.drop(columns=PERIOD_COLUMN).rename(columns={column: NAME_COLUMN})
+    grouped[NAME_COLUMN] = grouped[NAME_COLUMN].astype(str)
+    return prepare(grouped)
+
+
+def _ratio(frame, numerator, denominator):
+    # Levels with nothing received or assessed have no percentage, not inf
+    denominator = frame[denominator].where(frame[denominator] != 0)
+    return (frame[numerator] / denominator).astype("float64").replace([np.inf, -np.inf], np.nan)
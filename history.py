@@ -0,0 +1,280 @@
+"""Persisted month-by-month history for incremental monthly refreshes.
+
+Instead of re-uploading the whole multi-year export every month, the
+dashboard can keep its history on disk and take only the new month(s). Each
+billing month is stored as its own Feather partition of the raw dashboard
+columns, next to a JSON manifest listing the months with a content hash per
+partition.
+
+An append parses, validates and preps only the uploaded rows. If the
+previous history is still in the dataset cache, the new months are merged
+into it, so a monthly refresh costs one month of parsing plus a sort of the
+combined rows instead of a full reload. ``version(start, end)`` combines the
+hashes of the months in a window; results cached under it stay valid across
+appends that fall outside that window.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ingest import (
+    check_schemas,
+    content_hash,
+    frame_nbytes,
+    prepare,
+    read_frame,
+    read_snapshot,
+    snapshot_path,
+    write_snapshot,
+)
+from periods import period_label, period_timestamp, to_period
+from schema import DATE_COLUMN, NAME_COLUMN, PERIOD_COLUMN, REQUIRED_COLUMNS, USED_COLUMNS
+from stage_ledger import StageLedger
+
+MANIFEST_VERSION = 1  # Bump when the manifest layout changes
+
+
+def month_key(period):
+    """Partition name of a period ordinal, e.g. "2024-03" """
+    return period_timestamp(period).strftime("%Y-%m")
+
+
+def _partition_key(period, entry):
+    # Stores written before partitions carried their own key used the bare month
+    return entry.get("key", month_key(period))
+
+
+class HistoryStore:
+    """Directory of per-month partitions described by ``manifest.json``.
+
+    The manifest records the dashboard columns the history carries and, per
+    period ordinal, the partition's file key, content hash, row count and
+    size on disk. A replaced month gets a new file next to the old one, and
+    every partition of an append is written before the manifest is swapped
+    in, so a reader or a failed append never sees a month listed with rows
+    other than the ones its hash describes.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._manifest = self._read_manifest()
+
+    @property
+    def _manifest_path(self):
+        return self.root / "manifest.json"
+
+    def _read_manifest(self):
+        try:
+            manifest = json.loads(self._manifest_path.read_text())
+        except FileNotFoundError:
+            return {"version": MANIFEST_VERSION, "columns": None, "months": {}}
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported history manifest version in {self._manifest_path}")
+        manifest["months"] = {int(period): entry for period, entry in manifest["months"].items()}
+        return manifest
+
+    def _write_manifest(self, manifest):
+        data = {**manifest, "months": {str(p): e for p, e in sorted(manifest["months"].items())}}
+        tmp_path = self._manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(data, indent=1))
+        os.replace(tmp_path, self._manifest_path)
+
+    @property
+    def months(self):
+        """Stored period ordinals, oldest first"""
+        return sorted(self._manifest["months"])
+
+    @property
+    def month_hashes(self):
+        """Content hash of each stored month's partition, by period ordinal"""
+        return {period: entry["hash"] for period, entry in self._manifest["months"].items()}
+
+    @property
+    def columns(self):
+        return self._manifest["columns"]
+
+    def version(self, start=None, end=None):
+        """Content key of the stored months between two periods (inclusive), or of all"""
+        months = self._manifest["months"]
+        parts = [f"{period}:{months[period]['hash']}" for period in sorted(months)
+                 if (start is None or period >= start) and (end is None or period <= end)]
+        return content_hash("|".join(parts).encode())
+
+    def read(self):
+        """Raw rows of every stored month, oldest month first"""
+        frames = []
+        for period in self.months:
+            frame = read_snapshot(self.root, _partition_key(period, self._manifest["months"][period]))
+            if frame is None:
+                raise FileNotFoundError(f"History partition for {period_label(period)} is missing")
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=USED_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def clean(self, raw):
+        """Validated copy of uploaded rows, projected to the dashboard columns.
+
+        Raises ValueError when required columns are missing, when the columns
+        differ from the stored history or when a (name, month) pair repeats.
+        Rows without a billing month are dropped, as DATA PREP does.
+        """
+        missing = [col for col in REQUIRED_COLUMNS if col not in raw.columns]
+        if missing:
+            raise ValueError(f"Upload lacks required columns {', '.join(missing)}")
+        rows = raw[[col for col in USED_COLUMNS if col in raw.columns]].copy()
+        if self.columns is not None:
+            check_schemas({"stored history": pd.DataFrame(columns=self.columns), "upload": rows})
+        rows[DATE_COLUMN] = pd.to_datetime(rows[DATE_COLUMN])
+        rows = rows.dropna(subset=[DATE_COLUMN]).reset_index(drop=True)
+        if rows.empty:
+            raise ValueError("Upload has no rows with a billing month")
+        duplicates = rows.duplicated([NAME_COLUMN, DATE_COLUMN])
+        if duplicates.any():
+            raise ValueError(f"Upload repeats {int(duplicates.sum())} (name, month) row(s)")
+        return rows
+
+    def append(self, rows, replace=False):
+        """Store cleaned ``rows`` as month partitions; returns the periods written.
+
+        Months already in the history are rejected with ValueError unless
+        ``replace`` is set, in which case their partitions are overwritten.
+        """
+        periods = to_period(rows[DATE_COLUMN]).to_numpy()
+        with self._lock:
+            stored = sorted(set(np.unique(periods).tolist()) & self._manifest["months"].keys())
+            if stored and not replace:
+                raise ValueError("Already in the history: " + ", ".join(period_label(p) for p in stored))
+            manifest = {**self._manifest, "months": dict(self._manifest["months"])}
+            manifest["columns"] = manifest["columns"] or list(rows.columns)
+            written, paths = [], []
+            try:
+                # Every month goes to a new file first; none is listed until all are stored
+                for period in np.unique(periods).tolist():
+                    month_rows = rows[periods == period].reset_index(drop=True)
+                    staged = write_snapshot(self.root, f"{month_key(period)}.{os.getpid()}.staged", month_rows)
+                    if staged is None:
+                        raise ValueError(f"Rows for {period_label(period)} could not be stored "
+                                         "(columns with mixed value types?)")
+                    paths.append(staged)
+                    digest = content_hash(staged.read_bytes())
+                    entry = {"key": f"{month_key(period)}.{digest}", "hash": digest,
+                             "rows": len(month_rows), "bytes": staged.stat().st_size}
+                    path = snapshot_path(self.root, entry["key"])
+                    os.replace(staged, path)
+                    paths[-1] = path
+                    manifest["months"][period] = entry
+                    written.append(period)
+                self._write_manifest(manifest)
+            except BaseException:
+                current = {snapshot_path(self.root, _partition_key(p, e))
+                           for p, e in self._manifest["months"].items()}
+                for path in paths:
+                    if path not in current:
+                        path.unlink(missing_ok=True)
+                raise
+            # Replaced months' old files are unreferenced once the manifest is in place
+            for period in stored:
+                old = snapshot_path(self.root, _partition_key(period, self._manifest["months"][period]))
+                if old != snapshot_path(self.root, manifest["months"][period]["key"]):
+                    old.unlink(missing_ok=True)
+            self._manifest = manifest
+        return written
+
+    def stats(self):
+        months = self._manifest["months"]
+        return {
+            "months": len(months),
+            "first": min(months, default=None),
+            "last": max(months, default=None),
+            "rows": sum(entry["rows"] for entry in months.values()),
+            "bytes": sum(entry["bytes"] for entry in months.values()),
+        }
+
+
+def merge_months(df, chunk):
+    """Prepped history ``df`` with the months of prepped ``chunk`` added or replaced.
+
+    ``chunk`` is cast to the dtypes ``df`` settled on at ingest (categories
+    are unioned), and the result comes back sorted by (SDIV_NAME, PERIOD)
+    like ``prepare`` leaves it. Returns None when a column cannot be cast,
+    e.g. a metric that is numeric in the history but not in the upload.
+    """
+    replaced = df[PERIOD_COLUMN].isin(chunk[PERIOD_COLUMN].unique())
+    if replaced.any():
+        df = df[~replaced]
+    aligned, columns = {}, {}
+    try:
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                categories = df[col].cat.categories.union(chunk[col].cat.categories)
+                columns[col] = df[col].cat.set_categories(categories)
+                aligned[col] = chunk[col].cat.set_categories(categories)
+            elif chunk[col].dtype != df[col].dtype:
+                aligned[col] = chunk[col].astype(df[col].dtype)
+    except (KeyError, TypeError, ValueError):
+        return None
+    merged = pd.concat([df.assign(**columns), chunk.assign(**aligned)], ignore_index=True)
+
+    # Missing names go last, as in prepare's sort
+    codes = merged[NAME_COLUMN].cat.codes.to_numpy()
+    codes = np.where(codes < 0, len(merged[NAME_COLUMN].cat.categories), codes)
+    order = np.lexsort((merged[PERIOD_COLUMN].to_numpy(), codes))
+    merged = merged.take(order).reset_index(drop=True)
+    merged.attrs = {"memory_report": {
+        "before": df.attrs.get("memory_report", {}).get("before", 0)
+        + chunk.attrs.get("memory_report", {}).get("before", 0),
+        "after": frame_nbytes(merged),
+    }}
+    return merged
+
+
+def load_history(store, cache, ledger=None):
+    """``(key, df)`` for the whole history, prepped and cached under ``store.version()``"""
+    if ledger is None:
+        ledger = StageLedger()
+    key = store.version()
+    df = cache.get(key)
+    if df is None:
+        with ledger.stage("load"):
+            raw = store.read()
+        with ledger.stage("prep"):
+            df = prepare(raw)
+            del raw
+        cache.put(key, df)
+    return key, df
+
+
+def append_files(store, files, cache, replace=False, ledger=None, sheets=None):
+    """Append uploaded month(s) to ``store``; returns the periods written.
+
+    ``files`` is a list of ``(name, bytes)`` holding only the new months;
+    ``sheets`` limits workbooks to the named sheets.
+    Only their rows are parsed and prepped. When the current history is in
+    ``cache`` the new months are merged into it and the result cached under
+    the new version, so the following ``load_history`` is a cache hit;
+    otherwise the next ``load_history`` reads the whole store.
+    """
+    if ledger is None:
+        ledger = StageLedger()
+    with ledger.stage("parse"):
+        frames = {name: read_frame(name, data, sheets=sheets) for name, data in files}
+        if len(frames) > 1:
+            check_schemas(frames)
+        rows = store.clean(pd.concat(frames.values(), ignore_index=True))
+        del frames
+    previous = cache.get(store.version()) if store.months else None
+    with ledger.stage("store"):
+        written = store.append(rows, replace=replace)
+    if previous is not None:
+        with ledger.stage("merge"):
+            merged = merge_months(previous, prepare(rows))
+        if merged is not None:
+            cache.put(store.version(), merged)
+    return written
@@ -0,0 +1,651 @@
+"""Upload ingestion for the DISCO dashboard.
+
+Parsing the uploaded workbook and running DATA PREP is the most expensive
+part of a rerun, and Streamlit reruns the whole script on every widget
+click. Everything here is keyed by a hash of the uploaded bytes so a given
+file is parsed and prepped once per process, no matter how many reruns or
+sessions ask for it.
+"""
+
+import hashlib
+import importlib.util
+import io
+import os
+import multiprocessing
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from file_types import SNAPSHOT_EXTENSIONS, workbook_sheets
+from stage_ledger import StageLedger
+from periods import to_period
+from schema import (
+    CALENDAR_DTYPES,
+    CATEGORY_COLUMNS,
+    CSV_DTYPES,
+    DATE_COLUMN,
+    FLOAT32_COLUMNS,
+    METRIC_COLUMNS,
+    NAME_COLUMN,
+    PERIOD_COLUMN,
+    REQUIRED_COLUMNS,
+    SPARSE_COLUMNS,
+    SPARSE_MIN_ZERO_FRACTION,
+    USED_COLUMNS,
+)
+
+SNAPSHOT_VERSION = 1  # Bump when the snapshot layout changes to orphan old files
+CHUNKED_CSV_MIN_BYTES = 64 * 1024**2  # CSVs above this size are streamed in chunks
+CSV_CHUNK_ROWS = 200_000
+PARSE_WORKERS = 4  # Processes parsing the workbooks of a multi-file upload in parallel
+PARALLEL_PARSE_MIN_BYTES = 8 * 1024**2  # Workbook bytes below which worker start-up costs more than it saves
+# Excel readers tried in order; the first that is installed and parses the workbook wins
+EXCEL_ENGINES = ("calamine", "openpyxl-streaming", "openpyxl")
+# Optional: pip install python-calamine. Checked without importing it, since
+# the Excel engines are only loaded once a workbook is read
+CALAMINE_AVAILABLE = importlib.util.find_spec("python_calamine") is not None
+
+
+def content_hash(data):
+    """Stable key for an upload, derived from its raw bytes"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def frame_nbytes(df):
+    """Deep memory footprint of a frame in bytes"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def read_frame(name, data, progress=None, sheets=None):
+    """Parse uploaded bytes into a raw DataFrame based on the file extension.
+
+    ``progress`` is an optional callable taking a completion fraction in
+    [0, 1]; it is only driven by the chunked CSV reader. ``sheets`` limits
+    a workbook to the named sheets (see ``read_workbook``).
+    """
+    lowered = name.lower()
+    if lowered.endswith(SNAPSHOT_EXTENSIONS):
+        return read_columnar(lowered, data)
+    buffer = io.BytesIO(data)
+    if lowered.endswith("xlsx"):
+        return read_workbook(buffer, sheets=sheets)
+    if len(data) >= CHUNKED_CSV_MIN_BYTES:
+        return read_csv_chunked(buffer, len(data), progress=progress)
+    return pd.read_csv(buffer)
+
+
+def _read_excel_calamine(buffer, sheets):
+    return pd.read_excel(buffer, sheet_name=sheets, engine="calamine",
+                         usecols=lambda col: col in USED_COLUMNS)
+
+
+def _read_excel_streaming(buffer, sheets):
+    import openpyxl
+
+    # Read-only mode streams rows from the sheet XML instead of building every
+    # cell object; only the header's dashboard columns are kept
+    workbook = openpyxl.load_workbook(buffer, read_only=True, data_only=True)
+    try:
+        frames = {}
+        for name in sheets:
+            rows = workbook[name].iter_rows(values_only=True)
+            header = next(rows, ())
+            keep = {}
+            for i, col in enumerate(header):
+                if col in USED_COLUMNS and col not in keep.values():
+                    keep[i] = col
+            width = max(keep, default=-1) + 1
+            columns = {col: [] for col in keep.values()}
+            for row in rows:
+                row = row[:width] + (None,) * (width - len(row))
+                for i, col in keep.items():
+                    columns[col].append(row[i])
+            # Blank rows at the end of a sheet come back as all-None
+            frames[name] = pd.DataFrame(columns).dropna(how="all").reset_index(drop=True)
+        return frames
+    finally:
+        workbook.close()
+
+
+def _read_excel_openpyxl(buffer, sheets):
+    return pd.read_excel(buffer, sheet_name=sheets, engine="openpyxl")
+
+
+EXCEL_READERS = {
+    "calamine": _read_excel_calamine,
+    "openpyxl-streaming": _read_excel_streaming,
+    "openpyxl": _read_excel_openpyxl,
+}
+
+
+def read_excel_sheets(buffer, sheets, engines=EXCEL_ENGINES):
+    """``{sheet: raw frame}`` from the first engine in ``engines`` that can read them.
+
+    calamine is skipped when python-calamine is not installed. An engine
+    that fails on the workbook hands over to the next one; if all fail,
+    ValueError carries each engine's error.
+    """
+    errors = []
+    for engine in engines:
+        if engine == "calamine" and not CALAMINE_AVAILABLE:
+            continue
+        buffer.seek(0)
+        try:
+            return EXCEL_READERS[engine](buffer, sheets)
+        except Exception as e:  # Engines raise their own types for files they cannot parse
+            errors.append(f"{engine}: {e}")
+    raise ValueError("Could not read the workbook (" + "; ".join(errors) + ")")
+
+
+def read_workbook(buffer, sheets=None, engines=EXCEL_ENGINES):
+    """Every sheet of a workbook that has the required columns, stacked.
+
+    ``sheets`` restricts reading to the named sheets; names the workbook
+    does not have are ignored. Sheets without ``REQUIRED_COLUMNS`` (notes,
+    pivots, cover pages) are skipped; the remaining sheets must agree on
+    which dashboard columns they carry.
+    """
+    names = workbook_sheets(buffer)
+    if sheets is not None:
+        names = [name for name in names if name in sheets]
+    frames = read_excel_sheets(buffer, names, engines=engines) if names else {}
+    usable = {name: sheet for name, sheet in frames.items()
+              if set(REQUIRED_COLUMNS) <= set(sheet.columns)}
+    if not usable:
+        raise ValueError(f"No {'selected ' if sheets is not None else ''}sheet has the required columns "
+                         f"{', '.join(REQUIRED_COLUMNS)}")
+    check_schemas({f"sheet '{name}'": sheet for name, sheet in usable.items()})
+    frames = list(usable.values())
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def check_schemas(parts):
+    """Raise ValueError unless every part has the same dashboard columns.
+
+    ``parts`` maps a label (file or sheet name) to a raw frame. Columns the
+    dashboard does not read are ignored.
+    """
+    columns = {label: set(frame.columns) & set(USED_COLUMNS) for label, frame in parts.items()}
+    expected = set(REQUIRED_COLUMNS).union(*columns.values())
+    problems = []
+    for label, present in columns.items():
+        absent = [col for col in USED_COLUMNS if col in expected and col not in present]
+        if absent:
+            problems.append(f"{label} lacks {', '.join(absent)}")
+    if problems:
+        raise ValueError("Inconsistent columns across the upload: " + "; ".join(problems))
+
+
+def parse_upload(name, data, sheets=None):
+    """``(frame, seconds)`` for one uploaded file; picklable for a worker process"""
+    start = time.perf_counter()
+    frame = read_frame(name, data, sheets=sheets)
+    return frame, time.perf_counter() - start
+
+
+def read_csv_chunked(buffer, total_bytes, chunk_rows=CSV_CHUNK_ROWS, progress=None):
+    """Stream a large CSV keeping only the columns the dashboard reads.
+
+    Each chunk is parsed, its metrics cast to float64 and its dates converted
+    before the next chunk is read, so the transient parse cost is bounded by
+    ``chunk_rows`` and only the compact, projected chunks accumulate.
+
+    A metric column with a cell that is not a number (e.g. "n.a.") keeps its
+    text, as the unchunked read leaves it: such a column comes back as
+    object dtype and ``compact`` leaves it alone. Unparseable billing months
+    become NaT, and DATA PREP drops those rows.
+    """
+    reader = pd.read_csv(
+        buffer,
+        usecols=lambda col: col in USED_COLUMNS,
+        dtype=CSV_DTYPES,
+        chunksize=chunk_rows,
+    )
+    chunks = []
+    text_columns = set()
+    with reader:
+        for chunk in reader:
+            chunk[DATE_COLUMN] = pd.to_datetime(chunk[DATE_COLUMN], errors="coerce")
+            for col in METRIC_COLUMNS:
+                if col in chunk.columns and col not in text_columns:
+                    values = _chunk_metric(chunk[col])
+                    if values is None:
+                        text_columns.add(col)
+                    else:
+                        chunk[col] = values
+            chunks.append(chunk)
+            if progress is not None:
+                progress(min(buffer.tell() / total_bytes, 1.0))
+    if not chunks:
+        return pd.DataFrame(columns=USED_COLUMNS)
+    if text_columns:
+        # Numbers from earlier chunks and text from later ones share one column
+        chunks = [chunk.astype({col: object for col in text_columns if col in chunk.columns})
+                  for chunk in chunks]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _chunk_metric(values):
+    """A chunk's metric column as float64, or None if a cell is not a number"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype("float64")
+    numbers = pd.to_numeric(values, errors="coerce")
+    if (numbers.isna() & values.notna()).any():
+        return None
+    return numbers.astype("float64")
+
+
+def _table_to_frame(table):
+    # split_blocks lets Arrow hand numeric columns over without consolidating
+    # them into one 2-D block, which is what keeps mmap-backed reads zero-copy
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def read_columnar(name, data):
+    """Read an uploaded Feather/Arrow IPC or Parquet file straight from memory"""
+    buffer = pa.py_buffer(data)
+    if name.endswith("parquet"):
+        table = pq.read_table(pa.BufferReader(buffer))
+    else:
+        table = feather.read_table(pa.BufferReader(buffer))
+    return _table_to_frame(table)
+
+
+def snapshot_path(snapshot_dir, key):
+    return Path(snapshot_dir) / f"{key}.v{SNAPSHOT_VERSION}.feather"
+
+
+def read_snapshot(snapshot_dir, key):
+    """Memory-map a previously written snapshot, or return None if absent"""
+    path = snapshot_path(snapshot_dir, key)
+    try:
+        # Marks the snapshot as recently used for prune_snapshots
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return _table_to_frame(feather.read_table(path, memory_map=True))
+
+
+def write_snapshot(snapshot_dir, key, df):
+    """Persist a parsed frame as uncompressed Feather so it can be memory-mapped.
+
+    The file is written under a temporary name and renamed into place, so a
+    concurrent reader never sees a partial snapshot. Frames Arrow cannot
+    represent (e.g. mixed-type object columns) are skipped; the caller keeps
+    working from the in-memory frame either way.
+    """
+    path = snapshot_path(snapshot_dir, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+    except (pa.ArrowException, OSError):
+        tmp_path.unlink(missing_ok=True)
+        return None
+    return path
+
+
+def read_prepped_snapshot(snapshot_dir, key):
+    """Memory-map the prepped frame of dataset ``key``, or return None if absent.
+
+    Categoricals come back from their Arrow dictionaries and the row order
+    is kept, so only the sparse columns, stored dense, are converted again.
+    """
+    df = read_snapshot(snapshot_dir, f"{key}.prepped")
+    if df is None:
+        return None
+    memory_report = df.attrs.get("memory_report")
+    df = compact(df)
+    df.attrs = {"memory_report": memory_report} if memory_report else {}
+    return df
+
+
+def write_prepped_snapshot(snapshot_dir, key, df):
+    """``write_snapshot`` for a prepped frame, with its sparse columns made dense"""
+    dense = {col: df[col].sparse.to_dense() for col in df.columns
+             if isinstance(df[col].dtype, pd.SparseDtype)}
+    frame = df.assign(**dense)
+    frame.attrs = {"memory_report": df.attrs["memory_report"]} if "memory_report" in df.attrs else {}
+    return write_snapshot(snapshot_dir, f"{key}.prepped", frame)
+
+
+def prune_snapshots(snapshot_dir, max_bytes):
+    """Delete the least recently used snapshots beyond ``max_bytes`` in total.
+
+    Covers the Feather snapshots and the Parquet copies the DuckDB backend
+    keeps next to them. Reads touch a file's modification time, so the files
+    still in use are the last to go. Returns the number of bytes freed.
+    """
+    snapshot_dir = Path(snapshot_dir)
+    files = []
+    for path in [*snapshot_dir.glob("*.feather"), *snapshot_dir.glob("*.prepped.parquet")]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+    freed = 0
+    for _, size, path in sorted(files, key=lambda f: f[0]):
+        if total - freed <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        freed += size
+    return freed
+
+
+def compact(df):
+    """Convert a prepped frame to the compact dtypes declared in schema.py.
+
+    Metric columns that did not parse as numbers are left alone rather than
+    coerced, so dirty exports behave exactly as they did before.
+    """
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype("float32")
+    for col in SPARSE_COLUMNS:
+        if col in df.columns and pd.api.types.is_float_dtype(df[col]) and len(df):
+            if (df[col] == 0).mean() >= SPARSE_MIN_ZERO_FRACTION:
+                df[col] = df[col].astype(pd.SparseDtype(df[col].dtype, 0.0))
+    return df.astype({col: dtype for col, dtype in CALENDAR_DTYPES.items() if col in df.columns})
+
+
+def prepare(df):
+    """DATA PREP: derive the calendar columns the dashboard filters on.
+
+    Month identity is the integer ``PERIOD`` ordinal; display labels are
+    formatted at render time from the few periods actually shown. Rows come
+    back sorted by (SDIV_NAME, PERIOD).
+
+    The returned frame carries ``attrs["memory_report"]`` with its deep size
+    in bytes before and after dtype compaction.
+    """
+    df["BILLING_MONTH"] = pd.to_datetime(df["BILLING_MONTH"])
+    # Rows without a billing month can never match a month filter
+    if df["BILLING_MONTH"].isna().any():
+        df = df.dropna(subset=["BILLING_MONTH"]).reset_index(drop=True)
+    df["PERIOD"] = to_period(df["BILLING_MONTH"])
+    df["YEAR"] = df["BILLING_MONTH"].dt.year
+    df["MONTH_NUM"] = df["BILLING_MONTH"].dt.month
+    before = frame_nbytes(df)
+    # DISCO-major, month-minor row order is what frame_index.DiscoMonthIndex slices on
+    df = compact(df).sort_values([NAME_COLUMN, PERIOD_COLUMN], kind="stable", ignore_index=True)
+    df.attrs["memory_report"] = {"before": before, "after": frame_nbytes(df)}
+    return df
+
+
+class DatasetCache:
+    """Process-wide LRU of prepped frames keyed by content hash.
+
+    Every session that uploads the same bytes gets the same frame object, so
+    memory scales with distinct datasets rather than with viewers. Sessions
+    register interest through ``acquire``/``release`` (see ``DatasetLease``);
+    a referenced entry is pinned and never evicted while someone is looking
+    at it.
+
+    The cache is bounded by the total deep size of the frames it holds;
+    inserting past ``max_bytes`` evicts least recently used unpinned entries
+    first. A single frame larger than the budget is still returned to the
+    caller but is not retained.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._refs = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, df):
+        nbytes = frame_nbytes(df)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (df, nbytes)
+            self._evict()
+
+    def acquire(self, key):
+        """Pin ``key`` for one more session"""
+        with self._lock:
+            self._refs[key] = self._refs.get(key, 0) + 1
+
+    def release(self, key):
+        """Drop one session's pin on ``key``, evicting if over budget"""
+        with self._lock:
+            remaining = self._refs.get(key, 0) - 1
+            if remaining > 0:
+                self._refs[key] = remaining
+            else:
+                self._refs.pop(key, None)
+            self._evict()
+
+    def _evict(self):
+        # Caller holds the lock; pinned entries are skipped, oldest first
+        for key in list(self._entries):
+            if self.nbytes <= self.max_bytes:
+                break
+            if key not in self._refs:
+                del self._entries[key]
+                self.evictions += 1
+
+    @property
+    def nbytes(self):
+        return sum(nbytes for _, nbytes in self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "pinned": sum(1 for key in self._entries if key in self._refs),
+                "sessions": sum(self._refs.values()),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class DatasetLease:
+    """One session's reference to a cached dataset.
+
+    Kept in ``st.session_state``; the pin is released by ``release()`` when
+    the session switches files, or by the finalizer once the session state
+    is garbage collected after the browser tab goes away.
+    """
+
+    def __init__(self, cache, key):
+        self.key = key
+        cache.acquire(key)
+        self._finalizer = weakref.finalize(self, cache.release, key)
+
+    def release(self):
+        self._finalizer()
+
+
+def upload_hash(name, data, sheets=None):
+    """Content key of one upload; a workbook's sheet selection is part of it"""
+    key = content_hash(data)
+    if sheets is not None and name.lower().endswith("xlsx"):
+        key = content_hash("\n".join([key, *sorted(sheets)]).encode())
+    return key
+
+
+def files_key(hashes):
+    """Dataset key for a set of uploaded files, independent of their order"""
+    if len(hashes) == 1:
+        return hashes[0]
+    return content_hash("".join(sorted(hashes)).encode())
+
+
+def available_cpus():
+    """CPUs this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _read_files(files, hashes, snapshot_dir, progress, workers, sheets=None):
+    """Raw frames and per-file report rows, parsing misses in parallel.
+
+    Files with a snapshot are memory-mapped. Workbooks are spread over a
+    spawn-based process pool, because openpyxl holds the GIL, as long as
+    there are several of them and enough bytes to repay starting the
+    workers. Everything else is parsed in-process, one file at a time.
+    """
+    frames, report, pending = {}, {}, []
+    unique = dict(zip(hashes, files))
+    for key, (name, data) in unique.items():
+        start = time.perf_counter()
+        raw = read_snapshot(snapshot_dir, key) if snapshot_dir else None
+        if raw is None:
+            pending.append((name, data, key))
+            continue
+        frames[key] = raw
+        report[key] = {"file": name, "source": "snapshot", "seconds": time.perf_counter() - start}
+
+    # Only workbooks go to worker processes: openpyxl holds the GIL for the
+    # whole parse, while CSV and columnar files parse too fast to repay a
+    # worker importing pandas and pyarrow again
+    workbooks = [item for item in pending if item[0].lower().endswith("xlsx")]
+    workers = min(workers, len(workbooks), available_cpus())
+    if workers < 2 or sum(len(data) for _, data, _ in workbooks) < PARALLEL_PARSE_MIN_BYTES:
+        workbooks = []
+    pooled = {key for _, _, key in workbooks}
+    inline = [item for item in pending if item[2] not in pooled]
+
+    done = 0
+    for name, data, key in inline:
+        start = time.perf_counter()
+        # A lone large CSV reports chunk progress; several files report per file
+        file_progress = progress if len(pending) == 1 else None
+        frames[key] = read_frame(name, data, progress=file_progress, sheets=sheets)
+        report[key] = {"file": name, "source": "parsed", "seconds": time.perf_counter() - start}
+        done += 1
+        if progress is not None and len(pending) > 1:
+            progress(done / len(pending))
+    if workbooks:
+        context = multiprocessing.get_context("spawn")
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = {key: pool.submit(parse_upload, name, data, sheets) for name, data, key in workbooks}
+                for name, _, key in workbooks:
+                    frames[key], seconds = futures[key].result()
+                    report[key] = {"file": name, "source": "parsed (worker)", "seconds": seconds}
+                    done += 1
+                    if progress is not None:
+                        progress(done / len(pending))
+        except BrokenProcessPool:
+            # Workers could not start (e.g. no importable __main__); parse the rest here
+            for name, data, key in workbooks:
+                if key not in frames:
+                    frames[key], seconds = parse_upload(name, data, sheets)
+                    report[key] = {"file": name, "source": "parsed", "seconds": seconds}
+
+    for name, _, key in pending:
+        if snapshot_dir and not name.lower().endswith(SNAPSHOT_EXTENSIONS):
+            write_snapshot(snapshot_dir, key, frames[key])
+    for key in unique:
+        report[key]["rows"] = len(frames[key])
+    return [frames[key] for key in unique], [report[key] for key in unique]
+
+
+def load_files(files, cache, key=None, snapshot_dir=None, progress=None, ledger=None,
+               workers=PARSE_WORKERS, sheets=None, snapshot_max_bytes=None):
+    """Return ``(key, df)`` for one or more uploads combined into one dataset.
+
+    ``files`` is a list of ``(name, bytes)``; identical files are read once.
+    Every file (and every usable sheet of a workbook) must carry the same
+    dashboard columns, otherwise ValueError names the odd ones out. With
+    ``sheets`` set, workbooks only contribute those sheets. Parsing and prep
+    only happen on a cache miss.
+
+    With ``snapshot_dir`` set, each xlsx/csv file is converted to a columnar
+    snapshot on its first parse, and the prepped dataset is snapshotted too.
+    Later misses (after an eviction or a process restart) memory-map the
+    prepped snapshot and skip parsing and prep; a new combination of
+    already-seen files reads their file snapshots and preps only. With
+    ``snapshot_max_bytes`` set, the least recently used snapshots are
+    deleted once new ones push the directory past it.
+    ``progress`` receives a completion fraction while files are read.
+    Reading and prep are recorded as the "load" and "prep" stages of
+    ``ledger`` when one is given. The frame carries ``attrs["ingest_report"]``
+    with per-file source, timing and row counts.
+
+    The cached frame is shared between reruns and sessions, so callers must
+    treat it as read-only and copy before mutating.
+    """
+    if ledger is None:
+        ledger = StageLedger()
+    hashes = [upload_hash(name, data, sheets) for name, data in files]
+    if key is None:
+        key = files_key(hashes)
+    df = cache.get(key)
+    if df is None and snapshot_dir:
+        start = time.perf_counter()
+        with ledger.stage("load"):
+            df = read_prepped_snapshot(snapshot_dir, key)
+        if df is not None:
+            # The prepped snapshot covers the whole dataset, not each file
+            seconds = time.perf_counter() - start
+            df.attrs["ingest_report"] = [
+                {"file": name, "source": "prepped snapshot", "seconds": seconds,
+                 "rows": len(df) if len(files) == 1 else None}
+                for name, _ in files
+            ]
+            cache.put(key, df)
+    if df is None:
+        with ledger.stage("load"):
+            frames, report = _read_files(files, hashes, snapshot_dir, progress, workers, sheets)
+            if len(frames) > 1:
+                check_schemas({row["file"]: frame for row, frame in zip(report, frames)})
+        with ledger.stage("prep"):
+            raw = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+            del frames
+            df = prepare(raw)
+            del raw
+        if snapshot_dir:
+            write_prepped_snapshot(snapshot_dir, key, df)
+            if snapshot_max_bytes is not None:
+                prune_snapshots(snapshot_dir, snapshot_max_bytes)
+        df.attrs["ingest_report"] = report
+        cache.put(key, df)
+    return key, df
+
+
+def load_dataset(name, data, cache, key=None, snapshot_dir=None, progress=None, ledger=None):
+    """``load_files`` for a single upload"""
+    return load_files([(name, data)], cache, key=key, snapshot_dir=snapshot_dir,
+                      progress=progress, ledger=ledger)
@@ -1,10 +1,14 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
-from plotly.subplots import make_subplots
+import cProfile
+import io
+import pstats
+import zipfile
+from collections import deque
+from functools import partial
 from datetime import datetime, timedelta
+from pathlib import Path
+from file_types import UPLOAD_TYPES, workbook_sheets
+from theme import HEADER_HTML, PAGE_STYLE, footer_html
 
 # ================= CONFIG =================
 st.set_page_config(
@@ -13,237 +17,25 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-NEPRA_LOSS_LIMIT = 4.1
-
-# ================= COMPANY COLOR SCHEME =================
-COLORS = {
-    "primary": "#800000",      # Maroon (Company Primary)
-    "secondary": "#fd8c17",    # Orange (Company Secondary)
-    "accent": "#FFFFFF",       # White
-    "success": "#4CAF50",      # Green
-    "warning": "#FFC107",      # Amber
-    "danger": "#FF5252",       # Red
-    "info": "#2196F3",         # Light Blue
-    "dark": "#263238",         # Dark Blue Gray
-    "light": "#F5F5F5",        # Light Gray
-    "white": "#FFFFFF",
-    "maroon_light": "#A00000",
-    "orange_light": "#FFA726",
-    "gradient_start": "#800000",
-    "gradient_mid": "#fd8c17",
-    "gradient_end": "#FFD700"
-}
+INGEST_CACHE_MAX_BYTES = 2 * 1024**3  # Upper bound for parsed datasets kept in memory
+SNAPSHOT_DIR = Path(__file__).parent / ".snapshots"  # Columnar copies of parsed uploads
+SNAPSHOT_MAX_BYTES = 8 * 1024**3  # Least recently used snapshots beyond this are deleted
+HISTORY_DIR = Path(__file__).parent / ".history"  # Month partitions for the monthly history mode
+HISTORY_PARQUET_DIR = HISTORY_DIR / "parquet"  # Prepped month files for the DuckDB backend in history mode
+FIGURE_CACHE_MAX_ENTRIES = 512  # Built charts kept across reruns and sessions
+FIGURE_CACHE_MAX_BYTES = 1024**3  # ...and their estimated total size
+PRECOMPUTE_WORKERS = 4  # Background threads filling section results after upload
+PRECOMPUTE_MAX_ENTRIES = 4096  # Rankings, pivots and DISCO series kept across sessions
+PRECOMPUTE_MAX_BYTES = 512 * 1024**2  # ...and their total size, on top of the dataset cache
+PRECOMPUTE_MAX_DISCOS = 50  # DISCOs whose time series are computed ahead of selection
+RERUN_HISTORY_LENGTH = 20  # Timed reruns kept per session in the diagnostics panel
+PROFILE_DIR = Path(__file__).parent / ".profiles"  # cProfile dumps of profiled reruns
 
 # ================= EXECUTIVE UI STYLES =================
-st.markdown(f"""
-<style>
-/* Executive Dashboard Theme */
-:root {{
-    --primary: {COLORS["primary"]};
-    --secondary: {COLORS["secondary"]};
-    --accent: {COLORS["accent"]};
-    --success: #4CAF50;
-    --warning: #FFC107;
-    --danger: #FF5252;
-    --dark: #1a1a1a;
-    --light: #f8f9fa;
-}}
-
-/* Executive Header */
-.executive-header {{
-    background: linear-gradient(135deg, {COLORS["primary"]}, {COLORS["secondary"]});
-    padding: 30px;
-    border-radius: 15px;
-    margin-bottom: 30px;
-    text-align: center;
-    color: white;
-    box-shadow: 0 8px 32px rgba(128, 0, 0, 0.2);
-    border: 1px solid rgba(253, 140, 23, 0.3);
-}}
-
-/* Executive Cards */
-.executive-card {{
-    background: rgba(255, 255, 255, 0.98);
-    backdrop-filter: blur(10px);
-    border-radius: 15px;
-    padding: 25px;
-    margin-bottom: 25px;
-    border: 1px solid rgba(128, 0, 0, 0.1);
-    box-shadow: 0 6px 20px rgba(0, 0, 0, 0.08);
-    transition: all 0.3s ease;
-    position: relative;
-    overflow: hidden;
-}}
-
-.executive-card::before {{
-    content: '';
-    position: absolute;
-    top: 0;
-    left: 0;
-    right: 0;
-    height: 4px;
-    background: linear-gradient(90deg, {COLORS["primary"]}, {COLORS["secondary"]});
-}}
-
-/* Executive KPI Cards */
-.kpi-executive {{
-    background: linear-gradient(135deg, {COLORS["dark"]}, #2c3e50);
-    border-radius: 12px;
-    padding: 20px;
-    color: white;
-    position: relative;
-    overflow: hidden;
-    transition: all 0.3s ease;
-    box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-    border-left: 4px solid {COLORS["primary"]};
-}}
-
-.kpi-executive.primary {{ 
-    background: linear-gradient(135deg, {COLORS["primary"]}, {COLORS["maroon_light"]});
-    border-left: 4px solid {COLORS["secondary"]};
-}}
-.kpi-executive.success {{ 
-    background: linear-gradient(135deg, #2E7D32, #4CAF50);
-    border-left: 4px solid #81C784;
-}}
-.kpi-executive.warning {{ 
-    background: linear-gradient(135deg, #F57C00, #FFA726);
-    border-left: 4px solid {COLORS["primary"]};
-}}
-.kpi-executive.danger {{ 
-    background: linear-gradient(135deg, {COLORS["danger"]}, #EF5350);
-    border-left: 4px solid #FF8A80;
-}}
-.kpi-executive.info {{ 
-    background: linear-gradient(135deg, #1565C0, #2196F3);
-    border-left: 4px solid #64B5F6;
-}}
-
-.kpi-executive:hover {{
-    transform: translateY(-3px);
-    box-shadow: 0 8px 25px rgba(0, 0, 0, 0.2);
-}}
-
-.kpi-value {{
-    font-size: 28px;
-    font-weight: 800;
-    color: white;
-    line-height: 1.2;
-    margin: 10px 0 5px;
-    text-shadow: 1px 1px 2px rgba(0, 0, 0, 0.3);
-}}
-
-.kpi-label {{
-    font-size: 13px;
-    color: rgba(255, 255, 255, 0.9);
-    text-transform: uppercase;
-    letter-spacing: 0.5px;
-    font-weight: 600;
-}}
-
-.kpi-icon {{
-    font-size: 22px;
-    margin-bottom: 10px;
-    opacity: 0.9;
-}}
-
-/* Executive Status Badges */
-.status-executive {{
-    display: inline-flex;
-    align-items: center;
-    gap: 6px;
-    padding: 6px 14px;
-    border-radius: 20px;
-    font-size: 11px;
-    font-weight: 700;
-    text-transform: uppercase;
-    letter-spacing: 0.5px;
-}}
-
-.status-good {{
-    background: linear-gradient(135deg, #4CAF50, #66BB6A);
-    color: white;
-    box-shadow: 0 2px 8px rgba(76, 175, 80, 0.3);
-}}
-
-.status-warning {{
-    background: linear-gradient(135deg, #FFC107, #FFD54F);
-    color: {COLORS["dark"]};
-    box-shadow: 0 2px 8px rgba(255, 193, 7, 0.3);
-}}
-
-.status-bad {{
-    background: linear-gradient(135deg, {COLORS["danger"]}, #EF5350);
-    color: white;
-    box-shadow: 0 2px 8px rgba(255, 82, 82, 0.3);
-}}
-
-/* Executive Tabs */
-.stTabs [data-baseweb="tab-list"] {{
-    gap: 2px;
-    background: {COLORS["light"]};
-    padding: 3px;
-    border-radius: 10px;
-    border: 1px solid rgba(128, 0, 0, 0.1);
-}}
-
-.stTabs [data-baseweb="tab"] {{
-    border-radius: 8px;
-    padding: 10px 20px;
-    background: transparent;
-    font-weight: 600;
-    color: {COLORS["dark"]};
-    border: 2px solid transparent;
-    transition: all 0.3s ease;
-    font-size: 14px;
-}}
-
-.stTabs [data-baseweb="tab"]:hover {{
-    background: rgba(128, 0, 0, 0.05);
-    border-color: rgba(128, 0, 0, 0.1);
-}}
-
-.stTabs [aria-selected="true"] {{
-    background: linear-gradient(135deg, {COLORS["primary"]}, {COLORS["secondary"]});
-    color: white;
-    box-shadow: 0 3px 10px rgba(128, 0, 0, 0.2);
-    border-color: transparent;
-}}
-
-/* Executive Filters */
-.filter-executive {{
-    background: white;
-    border-radius: 12px;
-    padding: 20px;
-    margin-bottom: 25px;
-    border: 1px solid rgba(128, 0, 0, 0.1);
-    box-shadow: 0 4px 12px rgba(0, 0, 0, 0.05);
-}}
-
-/* Responsive Design */
-@media (max-width: 768px) {{
-    .kpi-value {{
-        font-size: 22px;
-    }}
-    
-    .executive-card {{
-        padding: 20px;
-    }}
-}}
-</style>
-""", unsafe_allow_html=True)
+st.markdown(PAGE_STYLE, unsafe_allow_html=True)
 
 # ================= EXECUTIVE HEADER =================
-st.markdown(f"""
-<div class="executive-header">
-    <h1 style="margin: 0; font-size: 32px; font-weight: 800;">
-        ⚡ NATIONAL DISCO PERFORMANCE DASHBOARD
-    </h1>
-    <p style="margin: 10px 0 0 0; font-size: 18px; opacity: 0.95; font-weight: 500;">
-        Executive Level Monitoring | NEPRA Compliance | Power Sector Analytics
-    </p>
-</div>
-""", unsafe_allow_html=True)
+st.markdown(HEADER_HTML, unsafe_allow_html=True)
 
 # ================= DATA UPLOAD =================
 with st.container():
@@ -251,279 +43,496 @@ with st.container():
     col1, col2 = st.columns([3, 1])
     
     with col1:
-        uploaded_file = st.file_uploader("📤 Upload DISCO Performance Dataset", 
-                                        type=["xlsx", "csv"], 
-                                        help="Upload Excel or CSV file with DISCO performance data")
+        history_mode = st.toggle("📚 Monthly history", key="history_mode",
+                                 help="Keep every month on disk and upload only the new month(s) each refresh")
+        uploaded_files = st.file_uploader("📤 Upload New Month(s)" if history_mode else "📤 Upload DISCO Performance Dataset", 
+                                         type=list(UPLOAD_TYPES), 
+                                         accept_multiple_files=True,
+                                         help="Upload one or more Excel (all sheets), CSV or Feather/Parquet files "
+                                              "with DISCO performance data; they are combined into one dataset")
+        
+        # Sheet names come from each workbook's index part, without reading cells
+        try:
+            sheet_names = list(dict.fromkeys(
+                sheet for f in uploaded_files or [] if f.name.lower().endswith("xlsx")
+                for sheet in workbook_sheets(io.BytesIO(f.getvalue()))
+            ))
+        except (zipfile.BadZipFile, KeyError) as e:
+            st.error(f"❌ Error loading file: {str(e)}")
+            st.stop()
+        selected_sheets = None
+        if len(sheet_names) > 1:
+            chosen_sheets = st.multiselect("📑 Sheets", sheet_names, default=sheet_names,
+                                           help="Workbook sheets to read; sheets without BILLING_MONTH "
+                                                "and SDIV_NAME are skipped either way")
+            if set(chosen_sheets) != set(sheet_names):
+                selected_sheets = chosen_sheets
     
     with col2:
-        if uploaded_file:
-            st.success("✅ Data loaded successfully", icon="🎯")
+        if history_mode:
+            replace_months = st.checkbox("Replace stored months", value=False,
+                                         help="Overwrite months the history already holds instead of rejecting them")
+            append_clicked = st.button("➕ Append to History", disabled=not uploaded_files)
+        elif uploaded_files:
+            st.success(f"✅ {len(uploaded_files)} file(s) loaded successfully", icon="🎯")
     st.markdown('</div>', unsafe_allow_html=True)
 
-if not uploaded_file:
+@st.cache_resource
+def get_history_store():
+    from history import HistoryStore
+    return HistoryStore(HISTORY_DIR)
+
+history_store = get_history_store() if history_mode else None
+
+if history_mode and not history_store.months and not append_clicked:
+    st.info("📚 The monthly history is empty: upload the existing dataset once and append it", icon="ℹ️")
+    st.stop()
+
+if not history_mode and not uploaded_files:
     st.info("👑 Please upload a DISCO dataset to begin executive analysis", icon="ℹ️")
     st.stop()
 
-# Load data
+# ================= DATA MODULES =================
+# Imported past the upload gate: pandas, Plotly and the readers take most of
+# a cold start, and the empty upload page needs none of them. Python caches
+# modules, so later reruns only pay for the name lookups.
+import pandas as pd
+import numpy as np
+from ingest import DatasetCache, DatasetLease, load_files
+from history import append_files, load_history, month_key
+import sql_backend
+from hierarchy import Hierarchy
+from periods import period_label, period_range
+from frame_index import DiscoMonthIndex
+from rollup import RollupCube
+from figure_cache import FigureCache
+from comparison import change_table, comparison_periods, period_pivot
+from formatting import format_number
+from stage_ledger import StageLedger
+from precompute import PrecomputeCache
+from kpis import (NEPRA_LOSS_LIMIT, analysis_frame, executive_summary, headline_kpis,
+                  latest_changes, metric_ranking, three_month_trend)
+from charts import (
+    create_comparison_bar_chart,
+    create_compliance_pie,
+    create_energy_pie,
+    create_metric_ranking_chart,
+    create_normalized_metrics_chart,
+    create_performance_matrix,
+    create_time_series_subplots,
+    create_trend_chart,
+)
+
+# Filter results are index gathers and aggregates are fresh frames, so the
+# pipeline shares data instead of copying it; Copy-on-Write (always on from
+# pandas 3) guarantees no stage can write through to the shared dataset
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# ================= DIAGNOSTICS =================
+# Opt-in instrumentation for this rerun; results are shown in the sidebar
+# after the active section has rendered
+def request_profile():
+    st.session_state["profile_rerun"] = True
+
+with st.sidebar.expander("🧪 Diagnostics"):
+    time_stages = st.toggle("Time stages", value=False, key="time_stages",
+                            help="Time each pipeline stage and chart, with chart payload sizes")
+    memory_debug = st.toggle("Trace memory", value=False, key="memory_debug",
+                             help="Trace bytes allocated per pipeline stage (slows reruns)")
+    st.button("Profile one rerun", on_click=request_profile,
+              help="Run the next rerun under cProfile and keep the .prof file")
+
+ledger = StageLedger(timing=time_stages, memory=memory_debug)
+ledger.start()
+profiler = cProfile.Profile() if st.session_state.pop("profile_rerun", False) else None
+if profiler:
+    profiler.enable()
+
+def stop_instrumentation():
+    ledger.stop()
+    if profiler:
+        profiler.disable()
+
+# Load data (parsed and prepped once per file content, shared across sessions)
+@st.cache_resource
+def get_dataset_cache():
+    return DatasetCache(max_bytes=INGEST_CACHE_MAX_BYTES)
+
+dataset_cache = get_dataset_cache()
+
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache(max_entries=FIGURE_CACHE_MAX_ENTRIES, max_bytes=FIGURE_CACHE_MAX_BYTES)
+
+figure_cache = get_figure_cache()
+
+@st.cache_resource
+def get_precompute_cache():
+    return PrecomputeCache(max_entries=PRECOMPUTE_MAX_ENTRIES, workers=PRECOMPUTE_WORKERS,
+                           max_bytes=PRECOMPUTE_MAX_BYTES)
+
+precompute_cache = get_precompute_cache()
+
+# Large CSVs report chunk progress and multi-file uploads per-file progress
+progress_slot = st.empty()
+
+def show_ingest_progress(fraction):
+    progress_slot.progress(fraction, text=f"📥 Reading {len(uploaded_files)} file(s)… {fraction:.0%}")
+
+# In history mode only the appended months are parsed; the rest of the
+# history comes from the dataset cache or the month partitions on disk
+if history_mode and append_clicked:
+    try:
+        with ledger.stage("append"):
+            appended = append_files(history_store, [(f.name, f.getvalue()) for f in uploaded_files],
+                                    dataset_cache, replace=replace_months, ledger=ledger,
+                                    sheets=selected_sheets)
+        st.success(f"✅ Appended {len(appended)} month(s), {period_label(appended[0])} – "
+                   f"{period_label(appended[-1])}, to the history", icon="📚")
+    except Exception as e:
+        st.error(f"❌ Could not append to the history: {str(e)}")
+    if not history_store.months:
+        stop_instrumentation()
+        st.stop()
+
 try:
-    if uploaded_file.name.endswith("xlsx"):
-        df = pd.read_excel(uploaded_file)
-    else:
-        df = pd.read_csv(uploaded_file)
+    with ledger.stage("upload"):
+        if history_mode:
+            dataset_key, df = load_history(history_store, dataset_cache, ledger=ledger)
+        else:
+            dataset_key, df = load_files([(f.name, f.getvalue()) for f in uploaded_files], dataset_cache,
+                                         snapshot_dir=SNAPSHOT_DIR, progress=show_ingest_progress, ledger=ledger,
+                                         sheets=selected_sheets, snapshot_max_bytes=SNAPSHOT_MAX_BYTES)
 except Exception as e:
+    stop_instrumentation()
     st.error(f"❌ Error loading file: {str(e)}")
     st.stop()
+finally:
+    progress_slot.empty()
+
+# Reference the shared frame from this session instead of owning a copy;
+# the pin keeps it from being evicted while the session is open
+lease = st.session_state.get("dataset_lease")
+if lease is None or lease.key != dataset_key:
+    if lease is not None:
+        lease.release()
+    st.session_state["dataset_lease"] = DatasetLease(dataset_cache, dataset_key)
+
+with st.sidebar:
+    cache_stats = dataset_cache.stats()
+    st.caption(
+        f"🗄️ Dataset cache: {cache_stats['entries']} file(s) "
+        f"({cache_stats['pinned']} in use by {cache_stats['sessions']} session(s)), "
+        f"{cache_stats['bytes'] / 1024**2:,.1f} / {cache_stats['max_bytes'] / 1024**2:,.0f} MB | "
+        f"hits {cache_stats['hits']} · misses {cache_stats['misses']} · evictions {cache_stats['evictions']}"
+    )
+    figure_stats = figure_cache.stats()
+    st.caption(
+        f"📈 Figure cache: {figure_stats['entries']} / {figure_stats['max_entries']} charts, "
+        f"{figure_stats['bytes'] / 1024**2:,.1f} / {figure_stats['max_bytes'] / 1024**2:,.0f} MB | "
+        f"hits {figure_stats['hits']} · misses {figure_stats['misses']} · evictions {figure_stats['evictions']}"
+    )
+    precompute_stats = precompute_cache.stats()
+    st.caption(
+        f"⚙️ Precompute: {precompute_stats['ready']} / {precompute_stats['entries']} results ready, "
+        f"{precompute_stats['bytes'] / 1024**2:,.1f} / {precompute_stats['max_bytes'] / 1024**2:,.0f} MB | "
+        f"hits {precompute_stats['hits']} · waits {precompute_stats['waits']} · misses {precompute_stats['misses']}"
+    )
+    ingest_report = df.attrs.get("ingest_report")
+    if ingest_report and len(ingest_report) > 1:
+        with st.expander(f"📥 {len(ingest_report)} files in this dataset"):
+            st.dataframe(
+                pd.DataFrame(ingest_report),
+                column_config={"seconds": st.column_config.NumberColumn("Time (s)", format="%.2f")},
+                hide_index=True,
+                use_container_width=True,
+            )
+    if history_mode:
+        history_stats = history_store.stats()
+        st.caption(
+            f"📚 History: {history_stats['months']} month(s), "
+            f"{period_label(history_stats['first'])} – {period_label(history_stats['last'])}, "
+            f"{history_stats['rows']:,} rows, {history_stats['bytes'] / 1024**2:,.1f} MB on disk"
+        )
+    memory_report = df.attrs.get("memory_report")
+    if memory_report:
+        st.caption(
+            f"🧮 Frame memory: {memory_report['before'] / 1024**2:,.1f} MB → "
+            f"{memory_report['after'] / 1024**2:,.1f} MB "
+            f"({memory_report['before'] / max(memory_report['after'], 1):.1f}x smaller)"
+        )
+
+# Sort months chronologically (integer period ordinals sort by value)
+months = np.sort(df["PERIOD"].unique()).tolist()
+
+# ================= HIERARCHY =================
+# DISCO → circle → division → subdivision when the export carries those
+# columns. Every level above subdivisions is a monthly roll-up built once per
+# dataset, and the rest of the script runs on the level being viewed as if
+# it were the dataset.
+@st.cache_resource(max_entries=8)
+def get_hierarchy(dataset_key, _df):
+    return Hierarchy(_df)
+
+with ledger.stage("hierarchy"):
+    hierarchy = get_hierarchy(dataset_key, df)
+
+drill_path = hierarchy.valid_path(st.session_state.get("drill_path", []))
+drill_level = len(drill_path)
+leaf_level = drill_level == hierarchy.depth - 1
+level_name = hierarchy.label(drill_level)
+level_options = hierarchy.children(drill_level, drill_path[-1] if drill_path else None)
+if not leaf_level:
+    df = hierarchy.frame(drill_level)
 
-# ================= DATA PREP =================
-df["BILLING_MONTH"] = pd.to_datetime(df["BILLING_MONTH"])
-df["MONTH"] = df["BILLING_MONTH"].dt.strftime("%b %Y")
-df["YEAR"] = df["BILLING_MONTH"].dt.year
-df["MONTH_NUM"] = df["BILLING_MONTH"].dt.month
+def set_drill_path(path):
+    st.session_state["drill_path"] = path
 
-# Sort months chronologically
-months = sorted(df["MONTH"].unique(), 
-                key=lambda x: pd.to_datetime(x, format="%b %Y"))
+def drill_from_picker(picker_key, path):
+    if st.session_state[picker_key] is not None:
+        set_drill_path([*path, st.session_state[picker_key]])
+
+def drill_from_chart(chart_key, path, names):
+    """on_select callback: drill into the name on the first clicked point"""
+    for point in st.session_state[chart_key]["selection"]["points"]:
+        for value in point.values():
+            if isinstance(value, str) and value in names:
+                set_drill_path([*path, value])
+                return
+
+def sync_drill_path():
+    """Rerun the whole app if a chart in this fragment changed the drill path.
+
+    Selection callbacks in a fragment rerun only the fragment, which would
+    redraw the old level; the breadcrumb, level frame and filters need a
+    full rerun to follow the new path.
+    """
+    if hierarchy.valid_path(st.session_state.get("drill_path", [])) != drill_path:
+        st.rerun(scope="app")
+
+# (DISCO, month) row offsets, built once per dataset and hierarchy level
+@st.cache_resource(max_entries=8)
+def get_disco_month_index(level_key, _df):
+    return DiscoMonthIndex(_df)
+
+# Running totals per DISCO so any month window aggregates in O(#DISCOs)
+@st.cache_resource(max_entries=8)
+def get_rollup_cube(level_key, _df, _index):
+    return RollupCube(_df, _index)
+
+# Optional DuckDB engine over a Parquet copy of the dataset, in place of the
+# index and cube (which together take about as much memory as the frame)
+@st.cache_resource(max_entries=8)
+def get_query_backend(dataset_key, _df):
+    if history_mode:
+        # One file per stored month, so an append writes only its months
+        # and the files of replaced months are deleted
+        names = {period: f"{month_key(period)}.{digest}"
+                 for period, digest in history_store.month_hashes.items()}
+        return sql_backend.DuckDBBackend(sql_backend.write_month_parquets(_df, HISTORY_PARQUET_DIR, names))
+    return sql_backend.DuckDBBackend(sql_backend.parquet_path(SNAPSHOT_DIR, dataset_key))
+
+use_sql_backend = sql_backend.available() and st.sidebar.toggle(
+    "🦆 DuckDB query backend", value=False, key="sql_backend",
+    help="Answer filters, roll-ups and trends with SQL over a Parquet copy of the dataset")
+
+# Levels above subdivisions are small pre-aggregated frames and stay in memory
+if use_sql_backend and leaf_level:
+    with ledger.stage("backend"):
+        if not history_mode:
+            # Every rerun, so the file in use is the last one pruned from the
+            # snapshot directory, and is written again if it was pruned anyway
+            sql_backend.ensure_parquet(df, sql_backend.parquet_path(SNAPSHOT_DIR, dataset_key))
+        query_backend = get_query_backend(dataset_key, df)
+    disco_index = rollup_cube = None
+else:
+    query_backend = None
+    with ledger.stage("index"):
+        disco_index = get_disco_month_index((dataset_key, drill_level), df)
+    with ledger.stage("rollup"):
+        rollup_cube = get_rollup_cube((dataset_key, drill_level), df, disco_index)
 
 # ================= EXECUTIVE FILTERS =================
+# Batched in a form: ticking several DISCOs or switching period costs one
+# rerun on "Apply Filters" instead of one rerun per widget change.
 with st.container():
     st.markdown('<div class="filter-executive">', unsafe_allow_html=True)
     st.markdown("### 🎯 Executive View Selector")
     
-    col1, col2 = st.columns(2)
+    # Drill-down controls; clicking a bar or point in the overview and
+    # ranking charts drills the same way
+    if hierarchy.depth > 1:
+        col1, col2, col3 = st.columns([3, 2, 1])
+        
+        with col1:
+            crumbs = " › ".join([f"All {hierarchy.label(0)}s", *drill_path])
+            st.markdown(f"**🧭 {crumbs}** — showing {len(level_options)} {level_name}(s)")
+        
+        with col2:
+            if not leaf_level:
+                picker_key = "drill_pick/" + "/".join(drill_path)
+                st.selectbox(
+                    f"Drill into {level_name}",
+                    level_options,
+                    index=None,
+                    placeholder=f"Choose a {level_name} or click a chart",
+                    key=picker_key,
+                    on_change=drill_from_picker,
+                    args=(picker_key, drill_path)
+                )
+        
+        with col3:
+            st.button("⬆️ Up one level", disabled=not drill_path,
+                      on_click=set_drill_path, args=(drill_path[:-1],))
     
-    with col1:
-        # Time period selection
-        time_option = st.selectbox(
-            "📅 Time Period",
-            ["Single Month", "All Months", "Year-to-Date", "Last 6 Months", "Last 12 Months"],
-            help="Choose time period for analysis"
-        )
+    with st.form("executive_filters", border=False):
+        col1, col2 = st.columns(2)
         
-        if time_option == "Single Month":
-            selected_month = st.selectbox(
+        with col1:
+            # Time period selection
+            time_option = st.selectbox(
+                "📅 Time Period",
+                ["Single Month", "All Months", "Year-to-Date", "Last 6 Months", "Last 12 Months"],
+                help="Choose time period for analysis"
+            )
+            
+            # Always rendered: a form cannot show it conditionally before submit
+            selected_period = st.selectbox(
                 "Select Month",
                 months,
                 index=len(months)-1 if months else 0,
-                help="Select specific month for analysis"
+                format_func=period_label,
+                help="Specific month analysed when Time Period is Single Month"
+            )
+        
+        with col2:
+            # DISCO selection
+            disco_options = level_options
+            selected_discos = st.multiselect(
+                f"🏢 Select {level_name}s",
+                disco_options,
+                default=disco_options,
+                help="Select one or more DISCOs"
             )
-            month_filter = [selected_month]
-        elif time_option == "All Months":
-            month_filter = months
-            selected_month = "All Months"
-        elif time_option == "Year-to-Date":
-            current_year = datetime.now().year
-            month_filter = [m for m in months if pd.to_datetime(m, format="%b %Y").year == current_year]
-            selected_month = f"Year {current_year}"
-        elif time_option == "Last 6 Months":
-            month_filter = months[-6:] if len(months) >= 6 else months
-            selected_month = "Last 6 Months"
-        else:  # Last 12 Months
-            month_filter = months[-12:] if len(months) >= 12 else months
-            selected_month = "Last 12 Months"
+        
+        st.form_submit_button("✅ Apply Filters")
     
-    with col2:
-        # DISCO selection
-        disco_options = sorted(df["SDIV_NAME"].unique())
-        selected_discos = st.multiselect(
-            "🏢 Select DISCOs",
-            disco_options,
-            default=disco_options,
-            help="Select one or more DISCOs"
-        )
+    if time_option == "Single Month":
+        month_range = (selected_period, selected_period)
+        selected_month = period_label(selected_period)
+    else:
+        month_range = period_range(months, time_option, today=datetime.now())
+        if time_option == "Year-to-Date":
+            selected_month = f"Year {datetime.now().year}"
+        else:
+            selected_month = time_option
     
     st.markdown('</div>', unsafe_allow_html=True)
 
 # Filter data
-filtered_df = df[(df["MONTH"].isin(month_filter)) & 
-                 (df["SDIV_NAME"].isin(selected_discos))].copy()
+with ledger.stage("filter"):
+    if query_backend:
+        filtered_df = query_backend.select(selected_discos, *month_range)
+    else:
+        filtered_df = disco_index.select(df, selected_discos, *month_range)
 
 if filtered_df.empty:
+    stop_instrumentation()
     st.warning("⚠️ No data available for the selected filters. Please adjust your selection.")
     st.stop()
 
-# ================= HELPER FUNCTIONS =================
-def format_number(num, include_sign=False):
-    """Format numbers for executive display"""
-    if pd.isna(num):
-        return "N/A"
-    
-    num_abs = abs(num)
-    if num_abs >= 1_000_000_000:
-        formatted = f"{num/1_000_000_000:.1f}B"
-    elif num_abs >= 1_000_000:
-        formatted = f"{num/1_000_000:.1f}M"
-    elif num_abs >= 1_000:
-        formatted = f"{num/1_000:.1f}K"
+# ================= ANALYSIS DATA =================
+# Calculate aggregated data (shared by the overview, analysis and insights sections)
+with ledger.stage("aggregate"):
+    if time_option == "Single Month":
+        analysis_df = filtered_df
+    elif query_backend:
+        analysis_df = query_backend.window(selected_discos, *month_range)
     else:
-        formatted = f"{num:,.0f}"
-    
-    if include_sign and num != 0:
-        sign = "+" if num > 0 else ""
-        return f"{sign}{formatted}"
-    return formatted
-
-def create_comparison_bar_chart(data_dict, title, y_title, is_percentage=False):
-    """Create bar chart for three-month comparison"""
-    fig = go.Figure()
-    
-    periods = list(data_dict.keys())
-    
-    for period in periods:
-        period_data = data_dict[period]
-        
-        x_values = list(period_data.keys())
-        y_values = list(period_data.values())
-        
-        fig.add_trace(go.Bar(
-            name=period,
-            x=x_values,
-            y=y_values,
-            text=[f"{v:.1f}%" if is_percentage else format_number(v) for v in y_values],
-            textposition='auto',
-            textfont=dict(size=11)
-        ))
-    
-    fig.update_layout(
-        title=dict(
-            text=title,
-            font=dict(size=16, color=COLORS["dark"])
-        ),
-        barmode='group',
-        xaxis_title="DISCO",
-        yaxis_title=y_title,
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="center",
-            x=0.5,
-            font=dict(size=12)
-        ),
-        height=500,
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(color=COLORS["dark"], size=12),
-        margin=dict(t=60, b=100, l=60, r=30),
-        xaxis_tickangle=-45
-    )
-    
-    return fig
+        # Aggregate data for multiple months from the prefix-sum cube
+        analysis_df = analysis_frame(df, disco_index, rollup_cube, selected_discos, *month_range)
 
-def create_trend_chart(data, disco_name, title):
-    """Create trend chart for multiple metrics"""
-    fig = go.Figure()
-    
-    # Add T&D Loss trend
-    fig.add_trace(go.Scatter(
-        x=data["MONTH"],
-        y=data["MON_PERC_LOSS_TD"],
-        mode='lines+markers',
-        name='T&D Loss %',
-        line=dict(color=COLORS["danger"], width=3),
-        marker=dict(size=8),
-        yaxis='y'
-    ))
-    
-    # Add Collection % trend
-    fig.add_trace(go.Scatter(
-        x=data["MONTH"],
-        y=data["COLL_PERC"],
-        mode='lines+markers',
-        name='Collection %',
-        line=dict(color=COLORS["success"], width=3),
-        marker=dict(size=8),
-        yaxis='y2'
-    ))
-    
-    fig.update_layout(
-        title=dict(
-            text=f"{disco_name} - {title}",
-            font=dict(size=16, color=COLORS["dark"])
-        ),
-        xaxis_title="Month",
-        yaxis=dict(
-            title="T&D Loss %",
-            titlefont=dict(color=COLORS["danger"]),
-            tickfont=dict(color=COLORS["danger"])
-        ),
-        yaxis2=dict(
-            title="Collection %",
-            titlefont=dict(color=COLORS["success"]),
-            tickfont=dict(color=COLORS["success"]),
-            anchor="x",
-            overlaying="y",
-            side="right"
-        ),
-        height=450,
-        hovermode='x unified',
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(color=COLORS["dark"], size=12),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="center",
-            x=0.5
-        ),
-        margin=dict(t=60, b=60, l=60, r=60)
-    )
-    
-    return fig
+def data_version(start, end):
+    """Cache key part for results that only read the months between start and end.
+
+    In history mode it changes only when one of those months is appended or
+    replaced, so results for untouched windows survive a monthly refresh.
+    The hierarchy level is part of it, since names may repeat across levels.
+    """
+    return (history_store.version(start, end) if history_mode else dataset_key, drill_level)
+
+# Fingerprint of analysis_df for the figure cache: same data, same window, same DISCOs
+analysis_key = (data_version(*month_range), time_option, month_range, tuple(selected_discos))
+
+# Section results from the shared precompute cache; with prefetch=True these
+# only schedule the work on the background pool (see PRECOMPUTE below)
+def ranked_metric(metric_col, ascending, prefetch=False):
+    """DISCOs of analysis_df sorted by one metric, with average and extremes"""
+    fetch = precompute_cache.prefetch if prefetch else precompute_cache.get
+    return fetch((*analysis_key, "ranking", metric_col, ascending),
+                 metric_ranking, analysis_df, metric_col, ascending)
+
+def comparison_pivot(discos, periods, metric_col, prefetch=False):
+    """(DISCO x period) values of one metric for the period comparison"""
+    fetch = precompute_cache.prefetch if prefetch else precompute_cache.get
+    key = (data_version(min(periods), max(periods)), "pivot", tuple(discos), tuple(periods), metric_col)
+    if query_backend:
+        return fetch(key, query_backend.pivot, discos, periods, metric_col)
+    return fetch(key, period_pivot, df, disco_index, discos, periods, metric_col)
+
+def disco_time_series(disco, start, end, prefetch=False):
+    """All rows of one DISCO between two periods, in month order"""
+    fetch = precompute_cache.prefetch if prefetch else precompute_cache.get
+    key = (data_version(start, end), "series", disco, start, end)
+    if query_backend:
+        return fetch(key, query_backend.select, [disco], start, end)
+    return fetch(key, disco_index.select, df, [disco], start, end)
 
 # ================= DASHBOARD LAYOUT =================
-tab1, tab2, tab3, tab4 = st.tabs([
-    "🏆 Executive Overview", 
-    "📊 Performance Analysis", 
-    "📈 Trend & Comparison", 
-    "🔍 Deep Insights"
-])
+def show_chart(fig, name, drill=False):
+    """st.plotly_chart, recorded as a stage with its payload size when timing is on.
+
+    With ``drill``, clicking a point or bar that names a DISCO, circle or
+    division drills into it (only above the subdivision level).
+    """
+    with ledger.stage(f"chart: {name}", figure=fig):
+        if drill and not leaf_level:
+            chart_key = f"drill/{name}/" + "/".join(drill_path)
+            st.plotly_chart(fig, use_container_width=True, key=chart_key, selection_mode="points",
+                            on_select=partial(drill_from_chart, chart_key, drill_path, set(level_options)))
+        else:
+            st.plotly_chart(fig, use_container_width=True)
+
+# Only the active section is computed and drawn on a rerun; st.tabs would
+# run all four bodies and merely hide three of them.
+SECTIONS = {
+    "🏆 Executive Overview": "overview",
+    "📊 Performance Analysis": "performance",
+    "📈 Trend & Comparison": "trends",
+    "🔍 Deep Insights": "insights",
+}
+active_section = st.radio(
+    "Dashboard section",
+    list(SECTIONS),
+    horizontal=True,
+    key="active_section",
+    label_visibility="collapsed"
+)
 
 # ================= TAB 1: EXECUTIVE OVERVIEW =================
-with tab1:
+def render_overview():
     st.markdown(f"### 🏆 NATIONAL PERFORMANCE DASHBOARD - {selected_month}")
     
-    # Calculate aggregated data
-    if time_option == "Single Month":
-        analysis_df = filtered_df.copy()
-    else:
-        # Aggregate data for multiple months
-        agg_dict = {
-            'MONTHLY_ENERGY': 'sum',
-            'CUMULATIVE_ENERGY': 'last',
-            'MON_UNITS_BILLED': 'sum',
-            'PRO_UNITS_BILLED': 'last',
-            'MON_UNITS_RECVD': 'sum',
-            'PRO_UNITS_RECVD': 'last',
-            'MON_UNITS_LOST': 'sum',
-            'PRO_UNITS_LOST': 'last',
-            'MON_ATC_LOSS': 'mean',
-            'PRO_ATC_LOSS': 'mean',
-            'MON_PERC_LOSS_TD': 'mean',
-            'PRO_PERC_LOSS_TD': 'mean',
-            'MON_UNITS_NET_MET': 'sum',
-            'PRO_UNITS_NET_MET': 'sum',
-            'MON_WHEELED_UNITS': 'sum',
-            'PRO_WHEELED_UNITS': 'sum',
-            'ASSMNT_MON': 'sum',
-            'ASSMNT_PRO': 'sum',
-            'PAY_TOT_MON': 'sum',
-            'PAY_TOT_PRO': 'sum',
-            'COLL_PERC': 'mean',
-            'ACTIVE_CONS': 'last'
-        }
-        
-        analysis_df = filtered_df.groupby('SDIV_NAME').agg(agg_dict).reset_index()
-    
     # Executive KPIs
     st.markdown('<div class="executive-card">', unsafe_allow_html=True)
     st.markdown("### 🎯 Key Performance Indicators")
     
+    kpi = headline_kpis(analysis_df)
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        total_energy = analysis_df["MONTHLY_ENERGY"].sum()
+        total_energy = kpi["total_energy"]
         st.markdown(f"""
         <div class="kpi-executive primary">
             <div class="kpi-icon">⚡</div>
@@ -534,7 +543,7 @@ with tab1:
         """, unsafe_allow_html=True)
     
     with col2:
-        total_billed = analysis_df["MON_UNITS_BILLED"].sum()
+        total_billed = kpi["total_billed"]
         st.markdown(f"""
         <div class="kpi-executive success">
             <div class="kpi-icon">💰</div>
@@ -545,7 +554,7 @@ with tab1:
         """, unsafe_allow_html=True)
     
     with col3:
-        total_net_meter = analysis_df["MON_UNITS_NET_MET"].sum()
+        total_net_meter = kpi["total_net_metering"]
         st.markdown(f"""
         <div class="kpi-executive info">
             <div class="kpi-icon">🔌</div>
@@ -556,10 +565,10 @@ with tab1:
         """, unsafe_allow_html=True)
     
     with col4:
-        avg_td_loss = analysis_df["MON_PERC_LOSS_TD"].mean()
-        status = "✅" if avg_td_loss <= NEPRA_LOSS_LIMIT else "❌"
+        avg_td_loss = kpi["avg_td_loss"]
+        status = "✅" if kpi["loss_compliant"] else "❌"
         st.markdown(f"""
-        <div class="kpi-executive {"danger" if avg_td_loss > NEPRA_LOSS_LIMIT else "success"}">
+        <div class="kpi-executive {"success" if kpi["loss_compliant"] else "danger"}">
             <div class="kpi-icon">📉</div>
             <div class="kpi-value">{avg_td_loss:.1f}% {status}</div>
             <div class="kpi-label">Avg T&D Loss</div>
@@ -568,7 +577,7 @@ with tab1:
         """, unsafe_allow_html=True)
     
     with col5:
-        avg_collection = analysis_df["COLL_PERC"].mean()
+        avg_collection = kpi["avg_collection"]
         st.markdown(f"""
         <div class="kpi-executive {"success" if avg_collection >= 90 else "warning" if avg_collection >= 70 else "danger"}">
             <div class="kpi-icon">📊</div>
@@ -588,54 +597,19 @@ with tab1:
     
     with col1:
         # Energy Distribution Pie Chart
-        energy_by_disco = analysis_df.groupby("SDIV_NAME")["MONTHLY_ENERGY"].sum().reset_index()
-        fig = px.pie(
-            energy_by_disco,
-            values="MONTHLY_ENERGY",
-            names="SDIV_NAME",
-            title="Energy Distribution by DISCO",
-            hole=0.4,
-            color_discrete_sequence=[COLORS["primary"], COLORS["secondary"], COLORS["info"], 
-                                   COLORS["success"], COLORS["warning"], COLORS["danger"]]
+        fig = figure_cache.get_or_build(
+            (*analysis_key, "energy_pie"),
+            lambda: create_energy_pie(analysis_df)
         )
-        fig.update_traces(
-            textposition='inside',
-            textinfo='percent+label',
-            hovertemplate="<b>%{label}</b><br>Energy: %{value:,.0f} MKWh<br>Share: %{percent}<extra></extra>"
-        )
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig, "energy_pie")
     
     with col2:
         # NEPRA Compliance Status
-        compliant_df = analysis_df.copy()
-        compliant_df["STATUS"] = compliant_df["MON_PERC_LOSS_TD"].apply(
-            lambda x: "Compliant" if x <= NEPRA_LOSS_LIMIT else "Non-Compliant"
-        )
-        status_counts = compliant_df["STATUS"].value_counts()
-        
-        fig = go.Figure(data=[go.Pie(
-            labels=status_counts.index,
-            values=status_counts.values,
-            hole=0.4,
-            marker=dict(colors=[COLORS["success"], COLORS["danger"]]),
-            textinfo='label+percent',
-            textposition='inside',
-            hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{percent}<extra></extra>"
-        )])
-        
-        compliant_count = len(compliant_df[compliant_df["STATUS"] == "Compliant"])
-        total_count = len(compliant_df)
-        
-        fig.update_layout(
-            title="NEPRA Compliance Status",
-            annotations=[dict(
-                text=f'{compliant_count}/{total_count}<br>DISCOs',
-                x=0.5, y=0.5, font_size=14, showarrow=False
-            )],
-            height=400
+        fig = figure_cache.get_or_build(
+            (*analysis_key, "compliance_pie"),
+            lambda: create_compliance_pie(analysis_df)
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig, "compliance_pie")
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -643,57 +617,46 @@ with tab1:
     st.markdown('<div class="executive-card">', unsafe_allow_html=True)
     st.markdown("### 🎯 Performance Matrix")
     
-    fig = px.scatter(
-        analysis_df,
-        x="MON_PERC_LOSS_TD",
-        y="COLL_PERC",
-        size="MONTHLY_ENERGY",
-        color="SDIV_NAME",
-        hover_name="SDIV_NAME",
-        hover_data={
-            "MON_PERC_LOSS_TD": ":.1f",
-            "PRO_PERC_LOSS_TD": ":.1f",
-            "COLL_PERC": ":.1f",
-            "MON_UNITS_NET_MET": ":,.0f",
-            "MONTHLY_ENERGY": ":,.0f",
-            "SDIV_NAME": False
-        },
-        labels={
-            "MON_PERC_LOSS_TD": "T&D Loss % (MON)",
-            "COLL_PERC": "Collection %",
-            "MONTHLY_ENERGY": "Monthly Energy (Size)",
-            "SDIV_NAME": "DISCO"
-        },
-        color_discrete_sequence=px.colors.qualitative.Set3
-    )
-    
-    # Add performance quadrants
-    fig.add_hline(y=90, line_dash="dash", line_color=COLORS["success"], 
-                 annotation_text="Target: 90%", annotation_position="top right")
-    fig.add_vline(x=NEPRA_LOSS_LIMIT, line_dash="dash", line_color=COLORS["danger"],
-                 annotation_text=f"NEPRA Limit: {NEPRA_LOSS_LIMIT}%", 
-                 annotation_position="top left")
-    
-    fig.update_layout(
-        height=500,
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(color=COLORS["dark"], size=12),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
+    fig = figure_cache.get_or_build(
+        (*analysis_key, "performance_matrix"),
+        lambda: create_performance_matrix(analysis_df)
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig, "performance_matrix", drill=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
 
 # ================= TAB 2: PERFORMANCE ANALYSIS =================
-with tab2:
+# Display name -> column of every metric the rankings can show
+PERFORMANCE_METRICS = {
+    "T&D Loss % (MON)": "MON_PERC_LOSS_TD",
+    "T&D Loss % (PRO)": "PRO_PERC_LOSS_TD",
+    "AT&C Loss % (MON)": "MON_ATC_LOSS",
+    "AT&C Loss % (PRO)": "PRO_ATC_LOSS",
+    "Collection %": "COLL_PERC",
+    "Assessment (PRO)": "ASSMNT_PRO",
+    "Recovery (PRO)": "PAY_TOT_PRO",
+    "Monthly Energy": "MONTHLY_ENERGY",
+    "Units Billed (MON)": "MON_UNITS_BILLED",
+    "Net Metering (MON)": "MON_UNITS_NET_MET",
+    "Active Consumers": "ACTIVE_CONS"
+}
+# Category -> (metrics offered, metrics selected by default, widget key)
+METRIC_CATEGORIES = {
+    "All Metrics": (list(PERFORMANCE_METRICS),
+                    ["T&D Loss % (MON)", "Collection %", "Monthly Energy"], "all_metrics"),
+    "Loss Analysis": ([name for name in PERFORMANCE_METRICS if "Loss" in name],
+                      ["T&D Loss % (MON)", "AT&C Loss % (MON)"], "loss_metrics"),
+    "Commercial Performance": (["Collection %", "Assessment (PRO)", "Recovery (PRO)"],
+                               ["Collection %"], "commercial_metrics"),
+    "Energy Metrics": (["Monthly Energy", "Units Billed (MON)", "Net Metering (MON)"],
+                       ["Monthly Energy"], "energy_metrics"),
+    "Consumer Metrics": (["Active Consumers"], ["Active Consumers"], "consumer_metrics"),
+}
+
+@st.fragment
+def render_performance():
+    sync_drill_path()
     st.markdown("### 📊 DETAILED PERFORMANCE ANALYSIS")
     
     # Metrics Selection
@@ -704,127 +667,38 @@ with tab2:
     with col1:
         metric_category = st.selectbox(
             "Select Metric Category",
-            ["All Metrics", "Loss Analysis", "Commercial Performance", "Energy Metrics", "Consumer Metrics"],
+            list(METRIC_CATEGORIES),
             key="metric_category"
         )
     
     with col2:
-        if metric_category == "All Metrics":
-            selected_metrics = st.multiselect(
-                "Select Metrics",
-                ["T&D Loss % (MON)", "T&D Loss % (PRO)", "AT&C Loss % (MON)", "AT&C Loss % (PRO)",
-                 "Collection %", "Assessment (PRO)", "Recovery (PRO)",
-                 "Monthly Energy", "Units Billed (MON)", "Net Metering (MON)",
-                 "Active Consumers"],
-                default=["T&D Loss % (MON)", "Collection %", "Monthly Energy"],
-                key="all_metrics"
-            )
-        elif metric_category == "Loss Analysis":
-            selected_metrics = st.multiselect(
-                "Select Metrics",
-                ["T&D Loss % (MON)", "T&D Loss % (PRO)", "AT&C Loss % (MON)", "AT&C Loss % (PRO)"],
-                default=["T&D Loss % (MON)", "AT&C Loss % (MON)"],
-                key="loss_metrics"
-            )
-        elif metric_category == "Commercial Performance":
-            selected_metrics = st.multiselect(
-                "Select Metrics",
-                ["Collection %", "Assessment (PRO)", "Recovery (PRO)"],
-                default=["Collection %"],
-                key="commercial_metrics"
-            )
-        elif metric_category == "Energy Metrics":
-            selected_metrics = st.multiselect(
-                "Select Metrics",
-                ["Monthly Energy", "Units Billed (MON)", "Net Metering (MON)"],
-                default=["Monthly Energy"],
-                key="energy_metrics"
-            )
-        else:
-            selected_metrics = st.multiselect(
-                "Select Metrics",
-                ["Active Consumers"],
-                default=["Active Consumers"],
-                key="consumer_metrics"
-            )
+        options, default, key = METRIC_CATEGORIES[metric_category]
+        selected_metrics = st.multiselect("Select Metrics", options, default=default, key=key)
     
     st.markdown('</div>', unsafe_allow_html=True)
     
     if selected_metrics:
-        # Metric mapping
-        metric_map = {
-            "T&D Loss % (MON)": "MON_PERC_LOSS_TD",
-            "T&D Loss % (PRO)": "PRO_PERC_LOSS_TD",
-            "AT&C Loss % (MON)": "MON_ATC_LOSS",
-            "AT&C Loss % (PRO)": "PRO_ATC_LOSS",
-            "Collection %": "COLL_PERC",
-            "Assessment (PRO)": "ASSMNT_PRO",
-            "Recovery (PRO)": "PAY_TOT_PRO",
-            "Monthly Energy": "MONTHLY_ENERGY",
-            "Units Billed (MON)": "MON_UNITS_BILLED",
-            "Net Metering (MON)": "MON_UNITS_NET_MET",
-            "Active Consumers": "ACTIVE_CONS"
-        }
-        
         # Performance Charts for each selected metric
         for metric_name in selected_metrics:
             st.markdown(f'<div class="executive-card">', unsafe_allow_html=True)
             st.markdown(f"### 📈 {metric_name} - {selected_month}")
             
-            metric_col = metric_map[metric_name]
+            metric_col = PERFORMANCE_METRICS[metric_name]
             
             # Sort data for better visualization
-            chart_df = analysis_df.sort_values(metric_col, 
-                                             ascending=("Loss" in metric_name))
-            
-            fig = go.Figure()
+            chart_df, ranking = ranked_metric(metric_col, ascending=("Loss" in metric_name))
             
-            # Add bars
-            fig.add_trace(go.Bar(
-                x=chart_df["SDIV_NAME"],
-                y=chart_df[metric_col],
-                marker_color=COLORS["primary"],
-                text=[f"{v:,.0f}" if metric_col in ["MONTHLY_ENERGY", "MON_UNITS_BILLED", 
-                                                  "MON_UNITS_NET_MET", "ACTIVE_CONS", 
-                                                  "ASSMNT_PRO", "PAY_TOT_PRO"]
-                     else f"{v:.1f}%" for v in chart_df[metric_col]],
-                textposition='outside',
-                hovertemplate="<b>%{x}</b><br>" +
-                             f"{metric_name}: " +
-                             ("%{y:,.0f}" if metric_col in ["MONTHLY_ENERGY", "MON_UNITS_BILLED", 
-                                                          "MON_UNITS_NET_MET", "ACTIVE_CONS",
-                                                          "ASSMNT_PRO", "PAY_TOT_PRO"]
-                             else "%{y:.1f}%") +
-                             "<extra></extra>"
-            ))
-            
-            # Add threshold line for loss metrics
-            if "Loss" in metric_name:
-                fig.add_hline(
-                    y=NEPRA_LOSS_LIMIT,
-                    line_dash="dash",
-                    line_color=COLORS["danger"],
-                    annotation_text=f"NEPRA Limit: {NEPRA_LOSS_LIMIT}%",
-                    annotation_position="top right"
-                )
-            
-            fig.update_layout(
-                height=400,
-                xaxis_title="DISCO",
-                yaxis_title=metric_name,
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                font=dict(color=COLORS["dark"], size=12),
-                margin=dict(t=50, b=100, l=60, r=30),
-                xaxis_tickangle=-45
+            fig = figure_cache.get_or_build(
+                (*analysis_key, "metric_ranking", metric_name),
+                lambda: create_metric_ranking_chart(chart_df, metric_name, metric_col)
             )
             
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(fig, f"metric_ranking: {metric_name}", drill=True)
             
             # Add summary statistics
             col1, col2, col3 = st.columns(3)
             with col1:
-                avg_value = chart_df[metric_col].mean()
+                avg_value = ranking["average"]
                 st.metric(
                     label="Average",
                     value=f"{avg_value:,.1f}" + ("%" if "%" in metric_name else ""),
@@ -832,8 +706,8 @@ with tab2:
                 )
             
             with col2:
-                max_value = chart_df[metric_col].max()
-                max_disco = chart_df.loc[chart_df[metric_col].idxmax(), "SDIV_NAME"]
+                max_value = ranking["max"]
+                max_disco = ranking["max_disco"]
                 st.metric(
                     label="Highest",
                     value=f"{max_value:,.1f}" + ("%" if "%" in metric_name else ""),
@@ -841,8 +715,8 @@ with tab2:
                 )
             
             with col3:
-                min_value = chart_df[metric_col].min()
-                min_disco = chart_df.loc[chart_df[metric_col].idxmin(), "SDIV_NAME"]
+                min_value = ranking["min"]
+                min_disco = ranking["min_disco"]
                 st.metric(
                     label="Lowest",
                     value=f"{min_value:,.1f}" + ("%" if "%" in metric_name else ""),
@@ -854,134 +728,101 @@ with tab2:
         st.info("📊 Please select at least one metric to display")
 
 # ================= TAB 3: TREND & COMPARISON =================
-with tab3:
+COMPARISON_METRICS = {
+    "T&D Loss %": "MON_PERC_LOSS_TD",
+    "Collection %": "COLL_PERC",
+    "Monthly Energy": "MONTHLY_ENERGY",
+    "Net Metering": "MON_UNITS_NET_MET"
+}
+TREND_PERIODS = ["Last 6 Months", "Last 12 Months", "All Available Months"]
+
+def render_trends():
     st.markdown("### 📈 TREND & COMPARATIVE ANALYSIS")
-    
+    render_period_comparison()
+    render_disco_trend()
+
+# Tab-local widgets live in fragments: changing them reruns only the
+# fragment, not upload handling, the global filter or the tab-1 rollup.
+@st.fragment
+def render_period_comparison():
+    sync_drill_path()
     # Three Month Comparison Section
     st.markdown('<div class="executive-card">', unsafe_allow_html=True)
     st.markdown("### 🔄 Three-Month Comparison Analysis")
     
-    # Get available months for comparison
-    available_months = sorted(df["BILLING_MONTH"].unique(), reverse=True)
+    # Current month, previous month and (same month last year or third latest)
+    comparison = comparison_periods(months)
     
-    if len(available_months) >= 3:
-        # Get three comparison periods
-        current_month_date = available_months[0]
-        previous_month_date = available_months[1]
+    if comparison is not None:
+        current_month_date, previous_month_date, same_month_last_year = [period for _, period in comparison]
         
-        # Find same month previous year
-        same_month_last_year = None
-        for month in available_months:
-            if month.year == current_month_date.year - 1 and month.month == current_month_date.month:
-                same_month_last_year = month
-                break
+        # Create month labels
+        month1_label = period_label(current_month_date)
+        month2_label = period_label(previous_month_date)
+        month3_label = period_label(same_month_last_year)
         
-        # If not found, use the third most recent month
-        if same_month_last_year is None and len(available_months) >= 3:
-            same_month_last_year = available_months[2]
+        col1, col2 = st.columns(2)
         
-        if same_month_last_year:
-            # Create month labels
-            month1_label = current_month_date.strftime("%b %Y")
-            month2_label = previous_month_date.strftime("%b %Y")
-            month3_label = same_month_last_year.strftime("%b %Y")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                compare_metric = st.selectbox(
-                    "Select Metric for Comparison",
-                    ["T&D Loss %", "Collection %", "Monthly Energy", "Net Metering"],
-                    key="trend_metric"
+        with col1:
+            compare_metric = st.selectbox(
+                "Select Metric for Comparison",
+                list(COMPARISON_METRICS),
+                key="trend_metric"
+            )
+        
+        with col2:
+            st.info(f"""
+            **Comparison Periods:**
+            - Current: {month1_label}
+            - Previous: {month2_label}
+            - Year Ago: {month3_label}
+            """)
+        
+        # Get data for three periods
+        metric_col = COMPARISON_METRICS[compare_metric]
+        
+        # One (DISCO x month) pivot covers every comparison period; the
+        # first period is the reference the others are compared against
+        periods = [period for _, period in comparison]
+        pivot = comparison_pivot(selected_discos, periods, metric_col)
+        
+        if pivot.notna().any().any():
+            # Create comparison chart
+            fig = figure_cache.get_or_build(
+                (data_version(min(periods), max(periods)), "period_comparison", compare_metric,
+                 tuple(periods), tuple(selected_discos)),
+                lambda: create_comparison_bar_chart(
+                    pivot.rename(columns=period_label),
+                    f"{compare_metric} - Three Period Comparison",
+                    compare_metric + (" (%)" if "%" in compare_metric else ""),
+                    is_percentage=("%" in compare_metric)
                 )
+            )
+            show_chart(fig, "period_comparison", drill=True)
             
-            with col2:
-                st.info(f"""
-                **Comparison Periods:**
-                - Current: {month1_label}
-                - Previous: {month2_label}
-                - Year Ago: {month3_label}
-                """)
-            
-            # Get data for three periods
-            metric_map = {
-                "T&D Loss %": "MON_PERC_LOSS_TD",
-                "Collection %": "COLL_PERC",
-                "Monthly Energy": "MONTHLY_ENERGY",
-                "Net Metering": "MON_UNITS_NET_MET"
-            }
-            
-            metric_col = metric_map[compare_metric]
-            
-            # Prepare data for chart
-            comparison_data = {}
-            
-            # Current month
-            current_data = df[(df["BILLING_MONTH"] == current_month_date) & 
-                             (df["SDIV_NAME"].isin(selected_discos))]
-            if not current_data.empty:
-                comparison_data[month1_label] = dict(zip(current_data["SDIV_NAME"], current_data[metric_col]))
-            
-            # Previous month
-            prev_data = df[(df["BILLING_MONTH"] == previous_month_date) & 
-                          (df["SDIV_NAME"].isin(selected_discos))]
-            if not prev_data.empty:
-                comparison_data[month2_label] = dict(zip(prev_data["SDIV_NAME"], prev_data[metric_col]))
+            # Month-over-Month Change Table (numeric; the table renderer formats it)
+            st.markdown("### 📋 Month-over-Month Change Analysis")
             
-            # Same month last year
-            year_ago_data = df[(df["BILLING_MONTH"] == same_month_last_year) & 
-                              (df["SDIV_NAME"].isin(selected_discos))]
-            if not year_ago_data.empty:
-                comparison_data[month3_label] = dict(zip(year_ago_data["SDIV_NAME"], year_ago_data[metric_col]))
+            change_df = change_table(pivot, comparison)
             
-            if comparison_data:
-                # Create comparison chart
-                fig = create_comparison_bar_chart(
-                    comparison_data,
-                    f"{compare_metric} - Three Period Comparison",
-                    compare_metric + (" (%)" if "%" in compare_metric else ""),
-                    is_percentage=("%" in compare_metric)
+            if not change_df.empty:
+                st.dataframe(
+                    change_df,
+                    hide_index=True,
+                    use_container_width=True,
+                    height=300,
+                    column_config={
+                        col: st.column_config.NumberColumn(format="%+.1f" if col.startswith("Δ") else "%.1f")
+                        for col in change_df.columns if col != "DISCO"
+                    }
                 )
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Month-over-Month Change Table
-                st.markdown("### 📋 Month-over-Month Change Analysis")
-                
-                change_data = []
-                for disco in selected_discos:
-                    # Get values for each period
-                    val1 = comparison_data.get(month1_label, {}).get(disco, np.nan)
-                    val2 = comparison_data.get(month2_label, {}).get(disco, np.nan)
-                    val3 = comparison_data.get(month3_label, {}).get(disco, np.nan)
-                    
-                    if not (pd.isna(val1) and pd.isna(val2) and pd.isna(val3)):
-                        change_current = val1 - val2 if not (pd.isna(val1) or pd.isna(val2)) else np.nan
-                        change_year = val1 - val3 if not (pd.isna(val1) or pd.isna(val3)) else np.nan
-                        
-                        change_data.append({
-                            "DISCO": disco,
-                            f"{month1_label}": f"{val1:.1f}" if not pd.isna(val1) else "N/A",
-                            f"{month2_label}": f"{val2:.1f}" if not pd.isna(val2) else "N/A",
-                            f"Δ Current vs Prev": f"{change_current:+.1f}" if not pd.isna(change_current) else "N/A",
-                            f"{month3_label}": f"{val3:.1f}" if not pd.isna(val3) else "N/A",
-                            f"Δ vs Year Ago": f"{change_year:+.1f}" if not pd.isna(change_year) else "N/A"
-                        })
-                
-                if change_data:
-                    change_df = pd.DataFrame(change_data)
-                    st.dataframe(
-                        change_df,
-                        hide_index=True,
-                        use_container_width=True,
-                        height=300
-                    )
-        else:
-            st.warning("⚠️ Not enough historical data for year-over-year comparison")
     else:
         st.warning("⚠️ Need at least 3 months of data for comparison analysis")
     
     st.markdown('</div>', unsafe_allow_html=True)
-    
+
+@st.fragment
+def render_disco_trend():
     # Individual DISCO Trend Analysis
     st.markdown('<div class="executive-card">', unsafe_allow_html=True)
     st.markdown("### 📊 Individual DISCO Trend Analysis")
@@ -998,41 +839,36 @@ with tab3:
     with col2:
         trend_months_count = st.selectbox(
             "Select Trend Period",
-            ["Last 6 Months", "Last 12 Months", "All Available Months"],
+            TREND_PERIODS,
             key="trend_period"
         )
     
     # Get trend data
-    if trend_months_count == "Last 6 Months":
-        trend_month_list = months[-6:] if len(months) >= 6 else months
-    elif trend_months_count == "Last 12 Months":
-        trend_month_list = months[-12:] if len(months) >= 12 else months
-    else:
-        trend_month_list = months
+    trend_range = period_range(months, trend_months_count)
     
-    trend_data = df[(df["MONTH"].isin(trend_month_list)) & 
-                   (df["SDIV_NAME"] == trend_disco)].sort_values("BILLING_MONTH")
+    trend_data = disco_time_series(trend_disco, *trend_range)
     
     if not trend_data.empty:
-        fig = create_trend_chart(
-            trend_data,
-            trend_disco,
-            f"{trend_months_count} Performance Trend"
+        fig = figure_cache.get_or_build(
+            (data_version(*trend_range), "disco_trend", trend_disco, trend_months_count, trend_range),
+            lambda: create_trend_chart(
+                trend_data,
+                trend_disco,
+                f"{trend_months_count} Performance Trend"
+            )
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig, "disco_trend")
         
-        # Calculate trends (only numeric columns)
-        numeric_cols = trend_data.select_dtypes(include=[np.number]).columns.tolist()
-        if len(trend_data) >= 2 and len(numeric_cols) > 0:
-            latest = trend_data.iloc[-1]
-            previous = trend_data.iloc[-2]
+        # Latest value and change from the month before (numeric columns only)
+        changes = latest_changes(trend_data)
+        if not changes.empty:
+            latest = changes["latest"]
             
-            # Calculate changes only for numeric columns that exist
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                if "MON_PERC_LOSS_TD" in numeric_cols:
-                    td_change = latest["MON_PERC_LOSS_TD"] - previous["MON_PERC_LOSS_TD"]
+                if "MON_PERC_LOSS_TD" in changes.index:
+                    td_change = changes.at["MON_PERC_LOSS_TD", "change"]
                     st.metric(
                         "T&D Loss Trend",
                         f"{latest['MON_PERC_LOSS_TD']:.1f}%",
@@ -1041,8 +877,8 @@ with tab3:
                     )
             
             with col2:
-                if "COLL_PERC" in numeric_cols:
-                    coll_change = latest["COLL_PERC"] - previous["COLL_PERC"]
+                if "COLL_PERC" in changes.index:
+                    coll_change = changes.at["COLL_PERC", "change"]
                     st.metric(
                         "Collection Trend",
                         f"{latest['COLL_PERC']:.1f}%",
@@ -1050,8 +886,8 @@ with tab3:
                     )
             
             with col3:
-                if "MON_UNITS_NET_MET" in numeric_cols:
-                    nm_change = latest["MON_UNITS_NET_MET"] - previous["MON_UNITS_NET_MET"]
+                if "MON_UNITS_NET_MET" in changes.index:
+                    nm_change = changes.at["MON_UNITS_NET_MET", "change"]
                     st.metric(
                         "Net Metering Trend",
                         format_number(latest["MON_UNITS_NET_MET"]),
@@ -1059,8 +895,8 @@ with tab3:
                     )
             
             with col4:
-                if "MONTHLY_ENERGY" in numeric_cols:
-                    energy_change = latest["MONTHLY_ENERGY"] - previous["MONTHLY_ENERGY"]
+                if "MONTHLY_ENERGY" in changes.index:
+                    energy_change = changes.at["MONTHLY_ENERGY", "change"]
                     st.metric(
                         "Energy Trend",
                         format_number(latest["MONTHLY_ENERGY"]),
@@ -1072,9 +908,15 @@ with tab3:
     st.markdown('</div>', unsafe_allow_html=True)
 
 # ================= TAB 4: DEEP INSIGHTS =================
-with tab4:
+INSIGHT_PERIODS = ["Last 6 Months", "Last 12 Months", "All Available"]
+
+def render_insights():
     st.markdown("### 🔍 DEEP INSIGHTS & ANALYTICS")
-    
+    render_time_series_insights()
+    render_executive_summary()
+
+@st.fragment
+def render_time_series_insights():
     # Time Series Analysis
     st.markdown('<div class="executive-card">', unsafe_allow_html=True)
     st.markdown("### 📈 Time Series Analysis")
@@ -1091,329 +933,50 @@ with tab4:
     with col2:
         insight_period = st.selectbox(
             "Select Analysis Period",
-            ["Last 6 Months", "Last 12 Months", "All Available"],
+            INSIGHT_PERIODS,
             key="insight_period"
         )
     
     # Get time series data
-    if insight_period == "Last 6 Months":
-        insight_months = months[-6:] if len(months) >= 6 else months
-    elif insight_period == "Last 12 Months":
-        insight_months = months[-12:] if len(months) >= 12 else months
-    else:
-        insight_months = months
+    insight_range = period_range(months, insight_period)
     
-    time_series_data = df[(df["MONTH"].isin(insight_months)) & 
-                         (df["SDIV_NAME"] == insight_disco)].sort_values("BILLING_MONTH")
+    time_series_data = disco_time_series(insight_disco, *insight_range)
     
     if not time_series_data.empty:
-        # Create subplot figure with 3 subplots for better visualization
-        fig = make_subplots(
-            rows=3, cols=1,
-            subplot_titles=[
-                f"{insight_disco} - Loss & Collection Trends", 
-                "Units Billed Trend",
-                "Net Metering Trend"
-            ],
-            vertical_spacing=0.15,
-            row_heights=[0.4, 0.3, 0.3]
-        )
-        
-        # Subplot 1: T&D Loss and Collection %
-        # Add T&D Loss trend
-        fig.add_trace(
-            go.Scatter(
-                x=time_series_data["MONTH"],
-                y=time_series_data["MON_PERC_LOSS_TD"],
-                mode='lines+markers',
-                name='T&D Loss %',
-                line=dict(color=COLORS["danger"], width=3),
-                marker=dict(size=8),
-                hovertemplate="<b>T&D Loss</b><br>Month: %{x}<br>Value: %{y:.1f}%<extra></extra>"
-            ),
-            row=1, col=1
-        )
-        
-        # Add Collection % trend
-        fig.add_trace(
-            go.Scatter(
-                x=time_series_data["MONTH"],
-                y=time_series_data["COLL_PERC"],
-                mode='lines+markers',
-                name='Collection %',
-                line=dict(color=COLORS["success"], width=3),
-                marker=dict(size=8),
-                hovertemplate="<b>Collection %</b><br>Month: %{x}<br>Value: %{y:.1f}%<extra></extra>",
-                yaxis="y2"
-            ),
-            row=1, col=1
-        )
-        
-        # Add NEPRA limit line for T&D Loss
-        fig.add_hline(
-            y=NEPRA_LOSS_LIMIT,
-            line_dash="dash",
-            line_color=COLORS["danger"],
-            annotation_text=f"NEPRA Limit: {NEPRA_LOSS_LIMIT}%",
-            annotation_position="top right",
-            row=1, col=1
-        )
-        
-        # Add 90% target line for Collection
-        fig.add_hline(
-            y=90,
-            line_dash="dash",
-            line_color=COLORS["success"],
-            annotation_text="Target: 90%",
-            annotation_position="bottom right",
-            row=1, col=1
-        )
-        
-        # Subplot 2: Units Billed Trend
-        if "MON_UNITS_BILLED" in time_series_data.columns:
-            # Check if units billed data exists and is not all zeros/NaN
-            if time_series_data["MON_UNITS_BILLED"].notna().any() and time_series_data["MON_UNITS_BILLED"].sum() > 0:
-                # Find appropriate scaling factor
-                max_units = time_series_data["MON_UNITS_BILLED"].max()
-                if max_units >= 1_000_000:
-                    scale_factor = 1_000_000
-                    scale_label = "M Units"
-                elif max_units >= 1_000:
-                    scale_factor = 1_000
-                    scale_label = "K Units"
-                else:
-                    scale_factor = 1
-                    scale_label = "Units"
-                
-                fig.add_trace(
-                    go.Bar(
-                        x=time_series_data["MONTH"],
-                        y=time_series_data["MON_UNITS_BILLED"] / scale_factor,
-                        name=f'Units Billed ({scale_label})',
-                        marker_color=COLORS["primary"],
-                        hovertemplate="<b>Units Billed</b><br>Month: %{x}<br>Value: %{y:,.0f} " + scale_label + "<extra></extra>"
-                    ),
-                    row=2, col=1
-                )
-        
-        # Subplot 3: Net Metering Trend
-        if "MON_UNITS_NET_MET" in time_series_data.columns:
-            # Check if net metering data exists and is not all zeros/NaN
-            if time_series_data["MON_UNITS_NET_MET"].notna().any() and time_series_data["MON_UNITS_NET_MET"].sum() > 0:
-                # Find appropriate scaling factor
-                max_net_meter = time_series_data["MON_UNITS_NET_MET"].max()
-                if max_net_meter >= 1_000_000:
-                    scale_factor_nm = 1_000_000
-                    scale_label_nm = "M Units"
-                elif max_net_meter >= 1_000:
-                    scale_factor_nm = 1_000
-                    scale_label_nm = "K Units"
-                else:
-                    scale_factor_nm = 1
-                    scale_label_nm = "Units"
-                
-                fig.add_trace(
-                    go.Bar(
-                        x=time_series_data["MONTH"],
-                        y=time_series_data["MON_UNITS_NET_MET"] / scale_factor_nm,
-                        name=f'Net Metering ({scale_label_nm})',
-                        marker_color=COLORS["info"],
-                        hovertemplate="<b>Net Metering</b><br>Month: %{x}<br>Value: %{y:,.0f} " + scale_label_nm + "<extra></extra>"
-                    ),
-                    row=3, col=1
-                )
-        
-        # Update layout
-        fig.update_layout(
-            height=900,
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font=dict(color=COLORS["dark"], size=12),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="center",
-                x=0.5
-            ),
-            margin=dict(t=80, b=50, l=60, r=30),
-            showlegend=True
-        )
-        
-        # Update axes for subplot 1 (dual y-axes)
-        fig.update_yaxes(
-            title_text="T&D Loss %",
-            titlefont=dict(color=COLORS["danger"]),
-            tickfont=dict(color=COLORS["danger"]),
-            row=1, col=1
-        )
-        
-        # Add secondary y-axis for Collection %
-        fig.update_layout(
-            yaxis2=dict(
-                title="Collection %",
-                titlefont=dict(color=COLORS["success"]),
-                tickfont=dict(color=COLORS["success"]),
-                anchor="x",
-                overlaying="y",
-                side="right"
-            )
+        fig = figure_cache.get_or_build(
+            (data_version(*insight_range), "insight_subplots", insight_disco, insight_range),
+            lambda: create_time_series_subplots(time_series_data, insight_disco)
         )
         
-        # Update axes for subplot 2 (Units Billed)
-        if "MON_UNITS_BILLED" in time_series_data.columns and time_series_data["MON_UNITS_BILLED"].notna().any():
-            max_units = time_series_data["MON_UNITS_BILLED"].max()
-            if max_units >= 1_000_000:
-                yaxis_title = "Million Units"
-            elif max_units >= 1_000:
-                yaxis_title = "Thousand Units"
-            else:
-                yaxis_title = "Units"
-            
-            fig.update_yaxes(
-                title_text=yaxis_title,
-                row=2, col=1
-            )
-        
-        # Update axes for subplot 3 (Net Metering)
-        if "MON_UNITS_NET_MET" in time_series_data.columns and time_series_data["MON_UNITS_NET_MET"].notna().any():
-            max_net_meter = time_series_data["MON_UNITS_NET_MET"].max()
-            if max_net_meter >= 1_000_000:
-                yaxis_title_nm = "Million Units"
-            elif max_net_meter >= 1_000:
-                yaxis_title_nm = "Thousand Units"
-            else:
-                yaxis_title_nm = "Units"
-            
-            fig.update_yaxes(
-                title_text=yaxis_title_nm,
-                row=3, col=1
-            )
-        
-        # Update x-axes for all subplots
-        fig.update_xaxes(title_text="Month", row=3, col=1)
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig, "insight_subplots")
         
         # Performance Summary - Alternative View with Line Chart
         st.markdown('<div class="executive-card">', unsafe_allow_html=True)
         st.markdown("### 📊 Alternative View: All Metrics in One Chart")
         
-        # Create a multi-line chart for all key metrics
-        fig2 = go.Figure()
-        
-        # Add T&D Loss (scaled for visibility)
-        fig2.add_trace(go.Scatter(
-            x=time_series_data["MONTH"],
-            y=time_series_data["MON_PERC_LOSS_TD"],
-            mode='lines+markers',
-            name='T&D Loss %',
-            line=dict(color=COLORS["danger"], width=3),
-            marker=dict(size=8),
-            yaxis='y1'
-        ))
-        
-        # Add Collection %
-        fig2.add_trace(go.Scatter(
-            x=time_series_data["MONTH"],
-            y=time_series_data["COLL_PERC"],
-            mode='lines+markers',
-            name='Collection %',
-            line=dict(color=COLORS["success"], width=3),
-            marker=dict(size=8),
-            yaxis='y1'
-        ))
-        
-        # Add Units Billed (scaled appropriately)
-        if "MON_UNITS_BILLED" in time_series_data.columns:
-            # Normalize units billed for better visualization
-            if time_series_data["MON_UNITS_BILLED"].max() > 0:
-                units_billed_norm = (time_series_data["MON_UNITS_BILLED"] / time_series_data["MON_UNITS_BILLED"].max()) * 100
-                fig2.add_trace(go.Scatter(
-                    x=time_series_data["MONTH"],
-                    y=units_billed_norm,
-                    mode='lines+markers',
-                    name='Units Billed (Normalized %)',
-                    line=dict(color=COLORS["primary"], width=2, dash='dot'),
-                    marker=dict(size=6),
-                    yaxis='y2',
-                    hovertemplate="<b>Units Billed (Normalized)</b><br>Month: %{x}<br>Value: %{y:.1f}%<br>Actual: " + 
-                                 time_series_data["MON_UNITS_BILLED"].apply(lambda x: f"{x:,.0f}") + "<extra></extra>"
-                ))
-        
-        # Add Net Metering (scaled appropriately)
-        if "MON_UNITS_NET_MET" in time_series_data.columns:
-            # Normalize net metering for better visualization
-            if time_series_data["MON_UNITS_NET_MET"].max() > 0:
-                net_meter_norm = (time_series_data["MON_UNITS_NET_MET"] / time_series_data["MON_UNITS_NET_MET"].max()) * 100
-                fig2.add_trace(go.Scatter(
-                    x=time_series_data["MONTH"],
-                    y=net_meter_norm,
-                    mode='lines+markers',
-                    name='Net Metering (Normalized %)',
-                    line=dict(color=COLORS["info"], width=2, dash='dot'),
-                    marker=dict(size=6),
-                    yaxis='y2',
-                    hovertemplate="<b>Net Metering (Normalized)</b><br>Month: %{x}<br>Value: %{y:.1f}%<br>Actual: " + 
-                                 time_series_data["MON_UNITS_NET_MET"].apply(lambda x: f"{x:,.0f}") + "<extra></extra>"
-                ))
-        
-        # Update layout for dual y-axes
-        fig2.update_layout(
-            title=f"{insight_disco} - All Metrics (Normalized View)",
-            height=500,
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font=dict(color=COLORS["dark"], size=12),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="center",
-                x=0.5
-            ),
-            margin=dict(t=80, b=80, l=60, r=60),
-            xaxis=dict(title="Month"),
-            yaxis=dict(
-                title="Percentage (%)",
-                titlefont=dict(color=COLORS["dark"]),
-                tickfont=dict(color=COLORS["dark"])
-            ),
-            yaxis2=dict(
-                title="Normalized Value (%)",
-                titlefont=dict(color=COLORS["primary"]),
-                tickfont=dict(color=COLORS["primary"]),
-                anchor="x",
-                overlaying="y",
-                side="right"
-            ),
-            hovermode='x unified'
+        fig2 = figure_cache.get_or_build(
+            (data_version(*insight_range), "insight_normalized", insight_disco, insight_range),
+            lambda: create_normalized_metrics_chart(time_series_data, insight_disco)
         )
         
-        st.plotly_chart(fig2, use_container_width=True)
+        show_chart(fig2, "insight_normalized")
         st.markdown('</div>', unsafe_allow_html=True)
         
         # Performance Summary
         st.markdown('<div class="executive-card">', unsafe_allow_html=True)
         st.markdown("### 📋 Performance Summary")
         
-        if len(time_series_data) >= 2:
-            # Get only numeric columns for averaging
-            numeric_cols = time_series_data.select_dtypes(include=[np.number]).columns
-            
-            # Calculate 3-month average only for numeric columns
-            if len(time_series_data) >= 3:
-                avg_3m = time_series_data.tail(3)[numeric_cols].mean()
-            else:
-                avg_3m = time_series_data[numeric_cols].mean()
-            
-            latest = time_series_data.iloc[-1]
+        # Latest month against the 3-month average (numeric columns only)
+        trend = three_month_trend(time_series_data)
+        if not trend.empty:
+            latest = trend["latest"]
+            growth = trend["change_pct"]
             
             col1, col2, col3, col4, col5 = st.columns(5)
             
             with col1:
-                if "MON_PERC_LOSS_TD" in numeric_cols:
-                    td_trend = "Improving" if latest["MON_PERC_LOSS_TD"] < avg_3m["MON_PERC_LOSS_TD"] else "Declining"
+                if "MON_PERC_LOSS_TD" in trend.index:
+                    td_trend = "Improving" if trend.at["MON_PERC_LOSS_TD", "improving"] else "Declining"
                     st.metric(
                         "T&D Loss",
                         f"{latest['MON_PERC_LOSS_TD']:.1f}%",
@@ -1422,8 +985,8 @@ with tab4:
                     )
             
             with col2:
-                if "COLL_PERC" in numeric_cols:
-                    coll_trend = "Improving" if latest["COLL_PERC"] > avg_3m["COLL_PERC"] else "Declining"
+                if "COLL_PERC" in trend.index:
+                    coll_trend = "Improving" if trend.at["COLL_PERC", "improving"] else "Declining"
                     st.metric(
                         "Collection",
                         f"{latest['COLL_PERC']:.1f}%",
@@ -1431,8 +994,8 @@ with tab4:
                     )
             
             with col3:
-                if "MONTHLY_ENERGY" in numeric_cols:
-                    energy_growth = ((latest["MONTHLY_ENERGY"] - avg_3m["MONTHLY_ENERGY"]) / avg_3m["MONTHLY_ENERGY"]) * 100
+                if "MONTHLY_ENERGY" in trend.index:
+                    energy_growth = growth["MONTHLY_ENERGY"]
                     st.metric(
                         "Energy",
                         format_number(latest["MONTHLY_ENERGY"]),
@@ -1440,8 +1003,8 @@ with tab4:
                     )
             
             with col4:
-                if "MON_UNITS_BILLED" in numeric_cols:
-                    billed_growth = ((latest["MON_UNITS_BILLED"] - avg_3m["MON_UNITS_BILLED"]) / avg_3m["MON_UNITS_BILLED"]) * 100
+                if "MON_UNITS_BILLED" in trend.index:
+                    billed_growth = growth["MON_UNITS_BILLED"]
                     st.metric(
                         "Units Billed",
                         format_number(latest["MON_UNITS_BILLED"]),
@@ -1449,8 +1012,8 @@ with tab4:
                     )
             
             with col5:
-                if "MON_UNITS_NET_MET" in numeric_cols:
-                    nm_growth = ((latest["MON_UNITS_NET_MET"] - avg_3m["MON_UNITS_NET_MET"]) / avg_3m["MON_UNITS_NET_MET"]) * 100
+                if "MON_UNITS_NET_MET" in trend.index:
+                    nm_growth = growth["MON_UNITS_NET_MET"]
                     st.metric(
                         "Net Metering",
                         format_number(latest["MON_UNITS_NET_MET"]),
@@ -1458,41 +1021,39 @@ with tab4:
                     )
     
     st.markdown('</div>', unsafe_allow_html=True)
-    
+
+def render_executive_summary():
     # Executive Summary
     st.markdown('<div class="executive-card">', unsafe_allow_html=True)
     st.markdown("### 📄 Executive Summary")
     
-    # Calculate key insights using only numeric columns
-    numeric_analysis_df = analysis_df.select_dtypes(include=[np.number])
-    
-    if "MON_PERC_LOSS_TD" in numeric_analysis_df.columns:
-        compliant_discos = analysis_df[analysis_df["MON_PERC_LOSS_TD"] <= NEPRA_LOSS_LIMIT]
-        non_compliant_discos = analysis_df[analysis_df["MON_PERC_LOSS_TD"] > NEPRA_LOSS_LIMIT]
+    # Key insights need a numeric loss column
+    if "MON_PERC_LOSS_TD" in analysis_df.select_dtypes(include=[np.number]).columns:
+        summary = executive_summary(analysis_df)
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("#### 🎯 Key Achievements")
             st.markdown(f"""
-            - **{len(compliant_discos)}/{len(analysis_df)} DISCOs** compliant with NEPRA loss limits
-            - **{format_number(analysis_df['MON_UNITS_NET_MET'].sum())}** total net metering units
-            - **{analysis_df['COLL_PERC'].mean():.1f}%** average collection rate
-            - **{format_number(analysis_df['MON_UNITS_BILLED'].sum())}** total units billed
+            - **{summary['compliant']}/{summary['discos']} DISCOs** compliant with NEPRA loss limits
+            - **{format_number(summary['total_net_metering'])}** total net metering units
+            - **{summary['avg_collection']:.1f}%** average collection rate
+            - **{format_number(summary['total_billed'])}** total units billed
             """)
         
         with col2:
             st.markdown("#### ⚠️ Areas for Improvement")
-            if len(non_compliant_discos) > 0:
-                non_compliant_list = ", ".join(non_compliant_discos["SDIV_NAME"].tolist()[:3])
-                if len(non_compliant_discos) > 3:
-                    non_compliant_list += f" and {len(non_compliant_discos)-3} more"
+            if summary["non_compliant"] > 0:
+                non_compliant_list = ", ".join(summary["non_compliant_discos"][:3])
+                if summary["non_compliant"] > 3:
+                    non_compliant_list += f" and {summary['non_compliant']-3} more"
                 
                 st.markdown(f"""
-                - **{len(non_compliant_discos)} DISCOs** exceed NEPRA loss limits
-                - **{non_compliant_discos['MON_PERC_LOSS_TD'].mean():.1f}%** average loss in non-compliant DISCOs
-                - **{format_number(analysis_df['MON_UNITS_LOST'].sum())}** total units lost
-                - **Lowest collection**: {analysis_df['COLL_PERC'].min():.1f}%
+                - **{summary['non_compliant']} DISCOs** exceed NEPRA loss limits
+                - **{summary['non_compliant_avg_loss']:.1f}%** average loss in non-compliant DISCOs
+                - **{format_number(summary['total_lost'])}** total units lost
+                - **Lowest collection**: {summary['lowest_collection']:.1f}%
                 """)
             else:
                 st.markdown("""
@@ -1505,26 +1066,80 @@ with tab4:
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+# ================= PRECOMPUTE =================
+# Queue what the other sections and their DISCO pickers will ask for, so it
+# is computed while the active section renders; cached keys are skipped
+with ledger.stage("prefetch"):
+    for metric_name, metric_col in PERFORMANCE_METRICS.items():
+        ranked_metric(metric_col, "Loss" in metric_name, prefetch=True)
+    
+    comparison = comparison_periods(months)
+    if comparison is not None:
+        for metric_col in COMPARISON_METRICS.values():
+            comparison_pivot(selected_discos, [period for _, period in comparison], metric_col, prefetch=True)
+    
+    # A DuckDB series query scans the whole file (it is laid out month-major),
+    # so only the DISCO the pickers open on is fetched ahead in that mode
+    series_ranges = {period_range(months, option) for option in TREND_PERIODS + INSIGHT_PERIODS}
+    for disco in selected_discos[:1 if query_backend else PRECOMPUTE_MAX_DISCOS]:
+        for series_range in series_ranges:
+            disco_time_series(disco, *series_range, prefetch=True)
+
+# ================= ACTIVE SECTION =================
+with ledger.stage(active_section):
+    {
+        "overview": render_overview,
+        "performance": render_performance,
+        "trends": render_trends,
+        "insights": render_insights,
+    }[SECTIONS[active_section]]()
+stop_instrumentation()
+
+if ledger.enabled:
+    history = st.session_state.setdefault("rerun_history", deque(maxlen=RERUN_HISTORY_LENGTH))
+    history.append({"at": datetime.now().strftime("%H:%M:%S"), **ledger.summary()})
+    
+    with st.sidebar.expander("🧪 This rerun by stage", expanded=True):
+        stages = pd.DataFrame(ledger.stages)
+        stages["stage"] = ["\u2003" * depth + name for depth, name in zip(stages["depth"], stages["stage"])]
+        for col in ("allocated", "peak", "payload_bytes"):
+            if col in stages:
+                stages[col] = stages[col] / 1024**2
+        st.dataframe(
+            stages.drop(columns="depth"),
+            column_config={
+                "seconds": st.column_config.NumberColumn("Time (s)", format="%.3f"),
+                "allocated": st.column_config.NumberColumn("Allocated (MB)", format="%.2f"),
+                "peak": st.column_config.NumberColumn("Peak (MB)", format="%.2f"),
+                "payload_bytes": st.column_config.NumberColumn("Chart JSON (MB)", format="%.3f"),
+            },
+            hide_index=True,
+            use_container_width=True,
+        )
+        caption = f"Rerun total: {ledger.elapsed():.3f} s"
+        if ledger.memory:
+            caption += f" | peak above stage start: {ledger.peak() / 1024**2:,.2f} MB"
+        st.caption(caption + ". Upload shows load and prep only when a new file is parsed.")
+    
+    with st.sidebar.expander(f"🧪 Last {len(history)} reruns"):
+        st.dataframe(
+            pd.DataFrame([{"at": run["at"], "total (s)": run["seconds"], **run["stages"]} for run in history]),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+if profiler:
+    PROFILE_DIR.mkdir(exist_ok=True)
+    profile_path = PROFILE_DIR / f"rerun-{datetime.now():%Y%m%d-%H%M%S}.prof"
+    profiler.dump_stats(profile_path)
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(20)
+    with st.sidebar.expander("🧪 Profiled rerun", expanded=True):
+        st.caption(f"Saved to {profile_path}")
+        st.download_button("Download .prof", profile_path.read_bytes(),
+                           file_name=profile_path.name, mime="application/octet-stream")
+        st.code(report.getvalue(), language=None)
+
 # ================= EXECUTIVE FOOTER =================
 st.markdown("---")
-st.markdown(f"""
-<div style="
-    background: linear-gradient(135deg, {COLORS["primary"]}, {COLORS["dark"]});
-    color: white;
-    padding: 20px;
-    border-radius: 10px;
-    text-align: center;
-    margin-top: 30px;
-    border: 1px solid rgba(253, 140, 23, 0.3);
-">
-    <div style="font-weight: 800; margin-bottom: 10px; font-size: 16px;">
-        NATIONAL POWER SECTOR EXECUTIVE DASHBOARD
-    </div>
-    <div style="font-size: 14px; margin-bottom: 15px; opacity: 0.9;">
-        ⚡ Real-time Performance Monitoring | 📊 NEPRA Compliance | 🎯 Executive Decision Support
-    </div>
-    <div style="font-size: 12px; opacity: 0.7;">
-        📅 Last Updated: {pd.Timestamp.now().strftime("%d %b %Y %H:%M")} | 📊 Data Source: DISCO Performance Reports
-    </div>
-</div>
-""", unsafe_allow_html=True)
+st.markdown(footer_html(datetime.now().strftime("%d %b %Y %H:%M")), unsafe_allow_html=True)
@@ -0,0 +1,134 @@
+"""Dashboard KPIs as plain functions over DataFrames.
+
+Everything the sections display is computed here from the prepped frame,
+the DISCO/month index and the rollup cube, without importing Streamlit, so
+the same numbers can be produced by batch jobs, benchmarks and profilers.
+``iram.py`` only calls these and renders the results. The (DISCO x month)
+pivot behind the period comparison lives in ``comparison``.
+
+Typical headless use::
+
+    key, df = load_dataset(name, data, DatasetCache(max_bytes))
+    index = DiscoMonthIndex(df)
+    cube = RollupCube(df, index)
+    analysis = analysis_frame(df, index, cube, index.discos, start, end)
+    headline_kpis(analysis)
+"""
+
+import numpy as np
+import pandas as pd
+
+from schema import NAME_COLUMN
+
+NEPRA_LOSS_LIMIT = 4.1
+
+# Metrics where a value below the recent average is an improvement
+LOWER_IS_BETTER = {"MON_PERC_LOSS_TD", "PRO_PERC_LOSS_TD", "MON_ATC_LOSS", "PRO_ATC_LOSS"}
+
+
+def analysis_frame(df, index, cube, discos, start, end):
+    """One row per DISCO for a period window.
+
+    A single month returns that month's rows as they are; a longer window
+    returns the ``AGG_DICT`` roll-up from the cube.
+    """
+    if start == end:
+        return index.select(df, discos, start, end)
+    return cube.window(discos, start, end)
+
+
+def headline_kpis(analysis_df, loss_limit=NEPRA_LOSS_LIMIT):
+    """Totals and averages shown on the overview KPI cards"""
+    avg_td_loss = analysis_df["MON_PERC_LOSS_TD"].mean()
+    return {
+        "total_energy": analysis_df["MONTHLY_ENERGY"].sum(),
+        "total_billed": analysis_df["MON_UNITS_BILLED"].sum(),
+        "total_net_metering": analysis_df["MON_UNITS_NET_MET"].sum(),
+        "avg_td_loss": avg_td_loss,
+        "loss_compliant": bool(avg_td_loss <= loss_limit),
+        "avg_collection": analysis_df["COLL_PERC"].mean(),
+    }
+
+
+def compliance_status(analysis_df, loss_limit=NEPRA_LOSS_LIMIT):
+    """"Compliant"/"Non-Compliant" per row of ``analysis_df`` against the NEPRA limit.
+
+    A missing loss value counts as non-compliant.
+    """
+    return pd.Series(
+        np.where(analysis_df["MON_PERC_LOSS_TD"] <= loss_limit, "Compliant", "Non-Compliant"),
+        index=analysis_df.index,
+        name="STATUS",
+    )
+
+
+def metric_ranking(analysis_df, metric_col, ascending):
+    """``(ranked, stats)``: DISCOs sorted by one metric, plus average and extremes"""
+    ranked = analysis_df.sort_values(metric_col, ascending=ascending)
+    values = ranked[metric_col]
+    stats = {
+        "average": values.mean(),
+        "max": values.max(),
+        "max_disco": ranked.loc[values.idxmax(), NAME_COLUMN],
+        "min": values.min(),
+        "min_disco": ranked.loc[values.idxmin(), NAME_COLUMN],
+    }
+    return ranked, stats
+
+
+def latest_changes(series_data):
+    """Latest value and change from the previous row for every numeric column.
+
+    ``series_data`` is one DISCO's rows in month order; returns a frame
+    indexed by column with ``latest`` and ``change``, empty for fewer than
+    two rows.
+    """
+    numeric = series_data.select_dtypes(include=[np.number])
+    if len(numeric) < 2:
+        return pd.DataFrame(columns=["latest", "change"], dtype="float64")
+    latest = numeric.iloc[-1].astype(float)
+    return pd.DataFrame({"latest": latest, "change": latest - numeric.iloc[-2].astype(float)})
+
+
+def three_month_trend(series_data):
+    """Latest value against the average of the last three rows, per numeric column.
+
+    Returns a frame indexed by column with ``latest``, ``avg_3m``,
+    ``change_pct`` (relative to the average; inf or NaN when the average is
+    zero) and ``improving``, which honours ``LOWER_IS_BETTER``. Empty for
+    fewer than two rows.
+    """
+    numeric = series_data.select_dtypes(include=[np.number])
+    if len(numeric) < 2:
+        return pd.DataFrame(columns=["latest", "avg_3m", "change_pct", "improving"])
+    # Densified: a sparse column would turn the whole mean Series sparse
+    avg_3m = numeric.tail(3).mean().astype(float)
+    latest = numeric.iloc[-1].astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change_pct = (latest - avg_3m) / avg_3m * 100
+    lower_is_better = latest.index.isin(list(LOWER_IS_BETTER))
+    improving = np.where(lower_is_better, latest < avg_3m, latest > avg_3m)
+    return pd.DataFrame({
+        "latest": latest,
+        "avg_3m": avg_3m,
+        "change_pct": change_pct,
+        "improving": improving,
+    })
+
+
+def executive_summary(analysis_df, loss_limit=NEPRA_LOSS_LIMIT):
+    """Figures quoted in the executive summary for the analysed window"""
+    loss = analysis_df["MON_PERC_LOSS_TD"]
+    non_compliant = analysis_df[loss > loss_limit]
+    return {
+        "discos": len(analysis_df),
+        "compliant": int((loss <= loss_limit).sum()),
+        "non_compliant": len(non_compliant),
+        "non_compliant_discos": non_compliant[NAME_COLUMN].tolist(),
+        "non_compliant_avg_loss": non_compliant["MON_PERC_LOSS_TD"].mean(),
+        "total_net_metering": analysis_df["MON_UNITS_NET_MET"].sum(),
+        "total_billed": analysis_df["MON_UNITS_BILLED"].sum(),
+        "total_lost": analysis_df["MON_UNITS_LOST"].sum(),
+        "avg_collection": analysis_df["COLL_PERC"].mean(),
+        "lowest_collection": analysis_df["COLL_PERC"].min(),
+    }
@@ -0,0 +1,64 @@
+"""Integer month keys for the billing calendar.
+
+A billing month is identified by its period ordinal ``year * 12 + month - 1``.
+Ordinals sort chronologically, consecutive months differ by one and a
+"same month last year" lookup is a subtraction, so filtering and sorting
+never touch strings. Human-readable labels are only produced for the
+handful of values that end up on screen.
+"""
+
+import numpy as np
+import pandas as pd
+
+LABEL_FORMAT = "%b %Y"
+
+
+def to_period(dates):
+    """Period ordinals for a datetime Series (int32)"""
+    return (dates.dt.year * 12 + dates.dt.month - 1).astype("int32")
+
+
+def period_year(period):
+    return int(period) // 12
+
+
+def period_timestamp(period):
+    """First day of the month a period ordinal refers to"""
+    year, month0 = divmod(int(period), 12)
+    return pd.Timestamp(year=year, month=month0 + 1, day=1)
+
+
+def period_label(period):
+    """Display label such as "Mar 2024" for a single period ordinal"""
+    return period_timestamp(period).strftime(LABEL_FORMAT)
+
+
+def period_labels(periods):
+    """Display labels for an array or Series of ordinals.
+
+    Labels are formatted once per distinct period and broadcast back, so the
+    cost depends on the number of months rather than the number of rows.
+    """
+    values = np.asarray(periods)
+    uniques, inverse = np.unique(values, return_inverse=True)
+    labels = np.array([period_label(p) for p in uniques], dtype=object)
+    return labels[inverse.reshape(-1)]
+
+
+def period_range(periods, option, today=None):
+    """Inclusive ``(start, end)`` ordinals for a named window over sorted periods.
+
+    ``option`` is a time-period choice from the UI: "Year-to-Date",
+    "Last N Months" or anything else for the full history. The "Last N"
+    windows count distinct months present in the data, so gaps in the
+    history widen the window rather than shrinking it.
+    """
+    if len(periods) == 0:
+        return None
+    if option == "Year-to-Date":
+        year = (today or pd.Timestamp.now()).year
+        return year * 12, year * 12 + 11
+    if option.startswith("Last "):
+        count = int(option.split()[1])
+        return int(periods[-min(count, len(periods))]), int(periods[-1])
+    return int(periods[0]), int(periods[-1])
@@ -0,0 +1,151 @@
+"""Background precomputation of section results.
+
+Once a dataset is loaded and the filters are known, the metric rankings,
+comparison pivots and per-DISCO time series that the other sections show
+follow from the data alone. They are submitted to a small thread pool right
+away, while the user is still reading the overview, so opening a section or
+switching DISCO finds them ready. Most of the work is NumPy gathers and
+pandas reductions, which release the GIL, so the workers do run in parallel.
+
+Results are shared between sessions and must be treated as read-only.
+Rankings and DISCO series are frames, several MB each at the subdivision
+level, so the cache is bounded by their total size as well as their count.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+
+def result_nbytes(result):
+    """Deep size of the frames and series in a result (or a tuple/list of them)"""
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(deep=True).sum())
+    if isinstance(result, pd.Series):
+        return int(result.memory_usage(deep=True))
+    if isinstance(result, (tuple, list)):
+        return sum(result_nbytes(item) for item in result)
+    return 0
+
+
+class PrecomputeCache:
+    """LRU of results by key, filled ahead of time by a thread pool.
+
+    ``prefetch`` schedules a computation unless its key is already known;
+    ``get`` returns the result, waiting for a scheduled computation or
+    running it inline on a miss. A computation that failed in the pool is
+    dropped and retried inline, so errors surface where the result is used.
+
+    A result's size is counted once it is ready; past ``max_bytes`` the
+    least recently used entries are evicted, as they are past
+    ``max_entries``. A single result larger than the budget is still
+    returned but not kept.
+    """
+
+    def __init__(self, max_entries, workers, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.waits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="precompute")
+
+    def prefetch(self, key, compute, *args):
+        """Schedule ``compute(*args)`` under ``key`` unless it is cached or pending"""
+        with self._lock:
+            if key in self._entries:
+                return
+            future = self._entries[key] = self._pool.submit(compute, *args)
+            self._evict()
+        # Outside the lock: the callback runs right away if already done
+        future.add_done_callback(partial(self._count, key))
+
+    def get(self, key, compute, *args):
+        """Result stored under ``key``, computing ``compute(*args)`` inline if absent"""
+        with self._lock:
+            future = self._entries.get(key)
+            if future is not None:
+                self._entries.move_to_end(key)
+                if future.done():
+                    self.hits += 1
+                else:
+                    self.waits += 1
+            else:
+                self.misses += 1
+
+        if future is not None:
+            try:
+                return future.result()
+            # Eviction cancels queued work a rerun may already be waiting
+            # on, and CancelledError is not an Exception
+            except (CancelledError, Exception):
+                with self._lock:
+                    if self._entries.get(key) is future:
+                        self._discard(key)
+
+        result = compute(*args)
+        done = Future()
+        done.set_result(result)
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = done
+            self._evict()
+        self._count(key, done)
+        return result
+
+    def _count(self, key, future):
+        """Add a finished result's size to the total, evicting past ``max_bytes``"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        nbytes = result_nbytes(future.result())
+        with self._lock:
+            if self._entries.get(key) is not future or key in self._sizes:
+                return
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                # Would evict everything else and still not fit
+                del self._entries[key]
+                self.evictions += 1
+                return
+            self._sizes[key] = nbytes
+            self.nbytes += nbytes
+            self._evict()
+
+    def _discard(self, key):
+        # Caller holds the lock
+        del self._entries[key]
+        self.nbytes -= self._sizes.pop(key, 0)
+
+    def _evict(self):
+        # Caller holds the lock; pending computations are cancelled if still queued
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            key, future = next(iter(self._entries.items()))
+            self._discard(key)
+            future.cancel()
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "ready": sum(1 for f in self._entries.values() if f.done()),
+                "max_entries": self.max_entries,
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "waits": self.waits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
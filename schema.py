@@ -0,0 +1,95 @@
+"""Column layout of the DISCO performance dataset.
+
+The dashboard reads a fixed set of columns out of the uploaded file; keeping
+them declared here lets ingestion skip everything else and lets the
+aggregation and the readers agree on one list.
+"""
+
+DATE_COLUMN = "BILLING_MONTH"
+NAME_COLUMN = "SDIV_NAME"
+
+# How each metric rolls up when several months are aggregated per DISCO
+AGG_DICT = {
+    'MONTHLY_ENERGY': 'sum',
+    'CUMULATIVE_ENERGY': 'last',
+    'MON_UNITS_BILLED': 'sum',
+    'PRO_UNITS_BILLED': 'last',
+    'MON_UNITS_RECVD': 'sum',
+    'PRO_UNITS_RECVD': 'last',
+    'MON_UNITS_LOST': 'sum',
+    'PRO_UNITS_LOST': 'last',
+    'MON_ATC_LOSS': 'mean',
+    'PRO_ATC_LOSS': 'mean',
+    'MON_PERC_LOSS_TD': 'mean',
+    'PRO_PERC_LOSS_TD': 'mean',
+    'MON_UNITS_NET_MET': 'sum',
+    'PRO_UNITS_NET_MET': 'sum',
+    'MON_WHEELED_UNITS': 'sum',
+    'PRO_WHEELED_UNITS': 'sum',
+    'ASSMNT_MON': 'sum',
+    'ASSMNT_PRO': 'sum',
+    'PAY_TOT_MON': 'sum',
+    'PAY_TOT_PRO': 'sum',
+    'COLL_PERC': 'mean',
+    'ACTIVE_CONS': 'last'
+}
+
+# How each metric rolls up across the subdivisions of a DISCO, circle or
+# division in one month: PRO_*/cumulative totals add up like monthly units
+LEVEL_AGG = {col: "mean" if how == "mean" else "sum" for col, how in AGG_DICT.items()}
+# Percentages that are ratios of summed parts are recomputed from those parts
+# at each level instead, so every subdivision weighs in by its size:
+# (numerator, denominator) for T&D loss and collection, and for AT&C loss the
+# T&D loss and collection pairs it combines, 100 - (100 - T&D%) x collection%
+LEVEL_RATIOS = {
+    'MON_PERC_LOSS_TD': ('MON_UNITS_LOST', 'MON_UNITS_RECVD'),
+    'PRO_PERC_LOSS_TD': ('PRO_UNITS_LOST', 'PRO_UNITS_RECVD'),
+    'COLL_PERC': ('PAY_TOT_MON', 'ASSMNT_MON'),
+}
+LEVEL_ATC = {
+    'MON_ATC_LOSS': (('MON_UNITS_LOST', 'MON_UNITS_RECVD'), ('PAY_TOT_MON', 'ASSMNT_MON')),
+    'PRO_ATC_LOSS': (('PRO_UNITS_LOST', 'PRO_UNITS_RECVD'), ('PAY_TOT_PRO', 'ASSMNT_PRO')),
+}
+
+# Optional organisational levels above SDIV_NAME, outermost first (see hierarchy.py)
+HIERARCHY_COLUMNS = ["DISCO_NAME", "CIRCLE_NAME", "DIV_NAME"]
+
+METRIC_COLUMNS = list(AGG_DICT)
+USED_COLUMNS = [DATE_COLUMN, *HIERARCHY_COLUMNS, NAME_COLUMN, *METRIC_COLUMNS]
+# Every uploaded file or sheet must carry these; the metrics may vary by export
+REQUIRED_COLUMNS = [DATE_COLUMN, NAME_COLUMN]
+
+# Explicit parser dtypes for the name columns, so a chunk of numeric-looking
+# names never comes back as numbers. Metrics are parsed natively and cast to
+# float per chunk (exports leave blanks for missing months), keeping text only
+# where a cell is not a number; see ingest.read_csv_chunked.
+CSV_DTYPES = {
+    NAME_COLUMN: str,
+    **{col: str for col in HIERARCHY_COLUMNS},
+}
+
+PERIOD_COLUMN = "PERIOD"  # Integer month key derived at ingest (see periods.py)
+
+# Compact in-memory layout applied once at ingest. Names repeat on every row,
+# so they are stored as categoricals; percentages never need more than
+# float32 precision, while energy and unit totals stay float64 because
+# their sums run into the billions. Net-metering and wheeled units are zero
+# for most subdivisions and go sparse when that pays off.
+CATEGORY_COLUMNS = [*HIERARCHY_COLUMNS, NAME_COLUMN]
+FLOAT32_COLUMNS = [
+    'MON_ATC_LOSS',
+    'PRO_ATC_LOSS',
+    'MON_PERC_LOSS_TD',
+    'PRO_PERC_LOSS_TD',
+    'COLL_PERC',
+]
+SPARSE_COLUMNS = [
+    'MON_UNITS_NET_MET',
+    'PRO_UNITS_NET_MET',
+    'MON_WHEELED_UNITS',
+    'PRO_WHEELED_UNITS',
+]
+# A sparse float64 value costs 12 bytes (value + int32 position) against 8
+# dense, so sparse only wins once roughly two thirds of the rows are zero
+SPARSE_MIN_ZERO_FRACTION = 0.7
+CALENDAR_DTYPES = {"YEAR": "int16", "MONTH_NUM": "int8"}
@@ -0,0 +1,208 @@
+"""Optional DuckDB query backend over a Parquet copy of the prepped dataset.
+
+The in-memory pipeline answers every filter and roll-up from the pandas
+frame plus the DISCO/month index and the rollup cube, which together cost
+about twice the frame. For datasets where that is too much, the prepped
+frame can be written once to Parquet and the dashboard's queries compiled
+to SQL instead:
+
+    filter          rows for the selected DISCOs in a month window
+    roll-up         ``AGG_DICT`` per DISCO over a window (tab 1)
+    pivot           one metric per DISCO and comparison month (tab 3)
+    time series     one DISCO over a window (trend and insights)
+
+DuckDB runs them in-process on all cores, reads only the referenced
+columns and skips row groups whose PERIOD/SDIV_NAME statistics fall outside
+the filter. Only result rows reach pandas. The file is written month-major,
+so a month window touches a contiguous run of row groups. A monthly
+history is written as one file per month instead, so an append only writes
+the new months.
+
+DuckDB is an optional dependency; ``available()`` reports whether it is
+installed without importing it, so the module stays cheap to load while the
+backend is off.
+"""
+
+import importlib.util
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from schema import AGG_DICT, NAME_COLUMN, PERIOD_COLUMN
+
+ROW_GROUP_ROWS = 64 * 1024  # Granularity at which scans can skip rows
+
+
+def available():
+    # Optional: pip install duckdb
+    return importlib.util.find_spec("duckdb") is not None
+
+
+def parquet_path(directory, key):
+    return Path(directory) / f"{key}.prepped.parquet"
+
+
+def write_parquet(df, path, row_group_rows=ROW_GROUP_ROWS):
+    """Write a prepped frame as month-major Parquet for the SQL backend.
+
+    Sparse columns are densified, since Parquet has no sparse layout. The
+    file is written under a temporary name and renamed into place.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    codes = df[NAME_COLUMN].cat.codes.to_numpy()
+    order = np.lexsort((codes, df[PERIOD_COLUMN].to_numpy()))
+    dense = {col: df[col].sparse.to_dense() for col in df.columns
+             if isinstance(df[col].dtype, pd.SparseDtype)}
+    table = pa.Table.from_pandas(df.assign(**dense).take(order), preserve_index=False)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        pq.write_table(table, tmp_path, row_group_size=row_group_rows)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return path
+
+
+def ensure_parquet(df, path):
+    """Write ``df`` to ``path`` unless the file is already there.
+
+    An existing file has its modification time touched, so snapshot pruning
+    treats it as recently used. Returns the path.
+    """
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        write_parquet(df, path)
+    return Path(path)
+
+
+def write_month_parquets(df, directory, names):
+    """One Parquet file per month of a prepped history, for the SQL backend.
+
+    ``names`` maps each period ordinal to a file stem that changes with the
+    month's content (e.g. its history partition hash). Only months without
+    a file under their stem are written, so an append costs the new months,
+    and files no longer listed are deleted. Returns the paths, oldest first.
+    """
+    directory = Path(directory)
+    paths = {period: directory / f"{stem}.parquet" for period, stem in names.items()}
+    for period, path in paths.items():
+        if not path.exists():
+            write_parquet(df[df[PERIOD_COLUMN] == period], path)
+    current = set(paths.values())
+    for path in directory.glob("*.parquet"):
+        if path not in current:
+            path.unlink(missing_ok=True)
+    return [paths[period] for period in sorted(paths)]
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class DuckDBBackend:
+    """SQL versions of the index, cube and pivot lookups over Parquet files.
+
+    ``paths`` is one file or several (e.g. a history's month files) read as
+    one table.
+
+    Results match ``DiscoMonthIndex.select``, ``RollupCube.window`` and
+    ``period_pivot`` on the same data: rows come back DISCO-major in month
+    order and SDIV_NAME is categorical over every DISCO in the dataset.
+    Sparse and float32 columns come back as dense float64 in roll-ups.
+    Queries may run from several threads at once; each uses its own cursor.
+    """
+
+    def __init__(self, paths, threads=None):
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("The SQL backend needs DuckDB: pip install duckdb") from None
+        self.paths = [Path(paths)] if isinstance(paths, (str, Path)) else [Path(p) for p in paths]
+        self._conn = duckdb.connect(":memory:")
+        if threads:
+            self._conn.execute(f"SET threads = {int(threads)}")
+        sources = ", ".join("'" + str(path).replace("'", "''") + "'" for path in self.paths)
+        self._conn.execute(f"CREATE VIEW dataset AS SELECT * FROM read_parquet([{sources}], union_by_name = true)")
+        self._lock = threading.Lock()
+
+        # Roll-ups cover the columns that are numeric in every file
+        numeric = None
+        for path in self.paths:
+            fields = {field.name for field in pq.read_schema(path)
+                      if pa.types.is_integer(field.type) or pa.types.is_floating(field.type)}
+            numeric = fields if numeric is None else numeric & fields
+        self._columns = [(col, how) for col, how in AGG_DICT.items() if col in numeric]
+        self.months = [int(p) for (p,) in self._query(
+            f"SELECT DISTINCT {PERIOD_COLUMN} FROM dataset ORDER BY 1").fetchall()]
+        self.discos = sorted(name for (name,) in self._query(
+            f"SELECT DISTINCT {NAME_COLUMN} FROM dataset WHERE {NAME_COLUMN} IS NOT NULL").fetchall())
+
+    def _query(self, sql, params=None):
+        with self._lock:
+            cursor = self._conn.cursor()
+        return cursor.execute(sql, params or [])
+
+    def _where(self, discos, start, end):
+        """WHERE clause and parameters for a DISCO list and inclusive month window"""
+        clause = f"{PERIOD_COLUMN} BETWEEN ? AND ?"
+        params = [int(start), int(end)]
+        discos = list(discos)
+        # Every DISCO selected is the common case; the name filter would prune nothing
+        if set(discos) != set(self.discos):
+            clause += f" AND {NAME_COLUMN} IN ({', '.join('?' * len(discos)) or 'NULL'})"
+            params += discos
+        return clause, params
+
+    def _frame(self, sql, params):
+        df = self._query(sql, params).df()
+        df[NAME_COLUMN] = pd.Categorical(df[NAME_COLUMN], categories=self.discos)
+        return df
+
+    def select(self, discos, start, end):
+        """Rows for ``discos`` between two periods, ordered by DISCO then month"""
+        where, params = self._where(discos, start, end)
+        return self._frame(
+            f"SELECT * FROM dataset WHERE {where} ORDER BY {NAME_COLUMN}, {PERIOD_COLUMN}", params)
+
+    def window(self, discos, start, end):
+        """Per-DISCO ``AGG_DICT`` roll-up between two periods, one row per DISCO"""
+        aggregates = []
+        for col, how in self._columns:
+            name = _quote(col)
+            if how == "sum":
+                aggregates.append(f"COALESCE(SUM({name}), 0)::DOUBLE AS {name}")
+            elif how == "mean":
+                aggregates.append(f"AVG({name})::DOUBLE AS {name}")
+            else:
+                # Last non-null value in month order
+                aggregates.append(f"arg_max({name}, {PERIOD_COLUMN}) FILTER (WHERE {name} IS NOT NULL)"
+                                  f"::DOUBLE AS {name}")
+        where, params = self._where(discos, start, end)
+        return self._frame(
+            f"SELECT {NAME_COLUMN}, {', '.join(aggregates)} FROM dataset "
+            f"WHERE {where} AND {NAME_COLUMN} IS NOT NULL GROUP BY {NAME_COLUMN} ORDER BY {NAME_COLUMN}",
+            params,
+        )
+
+    def pivot(self, discos, periods, column):
+        """``period_pivot``: one row per DISCO, one column per period, NaN where absent"""
+        if not len(discos) or not len(periods):
+            return pd.DataFrame(np.full((len(discos), len(periods)), np.nan),
+                                index=pd.Index(discos, name=NAME_COLUMN), columns=list(periods))
+        where, params = self._where(discos, min(periods), max(periods))
+        rows = self._query(
+            f"SELECT {NAME_COLUMN}, {PERIOD_COLUMN}, {_quote(column)}::DOUBLE AS value FROM dataset "
+            f"WHERE {where} AND {PERIOD_COLUMN} IN ({', '.join('?' * len(periods))})",
+            params + [int(p) for p in periods],
+        ).df()
+        pivot = rows.pivot(index=NAME_COLUMN, columns=PERIOD_COLUMN, values="value")
+        pivot = pivot.reindex(index=pd.Index(discos, name=NAME_COLUMN), columns=list(periods))
+        pivot.columns.name = None
+        return pivot.astype("float64")
@@ -0,0 +1,127 @@
+"""Per-stage timing and memory accounting for one rerun.
+
+The script wraps each pipeline stage (upload, prep, filter, aggregate, the
+active section and every chart it draws) in ``ledger.stage(name)``. With
+timing on, each stage records its wall-clock time; charts also record the
+size of their JSON payload. With memory on, each stage records bytes
+allocated and the transient peak through ``tracemalloc``, which NumPy and
+pandas report their buffers to. Both are opt-in. A disabled ledger records
+nothing, and tracing in particular slows allocation-heavy code noticeably.
+Tracing is process-wide, so memory figures from concurrent sessions that are
+also tracing include each other's allocations.
+"""
+
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+
+_tracing_sessions = 0
+_tracing_lock = threading.Lock()
+
+
+def _release_tracing():
+    global _tracing_sessions
+    with _tracing_lock:
+        _tracing_sessions -= 1
+        if _tracing_sessions == 0:
+            tracemalloc.stop()
+
+
+def figure_json_bytes(fig):
+    """Size of the JSON Plotly sends to the browser for ``fig``"""
+    import plotly.io as pio
+    return len(pio.to_json(fig, validate=False).encode())
+
+
+class StageLedger:
+    """Seconds, allocated and peak bytes per pipeline stage of one rerun.
+
+    Stages may nest. Each record carries its ``depth``, and records are
+    stored in the order their stages started. ``allocated`` is what a stage
+    left behind and ``peak`` is the highest transient usage above its
+    starting point. A started ledger that is never stopped (``st.stop()`` or
+    an exception mid-rerun) releases its share of tracing when it is garbage
+    collected.
+    """
+
+    def __init__(self, timing=False, memory=False):
+        self.timing = timing
+        self.memory = memory
+        self.stages = []
+        self._open = []
+        self._finalizer = None
+        self._started = time.perf_counter()
+
+    @property
+    def enabled(self):
+        return self.timing or self.memory
+
+    @property
+    def _tracing(self):
+        return self._finalizer is not None and self._finalizer.alive
+
+    def start(self):
+        global _tracing_sessions
+        self._started = time.perf_counter()
+        if not self.memory or self._tracing:
+            return
+        with _tracing_lock:
+            if _tracing_sessions == 0:
+                tracemalloc.start()
+            _tracing_sessions += 1
+        self._finalizer = weakref.finalize(self, _release_tracing)
+
+    def stop(self):
+        if self._tracing:
+            self._finalizer()
+
+    @contextmanager
+    def stage(self, name, figure=None):
+        """Record the ``with`` block under ``name``; ``figure`` adds its payload size"""
+        if not self.enabled:
+            yield
+            return
+        record = {"stage": name, "depth": len(self._open)}
+        self.stages.append(record)
+        self._open.append(record)
+        tracing = self._tracing
+        if tracing:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._open.pop()
+            if tracing:
+                # A nested stage resets the peak, so it hands its own up
+                after, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, record.pop("_child_peak", 0))
+                record["allocated"] = after - before
+                record["peak"] = peak - before
+                if self._open:
+                    parent = self._open[-1]
+                    parent["_child_peak"] = max(parent.get("_child_peak", 0), peak)
+            if self.timing:
+                record["seconds"] = elapsed
+                if figure is not None:
+                    record["payload_bytes"] = figure_json_bytes(figure)
+
+    def elapsed(self):
+        """Seconds since ``start()``"""
+        return time.perf_counter() - self._started
+
+    def peak(self):
+        """Highest per-stage peak recorded so far, in bytes"""
+        return max((s.get("peak", 0) for s in self.stages), default=0)
+
+    def summary(self):
+        """Totals for a rerun history: elapsed time and per top-level stage seconds"""
+        return {
+            "seconds": self.elapsed(),
+            "stages": {s["stage"]: s.get("seconds") for s in self.stages if s["depth"] == 0},
+            "peak": self.peak() if self.memory else None,
+        }
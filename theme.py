@@ -0,0 +1,288 @@
+"""Company colours and the page's static HTML: styles, header and footer.
+
+Streamlit re-executes the dashboard script on every widget click, so markup
+built inline there is re-formatted on each rerun. The strings here depend
+only on ``COLORS`` and are built once when the module is first imported;
+the script just hands them to ``st.markdown``. Nothing here imports pandas
+or Plotly, so the page chrome draws before any data module is loaded.
+"""
+
+# Company color scheme, shared by the charts and the page styles
+COLORS = {
+    "primary": "#800000",      # Maroon (Company Primary)
+    "secondary": "#fd8c17",    # Orange (Company Secondary)
+    "accent": "#FFFFFF",       # White
+    "success": "#4CAF50",      # Green
+    "warning": "#FFC107",      # Amber
+    "danger": "#FF5252",       # Red
+    "info": "#2196F3",         # Light Blue
+    "dark": "#263238",         # Dark Blue Gray
+    "light": "#F5F5F5",        # Light Gray
+    "white": "#FFFFFF",
+    "maroon_light": "#A00000",
+    "orange_light": "#FFA726",
+    "gradient_start": "#800000",
+    "gradient_mid": "#fd8c17",
+    "gradient_end": "#FFD700"
+}
+
+
+PAGE_STYLE = f"""
+<style>
+/* Executive Dashboard Theme */
+:root {{
+    --primary: {COLORS["primary"]};
+    --secondary: {COLORS["secondary"]};
+    --accent: {COLORS["accent"]};
+    --success: #4CAF50;
+    --warning: #FFC107;
+    --danger: #FF5252;
+    --dark: #1a1a1a;
+    --light: #f8f9fa;
+}}
+
+/* Executive Header */
+.executive-header {{
+    background: linear-gradient(135deg, {COLORS["primary"]}, {COLORS["secondary"]});
+    padding: 30px;
+    border-radius: 15px;
+    margin-bottom: 30px;
+    text-align: center;
+    color: white;
+    box-shadow: 0 8px 32px rgba(128, 0, 0, 0.2);
+    border: 1px solid rgba(253, 140, 23, 0.3);
+}}
+
+/* Executive Cards */
+.executive-card {{
+    background: rgba(255, 255, 255, 0.98);
+    backdrop-filter: blur(10px);
+    border-radius: 15px;
+    padding: 25px;
+    margin-bottom: 25px;
+    border: 1px solid rgba(128, 0, 0, 0.1);
+    box-shadow: 0 6px 20px rgba(0, 0, 0, 0.08);
+    transition: all 0.3s ease;
+    position: relative;
+    overflow: hidden;
+}}
+
+.executive-card::before {{
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    height: 4px;
+    background: linear-gradient(90deg, {COLORS["primary"]}, {COLORS["secondary"]});
+}}
+
+/* Executive KPI Cards */
+.kpi-executive {{
+    background: linear-gradient(135deg, {COLORS["dark"]}, #2c3e50);
+    border-radius: 12px;
+    padding: 20px;
+    color: white;
+    position: relative;
+    overflow: hidden;
+    transition: all 0.3s ease;
+    box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
+    border-left: 4px solid {COLORS["primary"]};
+}}
+
+.kpi-executive.primary {{ 
+    background: linear-gradient(135deg, {COLORS["primary"]}, {COLORS["maroon_light"]});
+    border-left: 4px solid {COLORS["secondary"]};
+}}
+.kpi-executive.success {{ 
+    background: linear-gradient(135deg, #2E7D32, #4CAF50);
+    border-left: 4px solid #81C784;
+}}
+.kpi-executive.warning {{ 
+    background: linear-gradient(135deg, #F57C00, #FFA726);
+    border-left: 4px solid {COLORS["primary"]};
+}}
+.kpi-executive.danger {{ 
+    background: linear-gradient(135deg, {COLORS["danger"]}, #EF5350);
+    border-left: 4px solid #FF8A80;
+}}
+.kpi-executive.info {{ 
+    background: linear-gradient(135deg, #1565C0, #2196F3);
+    border-left: 4px solid #64B5F6;
+}}
+
+.kpi-executive:hover {{
+    transform: translateY(-3px);
+    box-shadow: 0 8px 25px rgba(0, 0, 0, 0.2);
+}}
+
+.kpi-value {{
+    font-size: 28px;
+    font-weight: 800;
+    color: white;
+    line-height: 1.2;
+    margin: 10px 0 5px;
+    text-shadow: 1px 1px 2px rgba(0, 0, 0, 0.3);
+}}
+
+.kpi-label {{
+    font-size: 13px;
+    color: rgba(255, 255, 255, 0.9);
+    text-transform: uppercase;
+    letter-spacing: 0.5px;
+    font-weight: 600;
+}}
+
+.kpi-icon {{
+    font-size: 22px;
+    margin-bottom: 10px;
+    opacity: 0.9;
+}}
+
+/* Executive Status Badges */
+.status-executive {{
+    display: inline-flex;
+    align-items: center;
+    gap: 6px;
+    padding: 6px 14px;
+    border-radius: 20px;
+    font-size: 11px;
+    font-weight: 700;
+    text-transform: uppercase;
+    letter-spacing: 0.5px;
+}}
+
+.status-good {{
+    background: linear-gradient(135deg, #4CAF50, #66BB6A);
+    color: white;
+    box-shadow: 0 2px 8px rgba(76, 175, 80, 0.3);
+}}
+
+.status-warning {{
+    background: linear-gradient(135deg, #FFC107, #FFD54F);
+    color: {COLORS["dark"]};
+    box-shadow: 0 2px 8px rgba(255, 193, 7, 0.3);
+}}
+
+.status-bad {{
+    background: linear-gradient(135deg, {COLORS["danger"]}, #EF5350);
+    color: white;
+    box-shadow: 0 2px 8px rgba(255, 82, 82, 0.3);
+}}
+
+/* Executive Tabs */
+.stTabs [data-baseweb="tab-list"] {{
+    gap: 2px;
+    background: {COLORS["light"]};
+    padding: 3px;
+    border-radius: 10px;
+    border: 1px solid rgba(128, 0, 0, 0.1);
+}}
+
+.stTabs [data-baseweb="tab"] {{
+    border-radius: 8px;
+    padding: 10px 20px;
+    background: transparent;
+    font-weight: 600;
+    color: {COLORS["dark"]};
+    border: 2px solid transparent;
+    transition: all 0.3s ease;
+    font-size: 14px;
+}}
+
+.stTabs [data-baseweb="tab"]:hover {{
+    background: rgba(128, 0, 0, 0.05);
+    border-color: rgba(128, 0, 0, 0.1);
+}}
+
+.stTabs [aria-selected="true"] {{
+    background: linear-gradient(135deg, {COLORS["primary"]}, {COLORS["secondary"]});
+    color: white;
+    box-shadow: 0 3px 10px rgba(128, 0, 0, 0.2);
+    border-color: transparent;
+}}
+
+/* Executive Section Navigation (tab-styled radio, see DASHBOARD LAYOUT) */
+.st-key-active_section div[role="radiogroup"] {{
+    gap: 2px;
+    background: {COLORS["light"]};
+    padding: 3px;
+    border-radius: 10px;
+    border: 1px solid rgba(128, 0, 0, 0.1);
+}}
+
+.st-key-active_section div[role="radiogroup"] label {{
+    border-radius: 8px;
+    padding: 10px 20px;
+    margin: 0;
+    font-weight: 600;
+    color: {COLORS["dark"]};
+    transition: all 0.3s ease;
+}}
+
+.st-key-active_section div[role="radiogroup"] label:has(input:checked) {{
+    background: linear-gradient(135deg, {COLORS["primary"]}, {COLORS["secondary"]});
+    color: white;
+    box-shadow: 0 3px 10px rgba(128, 0, 0, 0.2);
+}}
+
+/* Executive Filters */
+.filter-executive {{
+    background: white;
+    border-radius: 12px;
+    padding: 20px;
+    margin-bottom: 25px;
+    border: 1px solid rgba(128, 0, 0, 0.1);
+    box-shadow: 0 4px 12px rgba(0, 0, 0, 0.05);
+}}
+
+/* Responsive Design */
+@media (max-width: 768px) {{
+    .kpi-value {{
+        font-size: 22px;
+    }}
+    
+    .executive-card {{
+        padding: 20px;
+    }}
+}}
+</style>
+"""
+
+HEADER_HTML = """
+<div class="executive-header">
+    <h1 style="margin: 0; font-size: 32px; font-weight: 800;">
+        ⚡ NATIONAL DISCO PERFORMANCE DASHBOARD
+    </h1>
+    <p style="margin: 10px 0 0 0; font-size: 18px; opacity: 0.95; font-weight: 500;">
+        Executive Level Monitoring | NEPRA Compliance | Power Sector Analytics
+    </p>
+</div>
+"""
+
+_FOOTER_TEMPLATE = f"""
+<div style="
+    background: linear-gradient(135deg, {COLORS["primary"]}, {COLORS["dark"]});
+    color: white;
+    padding: 20px;
+    border-radius: 10px;
+    text-align: center;
+    margin-top: 30px;
+    border: 1px solid rgba(253, 140, 23, 0.3);
+">
+    <div style="font-weight: 800; margin-bottom: 10px; font-size: 16px;">
+        NATIONAL POWER SECTOR EXECUTIVE DASHBOARD
+    </div>
+    <div style="font-size: 14px; margin-bottom: 15px; opacity: 0.9;">
+        ⚡ Real-time Performance Monitoring | 📊 NEPRA Compliance | 🎯 Executive Decision Support
+    </div>
+    <div style="font-size: 12px; opacity: 0.7;">
+        📅 Last Updated: {{updated}} | 📊 Data Source: DISCO Performance Reports
+    </div>
+</div>
+"""
+
+
+def footer_html(updated):
+    """Footer with ``updated`` (a preformatted timestamp) as its Last Updated line"""
+    return _FOOTER_TEMPLATE.format(updated=updated)